@@ -5,65 +5,277 @@ Evaluates combined signals from candle patterns, price action, indicators,
 and PlusE Finance data to make trade decisions with reasoning.
 """
 
+import asyncio
 import json
-from typing import Any
+import time
+import weakref
+from typing import Any, Callable
 
 from bot.config import config
 from bot.utils.logger import log
-from bot.utils import activity
+from bot.utils import activity, metrics
+from bot.ai.json_stream import JSONFieldStream
+from bot.ai.router import Provider, ProviderRouter
+from bot.utils.rate_limit import TokenBucket
+
+
+_ai_latency = metrics.histogram("tradebot_ai_call_seconds", "AI provider call latency.", ["provider"])
+_ai_calls = metrics.counter("tradebot_ai_calls_total", "AI provider calls by outcome.", ["provider", "outcome"])
+_ai_tokens = metrics.counter("tradebot_ai_tokens_total", "AI tokens used.", ["provider", "kind"])
+
+
+def record_ai_call(
+    provider: str,
+    seconds: float,
+    ok: bool,
+    input_tokens: int | None = None,
+    output_tokens: int | None = None,
+    cache_read_tokens: int | None = None,
+    cache_write_tokens: int | None = None,
+) -> None:
+    """Record latency, outcome and token usage of one AI provider call."""
+    _ai_latency.labels(provider=provider).observe(seconds)
+    _ai_calls.labels(provider=provider, outcome="ok" if ok else "error").inc()
+    for kind, count in (
+        ("input", input_tokens),
+        ("output", output_tokens),
+        ("cache_read", cache_read_tokens),
+        ("cache_write", cache_write_tokens),
+    ):
+        if count:
+            _ai_tokens.labels(provider=provider, kind=kind).inc(count)
 
 
 # ── Provider abstraction ─────────────────────────────────────
 
-async def _call_claude(prompt: str, system: str) -> str:
-    """Call Anthropic Claude API."""
-    import anthropic
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+GEMINI_MODEL = "gemini-3-pro-preview"
+
+# Long-lived SDK clients, one set per event loop: each SDK pools HTTP
+# connections on the loop that opened them, and the bar stream runs its own.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _client(provider: str) -> Any:
+    """The running loop's client for 'claude' or 'gemini' (created on first use)."""
+    clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(provider)
+    if client is None:
+        if provider == "claude":
+            import anthropic
+            client = anthropic.AsyncAnthropic(api_key=config.ANTHROPIC_API_KEY)
+        else:
+            from google import genai
+            client = genai.Client(api_key=config.GEMINI_API_KEY)
+        clients[provider] = client
+    return client
+
+
+async def _call_claude(
+    prompt: str, system: str, on_text: Callable[[str], None] | None = None
+) -> str:
+    """
+    Call Anthropic Claude API (system prompt marked for prompt caching).
 
-    client = anthropic.AsyncAnthropic(api_key=config.ANTHROPIC_API_KEY)
-    response = await client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=1024,
-        system=system,
-        messages=[{"role": "user", "content": prompt}],
+    With `on_text`, the reply is streamed and each text delta is passed to
+    it as it arrives; the full text is still returned at the end.
+    """
+    start = time.perf_counter()
+    request = {
+        "model": CLAUDE_MODEL,
+        "max_tokens": 1024,
+        "system": [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}],
+        "messages": [{"role": "user", "content": prompt}],
+    }
+    try:
+        if on_text is None:
+            response = await _client("claude").messages.create(**request)
+        else:
+            async with _client("claude").messages.stream(**request) as stream:
+                async for text in stream.text_stream:
+                    on_text(text)
+                response = await stream.get_final_message()
+    except Exception:
+        record_ai_call("claude", time.perf_counter() - start, ok=False)
+        raise
+    usage = getattr(response, "usage", None)
+    record_ai_call(
+        "claude",
+        time.perf_counter() - start,
+        ok=True,
+        input_tokens=getattr(usage, "input_tokens", None),
+        output_tokens=getattr(usage, "output_tokens", None),
+        cache_read_tokens=getattr(usage, "cache_read_input_tokens", None),
+        cache_write_tokens=getattr(usage, "cache_creation_input_tokens", None),
     )
     return response.content[0].text
 
 
-async def _call_gemini(prompt: str, system: str) -> str:
-    """Call Google Gemini API."""
-    from google import genai
+async def _call_gemini(
+    prompt: str,
+    system: str,
+    model: str = GEMINI_MODEL,
+    provider: str = "gemini",
+    on_text: Callable[[str], None] | None = None,
+) -> str:
+    """
+    Call Google Gemini API (streamed to `on_text` when given, as for Claude).
 
-    client = genai.Client(api_key=config.GEMINI_API_KEY)
-    response = await client.aio.models.generate_content(
-        model="gemini-3-pro-preview",
-        contents=f"{system}\n\n{prompt}",
+    The system prompt goes in system_instruction so every request starts
+    with the same prefix, which Gemini's implicit context caching reuses.
+    """
+    from google.genai import types
+
+    start = time.perf_counter()
+    request = {
+        "model": model,
+        "contents": prompt,
+        "config": types.GenerateContentConfig(system_instruction=system),
+    }
+    try:
+        if on_text is None:
+            response = await _client("gemini").aio.models.generate_content(**request)
+            text = response.text or ""
+        else:
+            parts = []
+            response = None
+            async for response in await _client("gemini").aio.models.generate_content_stream(**request):
+                if response.text:
+                    parts.append(response.text)
+                    on_text(response.text)
+            text = "".join(parts)
+    except Exception:
+        record_ai_call(provider, time.perf_counter() - start, ok=False)
+        raise
+    # Streamed: the last chunk carries the usage totals
+    record_gemini_usage(provider, time.perf_counter() - start, response)
+    return text
+
+
+def record_gemini_usage(provider: str, seconds: float, response: Any) -> None:
+    """record_ai_call() for a successful Gemini response (token counts from usage_metadata)."""
+    usage = getattr(response, "usage_metadata", None)
+    record_ai_call(
+        provider,
+        seconds,
+        ok=True,
+        input_tokens=getattr(usage, "prompt_token_count", None),
+        output_tokens=getattr(usage, "candidates_token_count", None),
+        cache_read_tokens=getattr(usage, "cached_content_token_count", None),
     )
-    return response.text
 
 
-async def _call_ai(prompt: str, system: str) -> str:
-    """Call the configured AI provider."""
-    if config.ANTHROPIC_API_KEY:
-        return await _call_claude(prompt, system)
-    elif config.GEMINI_API_KEY:
-        return await _call_gemini(prompt, system)
-    else:
-        raise ValueError("No AI API key configured (ANTHROPIC_API_KEY or GEMINI_API_KEY)")
+def _limiter(rpm: float) -> TokenBucket | None:
+    """A request budget (bursts of up to 10% of a minute's worth); None when unlimited."""
+    return TokenBucket(rpm, burst=max(1, int(rpm) // 10)) if rpm > 0 else None
+
+
+def _make_router(share: float) -> ProviderRouter:
+    """A router whose providers get `share` of each provider's configured RPM."""
+    # RPM 0 means unlimited, but a zero share of it means no requests at all
+    has_budget = share > 0
+    # Preferred order; rolling latency/error stats can reorder it at runtime
+    return ProviderRouter([
+        Provider(
+            "claude", _call_claude, lambda: bool(config.ANTHROPIC_API_KEY) and has_budget,
+            _limiter(config.CLAUDE_RPM * share),
+        ),
+        Provider(
+            "gemini", _call_gemini, lambda: bool(config.GEMINI_API_KEY) and has_budget,
+            _limiter(config.GEMINI_RPM * share),
+        ),
+    ])
+
+
+# Trade evaluations and background work (watchlist/fundamental analysis,
+# journals) get separate request budgets, so a long analysis sweep can't
+# queue an order decision behind it
+_routers = {
+    "trade": _make_router(1 - config.AI_BACKGROUND_RPM_SHARE),
+    "background": _make_router(config.AI_BACKGROUND_RPM_SHARE),
+}
+
+
+def _is_json(response: str) -> bool:
+    try:
+        _parse_json(response)
+        return True
+    except (ValueError, IndexError):
+        return False
+
+
+def _hedge_after(workload: str) -> float:
+    # Background calls have minutes, not a bar, to answer; hedging them would
+    # just double their cost
+    return config.AI_HEDGE_AFTER if workload == "trade" else 0.0
+
+
+async def _call_ai(
+    prompt: str,
+    system: str,
+    deadline: float | None = None,
+    expect_json: bool = False,
+    stream: Callable[[str], Callable[[str], None]] | None = None,
+    workload: str = "trade",
+    hedge_after: float | None = None,
+    pin: Callable[[], str | None] | None = None,
+) -> str:
+    """
+    Call the AI through the provider router.
+
+    Args:
+        deadline: Seconds before giving up (default config.AI_DEADLINE).
+        expect_json: Only accept answers that parse as JSON; an unparseable
+                     reply counts as a provider failure.
+        stream: Stream the reply (see ProviderRouter.call); the full text
+                is still returned.
+        workload: "trade" for order decisions, "background" for everything
+                  else; each has its own request budget and router stats.
+        hedge_after: Seconds before racing a second provider (default
+                     config.AI_HEDGE_AFTER for trade evaluations; background
+                     calls only fail over on errors).
+        pin: Provider already acted on (see ProviderRouter.call).
+
+    Raises:
+        AIDeadlineError: No answer before the deadline.
+    """
+    return await _routers[workload].call(
+        prompt,
+        system,
+        deadline=deadline or config.AI_DEADLINE,
+        hedge_after=hedge_after if hedge_after is not None else _hedge_after(workload),
+        validate=_is_json if expect_json else None,
+        stream=stream,
+        pin=pin,
+    )
+
+
+def provider_stats() -> dict[str, Any]:
+    """AI provider routing stats for the status server."""
+    return {
+        "deadline_s": config.AI_DEADLINE,
+        **{
+            workload: {"hedge_after_s": _hedge_after(workload), **router.stats()}
+            for workload, router in _routers.items()
+        },
+    }
 
 
 # ── System prompts ───────────────────────────────────────────
 
 TRADE_ANALYST_SYSTEM = """You are an expert quantitative day-trading analyst evaluating 5-minute candle signals for US equities.
 
-Your responses must be valid JSON with this exact structure:
+Your responses must be valid JSON with this exact structure, fields in this order:
 {
     "decision": "enter_long" | "enter_short" | "skip",
     "confidence": 0.0-1.0,
-    "reasoning": "Brief explanation of why",
     "entry_price": null or suggested price,
     "stop_loss": null or suggested stop,
     "take_profit": null or suggested target,
     "risk_reward_ratio": null or float,
+    "reasoning": "Brief explanation of why",
     "key_factors": ["factor1", "factor2"]
 }
 
@@ -86,6 +298,239 @@ JOURNAL_SYSTEM = """You are a trading journal writer. Given trade details, write
 Focus on what pattern triggered the trade, what confirmed it, and the result."""
 
 
+TRADE_ANALYST_BATCH_SYSTEM = TRADE_ANALYST_SYSTEM + """
+
+Batches: you may be sent several candidate setups from the same bar close, one
+"## Analysis for SYMBOL" section each. Evaluate every setup on its own merits with
+the framework above, then rank them against each other (only a few positions can be
+open at once). Respond with one JSON object keyed by symbol, each value using the
+exact structure above plus "rank" (1 = best setup; rank every symbol), listing the
+symbols best rank first:
+{"AAPL": {"decision": ..., "rank": 1, ...}, "MSFT": {"decision": ..., "rank": 2, ...}}"""
+
+_DECISION_SINGLE = (
+    "\n\n### Decision Required\n"
+    "Based on all the above data (technicals + fundamentals), should we enter a trade? "
+    "Respond with valid JSON only."
+)
+
+
+def _parse_json(response: str) -> Any:
+    """JSON from an AI response (handles markdown code blocks)."""
+    json_str = response.strip()
+    if json_str.startswith("```"):
+        json_str = json_str.split("\n", 1)[1]
+        json_str = json_str.rsplit("```", 1)[0]
+    return json.loads(json_str)
+
+
+# Fields the strategy acts on; they come first in the reply
+_ORDER_FIELDS = ("decision", "confidence", "stop_loss", "take_profit")
+
+_early_lead = metrics.histogram(
+    "tradebot_ai_early_decision_lead_seconds",
+    "How long before the full streamed reply a trade decision was available.",
+)
+
+
+def _decision_ready(fields: dict[str, Any]) -> bool:
+    """True once a streamed reply has everything needed to act (a skip needs less)."""
+    if fields.get("decision") == "skip" and "confidence" in fields:
+        return True
+    return all(name in fields for name in _ORDER_FIELDS)
+
+
+async def _evaluate_single(analysis: str) -> dict[str, Any]:
+    """
+    One AI request for one setup; raises JSONDecodeError on a malformed reply.
+
+    With AI_STREAM the decision is returned as soon as its order fields have
+    streamed in. It then carries "details": a task that resolves to the full
+    reply (reasoning, key factors) from the same provider once the rest has
+    arrived, or fails if that provider does.
+    """
+    prompt = analysis + _DECISION_SINGLE
+    if not config.AI_STREAM:
+        return _parse_json(await _call_ai(prompt, TRADE_ANALYST_SYSTEM, expect_json=True))
+
+    early: asyncio.Future = asyncio.get_running_loop().create_future()
+    decided_by: str | None = None
+
+    def stream(provider: str) -> Callable[[str], None]:
+        parser = JSONFieldStream()
+
+        def on_text(text: str) -> None:
+            nonlocal decided_by
+            parser.feed(text)
+            if not early.done() and _decision_ready(parser.fields):
+                decided_by = provider
+                early.set_result(dict(parser.fields))
+
+        return on_text
+
+    # Once the early decision is out, the details must come from the same
+    # reply: no failover to a provider that might have decided otherwise
+    full = asyncio.ensure_future(_call_ai(
+        prompt, TRADE_ANALYST_SYSTEM, expect_json=True, stream=stream, pin=lambda: decided_by,
+    ))
+    try:
+        await asyncio.wait({early, full}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        full.cancel()
+        raise
+    if full.done():
+        early.cancel()
+        return _parse_json(full.result())
+
+    decided_at = time.perf_counter()
+
+    async def details() -> dict[str, Any]:
+        reply = _parse_json(await full)
+        _early_lead.observe(time.perf_counter() - decided_at)
+        return reply
+
+    decision = early.result()
+    decision["details"] = asyncio.ensure_future(details())
+    return decision
+
+
+# ── Batched evaluation ───────────────────────────────────────
+
+MAX_BATCH = 8               # Setups per batched AI request
+
+_batches = metrics.counter(
+    "tradebot_ai_batches_total", "Batched trade evaluations by outcome.", ["outcome"]
+)
+_batched_signals = metrics.counter(
+    "tradebot_ai_batched_signals_total", "Signals evaluated as part of a batch."
+)
+
+
+class SignalBatcher:
+    """
+    Collects evaluate_signal() calls made within AI_BATCH_WINDOW into one request.
+
+    Setups from the same bar close share one call with the long system
+    prompt, and the model ranks them against each other. Decisions are
+    handed back best-rank first, so when positions are scarce the stronger
+    setup reaches the order path first; streamed replies list symbols in
+    rank order and each is handed back as soon as its object is complete.
+    Symbols missing from the batched
+    reply (or all of them, if it isn't valid JSON) are re-asked one by one.
+    One batcher per event loop.
+    """
+
+    def __init__(self):
+        self._pending: list[tuple[str, str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def evaluate(self, symbol: str, analysis: str) -> dict[str, Any]:
+        if any(s == symbol for s, _, _ in self._pending):
+            return await _evaluate_single(analysis)  # Replies are keyed by symbol
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((symbol, analysis, future))
+        if len(self._pending) >= MAX_BATCH:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(config.AI_BATCH_WINDOW, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, str, asyncio.Future]]) -> None:
+        if len(batch) == 1:
+            await self._resolve_single(*batch[0])
+            return
+
+        symbols = [s for s, _, _ in batch]
+        prompt = (
+            f"# {len(batch)} candidate setups on this bar close: {', '.join(symbols)}\n\n"
+            + "\n\n".join(analysis for _, analysis, _ in batch)
+            + "\n\n### Decisions Required\n"
+            "Evaluate and rank every setup above. Respond with valid JSON only, keyed by symbol."
+        )
+        futures = {symbol: future for symbol, _, future in batch}
+
+        def stream(provider: str) -> Callable[[str], None]:
+            # Each symbol's decision is handed back as soon as its object is complete
+            parser = JSONFieldStream()
+
+            def on_text(text: str) -> None:
+                for symbol, decision in parser.feed(text):
+                    future = futures.get(symbol)
+                    if (future is not None and not future.done()
+                            and isinstance(decision, dict) and "decision" in decision):
+                        future.set_result(decision)
+
+            return on_text
+
+        try:
+            reply = _parse_json(await _call_ai(
+                prompt, TRADE_ANALYST_BATCH_SYSTEM, expect_json=True,
+                stream=stream if config.AI_STREAM else None,
+            ))
+        except Exception as e:
+            log.warning(f"Batched AI evaluation of {len(batch)} signals failed, asking one by one: {e}")
+            reply = None
+
+        answered, missing = [], []
+        for symbol, analysis, future in batch:
+            decision = reply.get(symbol) if isinstance(reply, dict) else None
+            if future.done() or (isinstance(decision, dict) and "decision" in decision):
+                answered.append((symbol, decision, future))
+            else:
+                missing.append((symbol, analysis, future))
+        _batches.labels(outcome="ok" if not missing else "partial" if answered else "failed").inc()
+        _batched_signals.inc(len(answered))
+
+        def _rank(item: tuple) -> float:
+            try:
+                return float((item[1] or {}).get("rank"))
+            except (TypeError, ValueError):
+                return float("inf")
+
+        for symbol, decision, future in sorted(answered, key=_rank):
+            if not future.done():
+                future.set_result(decision)
+        if missing:
+            await asyncio.gather(*(self._resolve_single(*item) for item in missing))
+
+    @staticmethod
+    async def _resolve_single(symbol: str, analysis: str, future: asyncio.Future) -> None:
+        try:
+            result = await _evaluate_single(analysis)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+
+_batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, SignalBatcher]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _batcher() -> SignalBatcher:
+    """The batcher for the running loop (bar stream and main loop batch separately)."""
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        batcher = _batchers[loop] = SignalBatcher()
+    return batcher
+
+
 # ── Public API ───────────────────────────────────────────────
 
 async def evaluate_signal(
@@ -129,6 +574,28 @@ async def evaluate_signal(
         f"Resistance levels: {price_action.get('support_resistance', {}).get('resistance', [])}"
     )
 
+    key_levels = price_action.get("key_levels")
+    if key_levels:
+        lines = []
+        prior = key_levels.get("prior_day")
+        if prior:
+            lines.append(
+                f"Prior day: high ${prior['high']:.2f}, low ${prior['low']:.2f}, close ${prior['close']:.2f}"
+            )
+        rng = key_levels.get("opening_range")
+        if rng:
+            state = "" if rng.get("complete") else " (still forming)"
+            lines.append(f"Opening range: ${rng['low']:.2f} - ${rng['high']:.2f}{state}")
+        for timeframe in ("daily", "hourly"):
+            levels = key_levels.get(timeframe) or {}
+            if levels.get("support") or levels.get("resistance"):
+                lines.append(
+                    f"{timeframe.capitalize()} support: {levels.get('support', [])}, "
+                    f"resistance: {levels.get('resistance', [])}"
+                )
+        if lines:
+            sections.append("\n### Higher-Timeframe Levels\n" + "\n".join(lines))
+
     sections.append(f"\n### Technical Indicators\n{json.dumps(indicators, indent=2)}")
 
     if pluse_data:
@@ -143,41 +610,30 @@ async def evaluate_signal(
         if fund_str and "No fundamental" not in fund_str:
             sections.append(f"\n### Fundamentals\n{fund_str}")
 
-    sections.append(
-        "\n### Decision Required\n"
-        "Based on all the above data (technicals + fundamentals), should we enter a trade? "
-        "Respond with valid JSON only."
-    )
-
-    prompt = "\n".join(sections)
+    analysis = "\n".join(sections)
 
     activity.ai_request(
         agent="analyst",
         symbol=symbol,
         title=f"Trade evaluation: {signal.get('pattern', 'unknown')} on {symbol}",
-        prompt=prompt,
+        prompt=analysis + _DECISION_SINGLE,
     )
 
     try:
-        response = await _call_ai(prompt, TRADE_ANALYST_SYSTEM)
-
-        # Parse JSON from response (handle markdown code blocks)
-        json_str = response.strip()
-        if json_str.startswith("```"):
-            json_str = json_str.split("\n", 1)[1]
-            json_str = json_str.rsplit("```", 1)[0]
-
-        decision = json.loads(json_str)
+        if config.AI_BATCH_WINDOW > 0:
+            decision = await _batcher().evaluate(symbol, analysis)
+        else:
+            decision = await _evaluate_single(analysis)
         log.info(
             f"AI decision for {symbol}: {decision.get('decision', 'unknown')} "
             f"(confidence: {decision.get('confidence', 0)})"
         )
-        activity.trade_decision(
-            symbol=symbol,
-            decision=decision.get("decision", "skip"),
-            confidence=decision.get("confidence", 0),
-            reasoning=decision.get("reasoning", ""),
-        )
+        details = decision.get("details")
+        if details is None:
+            _record_decision(symbol, decision, decision.get("reasoning", ""))
+        else:
+            # Decided from the streamed fields: log the reasoning once it arrives
+            details.add_done_callback(lambda task: _record_details(symbol, decision, task))
         return decision
 
     except json.JSONDecodeError as e:
@@ -212,6 +668,27 @@ async def evaluate_signal(
         }
 
 
+def _record_decision(symbol: str, decision: dict[str, Any], reasoning: str) -> None:
+    activity.trade_decision(
+        symbol=symbol,
+        decision=decision.get("decision", "skip"),
+        confidence=decision.get("confidence", 0),
+        reasoning=reasoning,
+    )
+
+
+def _record_details(symbol: str, decision: dict[str, Any], details: asyncio.Task) -> None:
+    """Activity entry for an early decision, with the reasoning from the full reply."""
+    if details.cancelled():
+        reasoning = "AI reply cancelled before the reasoning arrived"
+    elif details.exception() is not None:
+        reasoning = f"AI reply failed after the decision: {details.exception()}"
+    else:
+        reasoning = details.result().get("reasoning", "")
+        log.info(f"AI reasoning for {symbol}: {reasoning}")
+    _record_decision(symbol, decision, reasoning)
+
+
 async def generate_trade_journal(
     symbol: str,
     side: str,
@@ -232,7 +709,7 @@ async def generate_trade_journal(
     )
 
     try:
-        return await _call_ai(prompt, JOURNAL_SYSTEM)
+        return await _call_ai(prompt, JOURNAL_SYSTEM, workload="background")
     except Exception as e:
         log.error(f"Journal generation failed: {e}")
         return f"{side.upper()} {symbol} @ ${entry_price:.2f} ({pattern})"
@@ -4,13 +4,19 @@ Automated fundamental + AI analysis for all watchlist stocks.
 Runs daily for each active stock: fetches fundamentals, market snapshot,
 Reddit buzz, then asks Gemini for a comprehensive analysis. Results are
 cached in Supabase so the dashboard always has fresh data.
+
+A watchlist run checks freshness for every symbol in one query, fetches the
+shared inputs (Reddit scan results, ApeWisdom rankings) once, and analyzes
+several symbols at a time, open positions and recently signalled symbols
+first. The AI calls are paced by the per-provider rate limits in the router.
 """
 
 import asyncio
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
 
 from bot.config import config
-from bot.data.supabase_client import get_client
+from bot.data import async_db
 from bot.data.fundamentals import (
     get_fundamentals,
     get_stock_snapshot,
@@ -22,6 +28,18 @@ from bot.utils.logger import log
 from bot.utils import activity
 
 
+# Seconds a full analysis (long markdown answer) may take across AI providers
+ANALYSIS_DEADLINE = 90.0
+
+# Symbols analyzed at once in a watchlist run
+ANALYSIS_CONCURRENCY = 4
+
+# Signals this recent move a symbol up the analysis queue (hours)
+RECENT_SIGNAL_HOURS = 24
+
+APEWISDOM_FILTERS = ("all-stocks", "wallstreetbets")
+
+
 # ── System prompt ────────────────────────────────────────────
 
 FUNDAMENTAL_SYSTEM = """You are a senior equity analyst providing daily stock analysis for a day-trading system.
@@ -43,15 +61,12 @@ Format your response in clean markdown with sections:
 
 # ── Helpers ──────────────────────────────────────────────────
 
-def _get_active_watchlist() -> list[str]:
+async def _get_active_watchlist() -> list[str]:
     """Get all active symbols from the watchlist table."""
     try:
-        client = get_client()
-        resp = (
-            client.table("watchlist")
-            .select("symbol")
-            .eq("active", True)
-            .execute()
+        resp = await async_db.query(
+            lambda c: c.table("watchlist").select("symbol").eq("active", True),
+            op="watchlist.active",
         )
         return [r["symbol"] for r in (resp.data or [])]
     except Exception as e:
@@ -59,109 +74,146 @@ def _get_active_watchlist() -> list[str]:
         return []
 
 
-def _needs_analysis(symbol: str) -> bool:
+def _analyzed_today(analyzed_at: str | None) -> bool:
+    """Whether an ai_analyzed_at timestamp falls on the current UTC day."""
+    if not analyzed_at:
+        return False
+    analyzed = datetime.fromisoformat(analyzed_at.replace("Z", "+00:00"))
+    return analyzed.date() == datetime.now(timezone.utc).date()
+
+
+async def _needs_analysis(symbol: str) -> bool:
     """Check if a symbol needs fresh AI analysis (not done today)."""
+    return symbol in await _stale_symbols([symbol])
+
+
+async def _stale_symbols(symbols: list[str]) -> set[str]:
+    """The symbols without an AI analysis from today (one query for all of them)."""
     try:
-        client = get_client()
-        resp = (
-            client.table("fundamentals")
-            .select("ai_analyzed_at")
-            .eq("symbol", symbol)
-            .execute()
-        )
-        if not resp.data:
-            return True
-        row = resp.data[0]
-        if not row.get("ai_analyzed_at"):
-            return True
-        analyzed = datetime.fromisoformat(row["ai_analyzed_at"].replace("Z", "+00:00"))
-        now = datetime.now(timezone.utc)
-        # Fresh if same calendar day (UTC)
-        return not (
-            analyzed.year == now.year
-            and analyzed.month == now.month
-            and analyzed.day == now.day
+        resp = await async_db.query(
+            lambda c: c.table("fundamentals").select("symbol, ai_analyzed_at").in_("symbol", symbols),
+            op="fundamentals.analyzed_at",
         )
+        fresh = {r["symbol"] for r in (resp.data or []) if _analyzed_today(r.get("ai_analyzed_at"))}
+        return set(symbols) - fresh
     except Exception as e:
-        log.debug(f"Analysis freshness check failed for {symbol}: {e}")
-        return True
-
-
-def _get_reddit_buzz(symbol: str) -> list[dict]:
-    """Pull latest Reddit posts for a symbol from activity_log."""
+        log.debug(f"Analysis freshness check failed: {e}")
+        return set(symbols)
+
+
+async def _priorities(symbols: list[str]) -> dict[str, int]:
+    """Analysis priority per symbol: 2 = open position, 1 = recent signal, 0 = other."""
+    since = (datetime.now(timezone.utc) - timedelta(hours=RECENT_SIGNAL_HOURS)).isoformat()
+    positions, signals = await asyncio.gather(
+        async_db.get_positions(),
+        async_db.query(
+            lambda c: (
+                c.table("signals")
+                .select("symbol")
+                .in_("symbol", symbols)
+                .gte("created_at", since)
+            ),
+            op="signals.recent_symbols",
+        ),
+        return_exceptions=True,
+    )
+    priority = dict.fromkeys(symbols, 0)
+    if not isinstance(signals, BaseException):
+        for row in signals.data or []:
+            if row["symbol"] in priority:
+                priority[row["symbol"]] = 1
+    if not isinstance(positions, BaseException):
+        for row in positions:
+            if row["symbol"] in priority:
+                priority[row["symbol"]] = 2
+    return priority
+
+
+async def _get_scan_results() -> list[dict]:
+    """Latest Reddit scan results from activity_log (shared by every symbol)."""
     try:
-        client = get_client()
-        resp = (
-            client.table("activity_log")
-            .select("metadata")
-            .eq("agent", "scanner")
-            .eq("event_type", "scan_result")
-            .order("created_at", desc=True)
-            .limit(5)
-            .execute()
+        resp = await async_db.query(
+            lambda c: (
+                c.table("activity_log")
+                .select("metadata")
+                .eq("agent", "scanner")
+                .eq("event_type", "scan_result")
+                .order("created_at", desc=True)
+                .limit(5)
+            ),
+            op="activity_log.scan_results",
         )
-        posts = []
-        seen = set()
-        for row in (resp.data or []):
-            tickers = (row.get("metadata") or {}).get("tickers", [])
-            for t in tickers:
-                if t.get("symbol", "").upper() != symbol.upper():
-                    continue
-                for p in t.get("posts", []):
-                    url = p.get("url", "")
-                    if url and url not in seen:
-                        posts.append(p)
-                        seen.add(url)
-        posts.sort(key=lambda p: p.get("upvotes", 0), reverse=True)
-        return posts[:10]
+        return resp.data or []
     except Exception as e:
-        log.debug(f"Reddit buzz fetch failed for {symbol}: {e}")
+        log.debug(f"Reddit scan results fetch failed: {e}")
         return []
 
 
-def _get_apewisdom_data(symbol: str) -> dict | None:
-    """Fetch live ApeWisdom ranking data for a symbol."""
+def _reddit_posts(scan_results: list[dict], symbol: str) -> list[dict]:
+    """Top Reddit posts for a symbol from the scan results."""
+    posts = []
+    seen = set()
+    for row in scan_results:
+        tickers = (row.get("metadata") or {}).get("tickers", [])
+        for t in tickers:
+            if t.get("symbol", "").upper() != symbol.upper():
+                continue
+            for p in t.get("posts", []):
+                url = p.get("url", "")
+                if url and url not in seen:
+                    posts.append(p)
+                    seen.add(url)
+    posts.sort(key=lambda p: p.get("upvotes", 0), reverse=True)
+    return posts[:10]
+
+
+async def _get_apewisdom_rankings() -> dict[str, list[dict]]:
+    """Current ApeWisdom rankings per filter (missing filters are left out)."""
     import httpx
 
-    filters = ["all-stocks", "wallstreetbets"]
-    for filter_name in filters:
+    async def _fetch(client: httpx.AsyncClient, filter_name: str) -> list[dict] | None:
         try:
-            resp = httpx.get(
-                f"https://apewisdom.io/api/v1.0/filter/{filter_name}/page/1",
-                headers={"User-Agent": "CandleBot/1.0"},
-                timeout=10,
-            )
+            resp = await client.get(f"https://apewisdom.io/api/v1.0/filter/{filter_name}/page/1")
             if resp.status_code != 200:
-                continue
-            data = resp.json()
-            for item in data.get("results", []):
-                if (item.get("ticker") or "").upper() == symbol.upper():
-                    return {
-                        "rank": int(item.get("rank") or 99),
-                        "mentions": int(item.get("mentions") or 0),
-                        "upvotes": int(item.get("upvotes") or 0),
-                        "rank_24h_ago": int(item.get("rank_24h_ago") or 99),
-                        "mentions_24h_ago": int(item.get("mentions_24h_ago") or 0),
-                        "filter": filter_name,
-                    }
+                return None
+            return resp.json().get("results", [])
         except Exception:
-            continue
+            return None
+
+    async with httpx.AsyncClient(headers={"User-Agent": "CandleBot/1.0"}, timeout=10) as client:
+        results = await asyncio.gather(*(_fetch(client, f) for f in APEWISDOM_FILTERS))
+    return {f: r for f, r in zip(APEWISDOM_FILTERS, results) if r is not None}
+
+
+def _apewisdom_entry(rankings: dict[str, list[dict]], symbol: str) -> dict | None:
+    """A symbol's ranking data from the first filter that lists it."""
+    for filter_name in APEWISDOM_FILTERS:
+        for item in rankings.get(filter_name, []):
+            if (item.get("ticker") or "").upper() == symbol.upper():
+                return {
+                    "rank": int(item.get("rank") or 99),
+                    "mentions": int(item.get("mentions") or 0),
+                    "upvotes": int(item.get("upvotes") or 0),
+                    "rank_24h_ago": int(item.get("rank_24h_ago") or 99),
+                    "mentions_24h_ago": int(item.get("mentions_24h_ago") or 0),
+                    "filter": filter_name,
+                }
     return None
 
 
-def _save_analysis(symbol: str, summary: str) -> None:
+async def _save_analysis(symbol: str, summary: str) -> None:
     """Save the AI analysis to the fundamentals table."""
+    row = {
+        "symbol": symbol,
+        "ai_summary": summary,
+        "ai_analyzed_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
     try:
-        client = get_client()
-        client.table("fundamentals").upsert(
-            {
-                "symbol": symbol,
-                "ai_summary": summary,
-                "ai_analyzed_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat(),
-            },
-            on_conflict="symbol",
-        ).execute()
+        await async_db.query(
+            lambda c: c.table("fundamentals").upsert(row, on_conflict="symbol"),
+            op="fundamentals.save_analysis",
+        )
     except Exception as e:
         log.error(f"Failed to save AI analysis for {symbol}: {e}")
 
@@ -236,10 +288,18 @@ async def analyze_single(symbol: str, force: bool = False) -> str | None:
 
     Returns the AI summary text, or None if skipped/failed.
     """
-    if not force and not _needs_analysis(symbol):
+    if not force and not await _needs_analysis(symbol):
         log.debug(f"AI analysis fresh for {symbol}, skipping")
         return None
 
+    scan_results, rankings = await asyncio.gather(_get_scan_results(), _get_apewisdom_rankings())
+    return await _analyze(symbol, scan_results, rankings)
+
+
+async def _analyze(
+    symbol: str, scan_results: list[dict], rankings: dict[str, list[dict]]
+) -> str | None:
+    """Analysis for one stock, given the inputs shared across a watchlist run."""
     log.info(f"Running AI analysis for {symbol}...")
 
     # Fetch data in parallel
@@ -247,14 +307,14 @@ async def analyze_single(symbol: str, force: bool = False) -> str | None:
     snap_task = get_stock_snapshot(symbol)
     fundamentals, snapshot = await asyncio.gather(fund_task, snap_task)
 
-    reddit_posts = _get_reddit_buzz(symbol)
-    apewisdom = _get_apewisdom_data(symbol)
+    reddit_posts = _reddit_posts(scan_results, symbol)
+    apewisdom = _apewisdom_entry(rankings, symbol)
 
     prompt = _build_prompt(symbol, fundamentals, snapshot, reddit_posts, apewisdom)
 
     try:
-        summary = await _call_ai(prompt, FUNDAMENTAL_SYSTEM)
-        _save_analysis(symbol, summary)
+        summary = await _call_ai(prompt, FUNDAMENTAL_SYSTEM, deadline=ANALYSIS_DEADLINE, workload="background")
+        await _save_analysis(symbol, summary)
         log.info(f"AI analysis complete for {symbol} ({len(summary)} chars)")
 
         activity.emit(
@@ -276,32 +336,51 @@ async def analyze_single(symbol: str, force: bool = False) -> str | None:
 async def analyze_watchlist(force: bool = False) -> dict[str, str]:
     """Run AI analysis for all active watchlist stocks.
 
-    Processes stocks sequentially to avoid rate limits.
+    Up to ANALYSIS_CONCURRENCY stocks run at once, open positions and
+    recently signalled symbols first; the AI calls themselves are paced by
+    the per-provider rate limits.
     Returns dict of symbol -> AI summary for newly analyzed stocks.
     """
-    symbols = _get_active_watchlist()
+    symbols = await _get_active_watchlist()
     if not symbols:
         # Fall back to config watchlist
         symbols = list(config.WATCHLIST)
 
-    log.info(f"Starting watchlist analysis for {len(symbols)} stocks...")
-
-    results: dict[str, str] = {}
-    analyzed = 0
-    skipped = 0
-
-    for symbol in symbols:
-        try:
-            summary = await analyze_single(symbol, force=force)
-            if summary:
-                results[symbol] = summary
-                analyzed += 1
-                # Small delay between API calls to avoid rate limits
-                await asyncio.sleep(2)
-            else:
-                skipped += 1
-        except Exception as e:
-            log.error(f"Analysis failed for {symbol}: {e}")
-
-    log.info(f"Watchlist analysis done: {analyzed} analyzed, {skipped} skipped (already fresh)")
+    stale = set(symbols) if force else await _stale_symbols(symbols)
+    skipped = len(symbols) - len(stale)
+    if not stale:
+        log.info(f"Watchlist analysis: all {len(symbols)} stocks already fresh")
+        return {}
+
+    priority, scan_results, rankings = await asyncio.gather(
+        _priorities(symbols), _get_scan_results(), _get_apewisdom_rankings()
+    )
+    queue = sorted((s for s in symbols if s in stale), key=lambda s: -priority.get(s, 0))
+    log.info(
+        f"Starting watchlist analysis for {len(queue)} stocks "
+        f"({skipped} already fresh, {ANALYSIS_CONCURRENCY} at a time): {', '.join(queue)}"
+    )
+
+    # Semaphore waiters are served in order, so higher priorities start first
+    slots = asyncio.Semaphore(ANALYSIS_CONCURRENCY)
+    start = time.perf_counter()
+
+    async def _run(symbol: str) -> tuple[str, str | None]:
+        async with slots:
+            try:
+                return symbol, await _analyze(symbol, scan_results, rankings)
+            except Exception as e:
+                log.error(f"Analysis failed for {symbol}: {e}")
+                return symbol, None
+
+    results = {
+        symbol: summary
+        for symbol, summary in await asyncio.gather(*(_run(s) for s in queue))
+        if summary
+    }
+
+    log.info(
+        f"Watchlist analysis done in {time.perf_counter() - start:.0f}s: "
+        f"{len(results)} analyzed, {len(queue) - len(results)} failed, {skipped} skipped (already fresh)"
+    )
     return results
@@ -0,0 +1,84 @@
+"""
+Incremental parsing of a streamed JSON object, one top-level field at a time.
+
+AI replies arrive token by token. The decision fields come first in the
+prompt contract, so they are complete long before the reasoning text that
+follows them. JSONFieldStream is fed the chunks as they arrive and hands
+back each top-level field as soon as its value is complete (for a batched
+reply, each symbol's whole decision object).
+
+Text before the opening brace (a ```json fence, stray prose) is skipped.
+It does not validate the whole reply; the caller still parses the complete
+text once the stream has finished.
+
+Usage:
+    parser = JSONFieldStream()
+    for chunk in chunks:
+        for key, value in parser.feed(chunk):
+            ...
+    parser.fields      # every completed field so far
+"""
+
+import json
+from typing import Any
+
+
+class JSONFieldStream:
+    """Yields the completed top-level fields of a JSON object while it streams in."""
+
+    def __init__(self):
+        self.fields: dict[str, Any] = {}
+        self.complete = False
+        self._buf: list[str] = []      # Text of the field being read
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        """Consume more text; returns the (key, value) pairs completed by it."""
+        completed = []
+        for ch in chunk:
+            if self.complete:
+                break
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._buf.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+            if (self._depth == 1 and ch == ",") or self._depth == 0:
+                field = self._close_field()
+                if field is not None:
+                    completed.append(field)
+                if self._depth == 0:
+                    self.complete = True
+                continue
+            self._buf.append(ch)
+        return completed
+
+    def _close_field(self) -> tuple[str, Any] | None:
+        text = "".join(self._buf).strip()
+        self._buf = []
+        if not text:
+            return None
+        try:
+            (key, value), = json.loads("{" + text + "}").items()
+        except ValueError:
+            return None  # Malformed field: the full parse will report it
+        self.fields[key] = value
+        return key, value
@@ -9,6 +9,7 @@ import json
 import asyncio
 from typing import Any
 
+from bot.ai.analyst import _call_gemini
 from bot.config import config
 from bot.utils.logger import log
 from bot.utils import activity
@@ -100,16 +101,10 @@ async def analyze_news_batch(
     )
 
     try:
-        from google import genai
-
-        client = genai.Client(api_key=config.GEMINI_API_KEY)
-        response = await client.aio.models.generate_content(
-            model=FLASH_MODEL,
-            contents=f"{NEWS_SYSTEM}\n\n{prompt}",
+        response_text = await _call_gemini(
+            prompt, NEWS_SYSTEM, model=FLASH_MODEL, provider="gemini_flash"
         )
 
-        response_text = response.text or ""
-
         # Parse JSON
         json_str = response_text.strip()
         if json_str.startswith("```"):
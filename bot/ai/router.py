@@ -0,0 +1,267 @@
+"""
+AI provider routing: deadlines, hedged requests and rolling provider stats.
+
+Every AI call goes through ProviderRouter.call(). It picks a primary
+provider from rolling latency/error stats, enforces a deadline on the whole
+call, and, if the primary hasn't answered within the hedge delay (or fails
+early), starts the next provider too. The first valid answer wins and the
+other request is cancelled. For a 5-minute bar, an on-time answer from
+the second-choice model is worth more than a late one from the first.
+
+Usage:
+    router = ProviderRouter([
+        Provider("claude", call_claude, lambda: bool(config.ANTHROPIC_API_KEY)),
+        Provider("gemini", call_gemini, lambda: bool(config.GEMINI_API_KEY)),
+    ])
+    text = await router.call(prompt, system, deadline=20, hedge_after=8, validate=is_json)
+"""
+
+import asyncio
+import statistics
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from bot.utils import metrics
+from bot.utils.logger import log
+from bot.utils.rate_limit import TokenBucket
+
+
+WINDOW = 50                 # Recent calls kept per provider for the rolling stats
+MIN_SAMPLES = 5             # Calls before stats can demote the configured order
+ERROR_PENALTY = 4.0         # Each unit of error rate counts as this many p50s of latency
+
+_calls = metrics.counter(
+    "tradebot_ai_router_attempts_total", "Routed AI requests by provider and outcome (ok, error, cancelled).", ["provider", "outcome"]
+)
+_deadline_misses = metrics.counter(
+    "tradebot_ai_deadline_misses_total", "AI calls with no valid answer before the deadline."
+)
+
+
+class AIDeadlineError(TimeoutError):
+    """No provider produced a valid answer before the deadline."""
+
+
+class Provider:
+    """One AI backend: its call function, availability check and rolling stats."""
+
+    def __init__(
+        self,
+        name: str,
+        call: Callable[..., Awaitable[str]],
+        enabled: Callable[[], bool],
+        limiter: TokenBucket | None = None,
+    ):
+        self.name = name
+        self.call = call
+        self.enabled = enabled
+        self.limiter = limiter
+        self._recent: deque[tuple[float, bool]] = deque(maxlen=WINDOW)  # (seconds, ok)
+        self.wins = 0
+        self.hedges = 0
+        self.cancelled = 0
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self._recent.append((seconds, ok))
+
+    def error_rate(self) -> float:
+        if not self._recent:
+            return 0.0
+        return sum(1 for _, ok in self._recent if not ok) / len(self._recent)
+
+    def p50(self) -> float | None:
+        latencies = [s for s, ok in self._recent if ok]
+        return statistics.median(latencies) if latencies else None
+
+    def score(self) -> float | None:
+        """Expected cost of routing here (lower is better); None without enough samples."""
+        if len(self._recent) < MIN_SAMPLES:
+            return None
+        p50 = self.p50()
+        if p50 is None:
+            return float("inf")
+        return p50 * (1 + ERROR_PENALTY * self.error_rate())
+
+    def stats(self) -> dict[str, Any]:
+        latencies = sorted(s for s, ok in self._recent if ok)
+        p90 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.9))] if latencies else None
+        p50 = self.p50()
+        return {
+            "enabled": self.enabled(),
+            "samples": len(self._recent),
+            "error_rate": round(self.error_rate(), 3),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p90_ms": round(p90 * 1000, 1) if p90 is not None else None,
+            "wins": self.wins,
+            "hedges": self.hedges,
+            "cancelled": self.cancelled,
+            "rate_limit": self.limiter.stats() if self.limiter else None,
+        }
+
+
+class ProviderRouter:
+    """Routes calls across providers with deadlines and hedging."""
+
+    def __init__(self, providers: list[Provider]):
+        self.providers = providers
+        self.deadline_misses = 0
+
+    def ranked(self) -> list[Provider]:
+        """
+        Enabled providers, best first.
+
+        Providers with enough samples are ordered by score; the configured
+        order breaks ties and ranks providers that don't have stats yet.
+        """
+        enabled = [p for p in self.providers if p.enabled()]
+        order = {p.name: i for i, p in enumerate(self.providers)}
+        scored = [p for p in enabled if p.score() is not None]
+        if len(scored) < 2:
+            return enabled
+
+        def key(p: Provider) -> tuple[float, int]:
+            score = p.score()
+            return (score if score is not None else float("inf"), order[p.name])
+
+        return sorted(enabled, key=key)
+
+    async def call(
+        self,
+        prompt: str,
+        system: str,
+        deadline: float,
+        hedge_after: float | None = None,
+        validate: Callable[[str], bool] | None = None,
+        stream: Callable[[str], Callable[[str], None]] | None = None,
+        pin: Callable[[], str | None] | None = None,
+        **kwargs: Any,
+    ) -> str:
+        """
+        First valid answer from the ranked providers.
+
+        Args:
+            prompt, system: Passed to the provider call (with **kwargs).
+            deadline: Seconds for the whole call, hedges included.
+            hedge_after: Start the next provider if no valid answer arrived
+                         after this many seconds (None/0 = only on failure).
+            validate: Returns False for answers that should not win (e.g.
+                      not parseable); the router keeps waiting for others.
+            stream: Stream the replies: called with the provider name for
+                    each attempt, returns the callback that attempt's text
+                    chunks go to. A provider that is already streaming is
+                    not stalled, so it is not hedged.
+            pin: Returns the name of the provider whose streamed answer the
+                 caller has already acted on (None until then). From then on
+                 only that provider's attempt can answer: other attempts are
+                 cancelled, and there is no hedging or failover.
+
+        Raises:
+            AIDeadlineError: Nothing valid before the deadline.
+            ValueError: No provider is configured.
+            Exception: The last provider error when every provider failed.
+        """
+        candidates = self.ranked()
+        if not candidates:
+            raise ValueError(
+                "No AI provider available (ANTHROPIC_API_KEY/GEMINI_API_KEY unset or no request budget)"
+            )
+
+        loop = asyncio.get_running_loop()
+        end = loop.time() + deadline
+        pending: dict[asyncio.Task, tuple[Provider, float]] = {}
+        waiting = list(candidates)
+        streaming: set[str] = set()        # Providers that have sent text
+        last_error: BaseException | None = None
+
+        async def _limited(provider: Provider, options: dict[str, Any]) -> str:
+            # Waiting for the rate limit counts as latency, so a throttled
+            # provider gets hedged (and ranked) like a slow one
+            if provider.limiter is not None:
+                await provider.limiter.acquire()
+            return await provider.call(prompt, system, **options)
+
+        def _start() -> None:
+            provider = waiting.pop(0)
+            if pending:
+                provider.hedges += 1
+                log.info(f"AI router: starting {provider.name} as a hedge")
+            options = kwargs
+            if stream is not None:
+                on_text = stream(provider.name)
+
+                def _on_text(text: str) -> None:
+                    streaming.add(provider.name)
+                    on_text(text)
+
+                options = {**kwargs, "on_text": _on_text}
+            task = asyncio.ensure_future(_limited(provider, options))
+            pending[task] = (provider, time.perf_counter())
+
+        def _hedge_due(elapsed: float) -> bool:
+            return bool(hedge_after) and elapsed >= hedge_after and not streaming
+
+        _start()
+        try:
+            while pending:
+                remaining = end - loop.time()
+                if remaining <= 0:
+                    break
+                # Wake up early if the next hedge is due before the deadline
+                timeout = remaining
+                if waiting and hedge_after and not streaming:
+                    timeout = min(timeout, max(hedge_after - (deadline - remaining), 0.0))
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                pinned = pin() if pin is not None else None
+                if pinned is not None:
+                    # The caller acted on this provider's partial answer: only it may finish
+                    waiting.clear()
+                    for task in [t for t, (p, _) in pending.items() if p.name != pinned]:
+                        done.discard(task)
+                        provider, _ = pending.pop(task)
+                        task.cancel()
+                        provider.cancelled += 1
+                        _calls.labels(provider=provider.name, outcome="cancelled").inc()
+
+                for task in done:
+                    provider, started = pending.pop(task)
+                    streaming.discard(provider.name)
+                    seconds = time.perf_counter() - started
+                    error = task.exception()
+                    if error is None and (validate is None or validate(task.result())):
+                        provider.record(seconds, ok=True)
+                        provider.wins += 1
+                        _calls.labels(provider=provider.name, outcome="ok").inc()
+                        return task.result()
+                    provider.record(seconds, ok=False)
+                    _calls.labels(provider=provider.name, outcome="error").inc()
+                    last_error = error or ValueError(f"{provider.name} returned an invalid answer")
+                    log.warning(f"AI router: {provider.name} failed after {seconds:.1f}s: {last_error}")
+
+                elapsed = deadline - (end - loop.time())
+                if waiting and (not pending or _hedge_due(elapsed)):
+                    _start()
+                elif not pending:
+                    raise last_error
+
+            # Deadline: providers still running count as failures in their stats
+            for provider, started in pending.values():
+                provider.record(time.perf_counter() - started, ok=False)
+        finally:
+            for task, (provider, _) in pending.items():
+                task.cancel()
+                provider.cancelled += 1
+                _calls.labels(provider=provider.name, outcome="cancelled").inc()
+
+        self.deadline_misses += 1
+        _deadline_misses.inc()
+        raise AIDeadlineError(f"No AI answer within {deadline:g}s")
+
+    def stats(self) -> dict[str, Any]:
+        """Per-provider rolling stats and the current routing order."""
+        return {
+            "order": [p.name for p in self.ranked()],
+            "deadline_misses": self.deadline_misses,
+            "providers": {p.name: p.stats() for p in self.providers},
+        }
@@ -489,3 +489,148 @@ def detect_all_patterns(df: pd.DataFrame) -> list[dict[str, Any]]:
 
     all_signals.sort(key=lambda s: s["index"])
     return all_signals
+
+
+# ── Vectorized detection (many symbols at once) ──────────────
+
+def _shift(a: np.ndarray, k: int) -> np.ndarray:
+    """a shifted k bars later along the time axis (first k bars become NaN)."""
+    out = np.full_like(a, np.nan)
+    out[:, k:] = a[:, :-k]
+    return out
+
+
+def detect_recent_patterns_array(
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    timestamps: list | None = None,
+    lookback: int = 2,
+) -> list[list[dict[str, Any]]]:
+    """
+    Detect all patterns on the last `lookback` bars of many symbols at once.
+
+    Same rules and output as detect_all_patterns() (restricted to those bars),
+    but evaluated as boolean masks over (symbols x bars) arrays.
+
+    Args:
+        opens, highs, lows, closes: Float arrays of shape (symbols, bars).
+        timestamps: Bar timestamps shared by all symbols (optional).
+        lookback: Number of most recent bars to report patterns for.
+
+    Returns:
+        Per-symbol lists of pattern signals, sorted by index.
+    """
+    o, h, l, c = (np.asarray(a, dtype=float) for a in (opens, highs, lows, closes))
+    n_bars = o.shape[1]
+    start = max(n_bars - lookback, 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = h - l
+        body = np.abs(c - o)
+        upper = h - np.maximum(c, o)
+        lower = np.minimum(c, o) - l
+        bullish = c > o
+        bearish = c < o
+        has_range = r != 0
+        ratio = body / r
+
+        o1, c1, body1 = _shift(o, 1), _shift(c, 1), _shift(body, 1)
+        bullish1, bearish1 = c1 > o1, c1 < o1
+        o2, c2, body2 = _shift(o, 2), _shift(c, 2), _shift(body, 2)
+        r1, r2 = _shift(r, 1), _shift(r, 2)
+        bullish2, bearish2 = c2 > o2, c2 < o2
+
+        # Single candle
+        doji = has_range & (ratio < 0.1)
+        dragonfly = doji & (upper < r * 0.1)
+        gravestone = doji & ~dragonfly & (lower < r * 0.1)
+        long_legged = doji & ~dragonfly & ~gravestone & (upper > r * 0.3) & (lower > r * 0.3)
+        plain_doji = doji & ~dragonfly & ~gravestone & ~long_legged
+
+        small_body = has_range & (body < r * 0.35)
+        hammer_shape = small_body & (lower > body * 2) & (upper < body * 0.5)
+        inverted_shape = small_body & (upper > body * 2) & (lower < body * 0.5)
+        hammer = hammer_shape & (c < c1)
+        inverted_hammer = inverted_shape & (c < c1)
+        shooting_star = inverted_shape & (c > c1)
+
+        marubozu = has_range & (body > r * 0.85) & (upper < r * 0.08) & (lower < r * 0.08)
+        spinning_top = has_range & (ratio > 0.1) & (ratio < 0.35) & (upper > body * 0.5) & (lower > body * 0.5)
+
+        # Double candle
+        engulf_ratio = np.where(body1 > 0, np.round(body / body1, 4), 999)
+        bull_engulf = bearish1 & bullish & (o <= c1) & (c >= o1) & (body > body1)
+        bear_engulf = bullish1 & bearish & (o >= c1) & (c <= o1) & (body > body1)
+
+        inside = (np.maximum(o, c) < np.maximum(o1, c1)) & (np.minimum(o, c) > np.minimum(o1, c1))
+        harami = inside & (body < body1 * 0.6)
+        bull_harami = harami & bearish1 & bullish
+        bear_harami = harami & bullish1 & bearish
+
+        prev_mid = (o1 + c1) / 2
+        piercing = bearish1 & bullish & (o < c1) & (c > prev_mid) & (c < o1)
+        dark_cloud = bullish1 & bearish & (o > c1) & (c < prev_mid) & (c > o1)
+
+        # Triple candle (first = 2 bars back, second = previous bar)
+        star_ok = ~((body2 == 0) | (body1 > body2 * 0.5)) & ~np.isnan(body2)
+        first_mid = (o2 + c2) / 2
+        morning = star_ok & bearish2 & bullish & (c > first_mid) & (body > body1)
+        evening = star_ok & bullish2 & bearish & (c < first_mid) & (body > body1)
+
+        strong = body > r * 0.5
+        strong1, strong2 = body1 > r1 * 0.5, body2 > r2 * 0.5
+        soldiers = (
+            bullish2 & bullish1 & bullish & (c1 > c2) & (c > c1) & (o1 > o2) & (o > o1)
+            & strong2 & strong1 & strong
+        )
+        crows = (
+            bearish2 & bearish1 & bearish & (c1 < c2) & (c < c1) & (o1 < o2) & (o < o1)
+            & strong2 & strong1 & strong
+        )
+
+    # (mask, name, direction, strength, details) in detect_all_patterns order
+    specs = [
+        (dragonfly, "dragonfly_doji", "neutral", 0.5, ("body_ratio", ratio)),
+        (gravestone, "gravestone_doji", "neutral", 0.5, ("body_ratio", ratio)),
+        (long_legged, "long_legged_doji", "neutral", 0.5, ("body_ratio", ratio)),
+        (plain_doji, "doji", "neutral", 0.5, ("body_ratio", ratio)),
+        (hammer, "hammer", "long", 0.7, ("lower_shadow_ratio", lower / np.where(has_range, r, 1))),
+        (inverted_hammer, "inverted_hammer", "long", 0.6, ("upper_shadow_ratio", upper / np.where(has_range, r, 1))),
+        (shooting_star, "shooting_star", "short", 0.7, ("upper_shadow_ratio", upper / np.where(has_range, r, 1))),
+        (marubozu & bullish, "bullish_marubozu", "long", 0.8, ("body_ratio", ratio)),
+        (marubozu & ~bullish, "bearish_marubozu", "short", 0.8, ("body_ratio", ratio)),
+        (spinning_top, "spinning_top", "neutral", 0.4, ("body_ratio", ratio)),
+        (bull_engulf, "bullish_engulfing", "long", 0.8, ("body_ratio", engulf_ratio)),
+        (bear_engulf, "bearish_engulfing", "short", 0.8, ("body_ratio", engulf_ratio)),
+        (bull_harami, "bullish_harami", "long", 0.65, None),
+        (bear_harami, "bearish_harami", "short", 0.65, None),
+        (piercing, "piercing_line", "long", 0.7, None),
+        (dark_cloud, "dark_cloud_cover", "short", 0.7, None),
+        (morning, "morning_star", "long", 0.85, None),
+        (evening, "evening_star", "short", 0.85, None),
+        (soldiers, "three_white_soldiers", "long", 0.9, None),
+        (crows, "three_black_crows", "short", 0.9, None),
+    ]
+
+    # nonzero() on (symbols, bars, patterns) yields symbol -> index -> pattern order
+    stacked = np.stack([spec[0][:, start:] for spec in specs], axis=-1)
+    results: list[list[dict[str, Any]]] = [[] for _ in range(o.shape[0])]
+    for sym, t, k in zip(*np.nonzero(stacked)):
+        _, name, direction, strength, detail = specs[k]
+        idx = start + int(t)
+        details = {}
+        if detail is not None:
+            key, values = detail
+            value = values[sym, idx]
+            details[key] = value if name.endswith("engulfing") else round(value, 4)
+        results[sym].append({
+            "index": idx,
+            "timestamp": timestamps[idx] if timestamps is not None else None,
+            "name": name,
+            "direction": direction,
+            "strength": strength,
+            "details": details,
+        })
+    return results
@@ -3,6 +3,7 @@ Technical indicators: RSI, MACD, EMA, VWAP, Bollinger Bands.
 Uses the `ta` library for calculation.
 """
 
+import numpy as np
 import pandas as pd
 from ta.momentum import RSIIndicator
 from ta.trend import MACD, EMAIndicator, SMAIndicator
@@ -88,12 +89,15 @@ def get_indicator_summary(df: pd.DataFrame) -> dict[str, Any]:
     """
     if len(df) == 0:
         return {}
+    return _summarize(df.iloc[-1])
 
-    last = df.iloc[-1]
+
+def _summarize(last) -> dict[str, Any]:
+    """Indicator summary from the last row (a Series or a plain dict of values)."""
     summary = {}
 
     # RSI
-    if "rsi_14" in df.columns and pd.notna(last.get("rsi_14")):
+    if "rsi_14" in last and pd.notna(last.get("rsi_14")):
         rsi = last["rsi_14"]
         summary["rsi"] = {
             "value": round(rsi, 2),
@@ -101,7 +105,7 @@ def get_indicator_summary(df: pd.DataFrame) -> dict[str, Any]:
         }
 
     # MACD
-    if "macd" in df.columns and pd.notna(last.get("macd")):
+    if "macd" in last and pd.notna(last.get("macd")):
         summary["macd"] = {
             "value": round(last["macd"], 4),
             "signal_line": round(last["macd_signal"], 4) if pd.notna(last.get("macd_signal")) else None,
@@ -110,7 +114,7 @@ def get_indicator_summary(df: pd.DataFrame) -> dict[str, Any]:
         }
 
     # EMA crossover
-    if "ema_9" in df.columns and "ema_20" in df.columns:
+    if "ema_9" in last and "ema_20" in last:
         if pd.notna(last.get("ema_9")) and pd.notna(last.get("ema_20")):
             summary["ema_cross"] = {
                 "ema_9": round(last["ema_9"], 2),
@@ -119,7 +123,7 @@ def get_indicator_summary(df: pd.DataFrame) -> dict[str, Any]:
             }
 
     # Bollinger Bands
-    if "bb_upper" in df.columns and pd.notna(last.get("bb_upper")):
+    if "bb_upper" in last and pd.notna(last.get("bb_upper")):
         close = last["close"]
         summary["bollinger"] = {
             "upper": round(last["bb_upper"], 2),
@@ -135,10 +139,128 @@ def get_indicator_summary(df: pd.DataFrame) -> dict[str, Any]:
         }
 
     # Price vs VWAP
-    if "vwap_calc" in df.columns and pd.notna(last.get("vwap_calc")):
+    if "vwap_calc" in last and pd.notna(last.get("vwap_calc")):
         summary["vwap"] = {
             "value": round(last["vwap_calc"], 2),
             "signal": "above" if last["close"] > last["vwap_calc"] else "below",
         }
 
     return summary
+
+
+# ── Vectorized summary (many symbols at once) ────────────────
+
+def _ewm(x: np.ndarray, com: float, min_periods: int) -> np.ndarray:
+    """
+    pandas ewm(com=..., adjust=False, min_periods=...).mean() along axis 1.
+
+    pandas runs a compiled loop per symbol, which is fastest for few, long
+    series. For wide universes of short windows, replicate its recursion
+    (including how weights decay across NaN gaps) and step all symbols in
+    lockstep instead.
+    """
+    n_symbols, n_bars = x.shape
+    if n_symbols <= n_bars:
+        return (
+            pd.DataFrame(x.T).ewm(com=com, adjust=False, min_periods=min_periods)
+            .mean().to_numpy().T
+        )
+
+    alpha = 1.0 / (1.0 + com)
+    decay = 1.0 - alpha
+    out = np.full_like(x, np.nan)
+    weighted = x[:, 0].copy()
+    old_wt = np.ones(n_symbols)
+    nobs = (~np.isnan(weighted)).astype(int)
+    min_periods = max(min_periods, 1)
+    out[:, 0] = np.where(nobs >= min_periods, weighted, np.nan)
+    for t in range(1, n_bars):
+        cur = x[:, t]
+        is_obs = ~np.isnan(cur)
+        nobs += is_obs
+        started = ~np.isnan(weighted)
+        old_wt = np.where(started, old_wt * decay, old_wt)
+        blended = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+        update = started & is_obs
+        weighted = np.where(update & (weighted != cur), blended, weighted)
+        old_wt = np.where(update, 1.0, old_wt)
+        weighted = np.where(~started & is_obs, cur, weighted)
+        out[:, t] = np.where(nobs >= min_periods, weighted, np.nan)
+    return out
+
+
+def _ema_span(x: np.ndarray, span: int) -> np.ndarray:
+    return _ewm(x, (span - 1) / 2, span)
+
+
+def indicator_summaries(
+    highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, volumes: np.ndarray
+) -> list[dict[str, Any]]:
+    """
+    get_indicator_summary(add_all_indicators(df)) for many symbols at once.
+
+    Args:
+        highs, lows, closes, volumes: Arrays of shape (symbols, bars).
+
+    Returns:
+        Per-symbol summary dicts (same shape as get_indicator_summary).
+    """
+    h, l, c, v = (np.asarray(a, dtype=float) for a in (highs, lows, closes, volumes))
+    n_symbols, n_bars = c.shape
+    if n_bars == 0:
+        return [{} for _ in range(n_symbols)]
+    nan = np.full(n_symbols, np.nan)
+
+    # RSI (Wilder smoothing, as ta.momentum.RSIIndicator)
+    diff = np.diff(c, axis=1, prepend=np.nan)
+    up = np.where(diff > 0, diff, 0.0)
+    down = -np.where(diff < 0, diff, 0.0)
+    rsi_com = (1 - 1 / 14) / (1 / 14)
+    emaup = _ewm(up, rsi_com, 14)[:, -1]
+    emadn = _ewm(down, rsi_com, 14)[:, -1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(emadn == 0, 100, 100 - (100 / (1 + emaup / emadn)))
+    rsi = np.where(np.isnan(emadn), np.nan, rsi)
+
+    # MACD (12/26/9)
+    macd_line = _ema_span(c, 12) - _ema_span(c, 26)
+    macd_signal = _ema_span(macd_line, 9)[:, -1]
+    macd = macd_line[:, -1]
+
+    # EMA 9/20
+    ema_9 = _ema_span(c, 9)[:, -1]
+    ema_20 = _ema_span(c, 20)[:, -1]
+
+    # Bollinger Bands (20, 2 std, population std). pandas' rolling sums carry
+    # state over the whole series, so use them rather than a mean of the last
+    # 20 closes, which can round differently.
+    if n_bars >= 20:
+        rolling = pd.DataFrame(c.T).rolling(20, min_periods=20)
+        mavg = rolling.mean().to_numpy()[-1]
+        mstd = rolling.std(ddof=0).to_numpy()[-1]
+        bb_upper, bb_lower = mavg + 2 * mstd, mavg - 2 * mstd
+    else:
+        mavg = bb_upper = bb_lower = nan
+
+    # VWAP over the whole window (sequential sums, like add_vwap's cumsum)
+    cum_vol = np.cumsum(v, axis=1)[:, -1]
+    cum_tp_vol = np.cumsum((h + l + c) / 3 * v, axis=1)[:, -1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vwap = np.where(cum_vol != 0, cum_tp_vol / cum_vol, np.nan)
+
+    summaries = []
+    for i in range(n_symbols):
+        summaries.append(_summarize({
+            "close": c[i, -1],
+            "rsi_14": rsi[i],
+            "macd": macd[i],
+            "macd_signal": macd_signal[i],
+            "macd_hist": macd[i] - macd_signal[i],
+            "ema_9": ema_9[i],
+            "ema_20": ema_20[i],
+            "bb_upper": bb_upper[i],
+            "bb_middle": mavg[i],
+            "bb_lower": bb_lower[i],
+            "vwap_calc": vwap[i],
+        }))
+    return summaries
@@ -2,13 +2,49 @@
 Price action analysis: support/resistance, trend detection, breakouts.
 """
 
+import threading
 import pandas as pd
 import numpy as np
-from typing import Any
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator
 
 
 # ── Support & Resistance ─────────────────────────────────────
 
+def _rolling_extreme(values: np.ndarray, size: int, op: np.ufunc) -> np.ndarray:
+    """
+    Extreme of every full window of `size` values, in O(n) (van Herk/Gil-Werman).
+
+    The array is split into blocks of `size`; each window spans at most two
+    blocks, so its extreme is op(suffix-scan of the first, prefix-scan of the
+    second). Works along the last axis; returns n - size + 1 results where
+    result[..., j] covers values[..., j : j + size].
+    """
+    n = values.shape[-1]
+    lead = values.shape[:-1]
+    fill = -np.inf if op is np.maximum else np.inf
+    padded = np.full(lead + (-(-n // size) * size,), fill)
+    padded[..., :n] = values
+    blocks = padded.reshape(lead + (-1, size))
+    prefix = op.accumulate(blocks, axis=-1).reshape(padded.shape)
+    suffix = op.accumulate(blocks[..., ::-1], axis=-1)[..., ::-1].reshape(padded.shape)
+    return op(suffix[..., : n - size + 1], prefix[..., size - 1 : n])
+
+
+def _swing_points(
+    highs: np.ndarray, lows: np.ndarray, half: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Swing highs/lows: bars that are the extreme of the window centred on them."""
+    size = 2 * half + 1
+    if len(highs) < size:
+        return np.empty(0), np.empty(0)
+    centre = slice(half, len(highs) - half)
+    swing_highs = highs[centre][highs[centre] == _rolling_extreme(highs, size, np.maximum)]
+    swing_lows = lows[centre][lows[centre] == _rolling_extreme(lows, size, np.minimum)]
+    return swing_highs, swing_lows
+
+
 def find_support_resistance(
     df: pd.DataFrame, window: int = 20, tolerance_pct: float = 0.005
 ) -> dict[str, list[float]]:
@@ -23,20 +59,9 @@ def find_support_resistance(
     Returns:
         Dict with 'support' and 'resistance' price levels.
     """
-    highs = df["high"].values
-    lows = df["low"].values
-
-    swing_highs = []
-    swing_lows = []
-
-    half = window // 2
-    for i in range(half, len(df) - half):
-        # Swing high: highest in window
-        if highs[i] == max(highs[i - half : i + half + 1]):
-            swing_highs.append(highs[i])
-        # Swing low: lowest in window
-        if lows[i] == min(lows[i - half : i + half + 1]):
-            swing_lows.append(lows[i])
+    swing_highs, swing_lows = _swing_points(
+        df["high"].to_numpy(dtype=float), df["low"].to_numpy(dtype=float), window // 2
+    )
 
     # Cluster nearby levels
     resistance = _cluster_levels(swing_highs, tolerance_pct)
@@ -45,31 +70,305 @@ def find_support_resistance(
     return {"support": support, "resistance": resistance}
 
 
-def _cluster_levels(levels: list[float], tolerance_pct: float) -> list[float]:
-    """Cluster nearby price levels into zones."""
-    if not levels:
+def _cluster_levels(levels, tolerance_pct: float) -> list[float]:
+    """Cluster nearby price levels into zones (single pass with a running mean)."""
+    if len(levels) == 0:
         return []
 
-    sorted_levels = sorted(levels)
-    clusters: list[list[float]] = [[sorted_levels[0]]]
+    sorted_levels = np.sort(np.asarray(levels, dtype=float))
+    starts = [0]
+    total, count = sorted_levels[0], 1
 
-    for level in sorted_levels[1:]:
-        cluster_avg = np.mean(clusters[-1])
+    for i in range(1, len(sorted_levels)):
+        level = sorted_levels[i]
+        cluster_avg = total / count
         if abs(level - cluster_avg) / cluster_avg < tolerance_pct:
-            clusters[-1].append(level)
+            total += level
+            count += 1
         else:
-            clusters.append([level])
+            starts.append(i)
+            total, count = level, 1
+    starts.append(len(sorted_levels))
 
     # Return the average of each cluster, weighted by count (stronger if tested more)
-    return [round(float(np.mean(c)), 2) for c in clusters if len(c) >= 2]
+    return [
+        round(float(np.mean(sorted_levels[a:b])), 2)
+        for a, b in zip(starts, starts[1:])
+        if b - a >= 2
+    ]
+
+
+class SwingTracker:
+    """
+    Incremental support/resistance for one symbol.
+
+    Keeps monotonic deques over the trailing swing window, so each new bar
+    confirms (or not) the bar `half` positions back in O(1) amortized time
+    instead of rescanning the whole frame. levels() matches
+    find_support_resistance() run on the last `lookback` bars.
+    Fed by SymbolState.
+    """
+
+    def __init__(self, lookback: int, window: int = 20, tolerance_pct: float = 0.005):
+        self.lookback = lookback
+        self.half = window // 2
+        self.size = 2 * self.half + 1
+        self.tolerance_pct = tolerance_pct
+        self._count = 0                                 # Bars seen so far
+        self._bars: deque[tuple[float, float]] = deque(maxlen=self.size)
+        self._max_idx: deque[int] = deque()             # Decreasing highs in window
+        self._min_idx: deque[int] = deque()             # Increasing lows in window
+        self._swing_highs: deque[tuple[int, float]] = deque()
+        self._swing_lows: deque[tuple[int, float]] = deque()
+        self._levels: dict[str, list[float]] | None = None
+
+    def update(self, high: float, low: float) -> None:
+        """Add the next bar and confirm the swing candidate that is now centred."""
+        t = self._count
+        self._count += 1
+        self._bars.append((high, low))
+        self._levels = None
+        first = t - len(self._bars) + 1
+
+        while self._max_idx and self._bars[self._max_idx[-1] - first][0] <= high:
+            self._max_idx.pop()
+        self._max_idx.append(t)
+        while self._min_idx and self._bars[self._min_idx[-1] - first][1] >= low:
+            self._min_idx.pop()
+        self._min_idx.append(t)
+        while self._max_idx[0] < first:
+            self._max_idx.popleft()
+        while self._min_idx[0] < first:
+            self._min_idx.popleft()
+
+        if len(self._bars) == self.size:
+            centre_high, centre_low = self._bars[self.half]
+            if centre_high == self._bars[self._max_idx[0] - first][0]:
+                self._swing_highs.append((t - self.half, centre_high))
+            if centre_low == self._bars[self._min_idx[0] - first][1]:
+                self._swing_lows.append((t - self.half, centre_low))
+
+        # Swings only count while their whole window is inside the lookback
+        oldest = t - self.lookback + 1 + self.half
+        for swings in (self._swing_highs, self._swing_lows):
+            while swings and swings[0][0] < oldest:
+                swings.popleft()
+
+    def levels(self) -> dict[str, list[float]]:
+        """Current clustered support/resistance levels (cached until the next bar)."""
+        if self._levels is None:
+            self._levels = {
+                "support": _cluster_levels([p for _, p in self._swing_lows], self.tolerance_pct),
+                "resistance": _cluster_levels([p for _, p in self._swing_highs], self.tolerance_pct),
+            }
+        return {k: list(v) for k, v in self._levels.items()}
+
+
+# ── Shared bar features ──────────────────────────────────────
+
+FEATURE_LOOKBACK = 20
+
+_NO_FEATURES = {
+    "bars": 0, "higher_highs": 0, "higher_lows": 0, "lower_highs": 0, "lower_lows": 0,
+    "avg_volume": 0.0, "current_volume": 0.0, "relative_volume": 0.0,
+}
+
+
+def compute_features(df: pd.DataFrame, lookback: int = FEATURE_LOOKBACK) -> dict[str, Any]:
+    """
+    One NumPy pass over the last `lookback` bars, shared by trend/volume/breakout.
+
+    Returns:
+        Dict with 'bars' (frame length), higher/lower high/low counts over
+        consecutive bars, 'avg_volume' (mean of the last `lookback` volumes, or
+        fewer if the frame is shorter), 'current_volume' and 'relative_volume'.
+    """
+    n = len(df)
+    if n == 0:
+        return dict(_NO_FEATURES)
+    tail = df.iloc[-lookback:]
+    dh = np.diff(tail["high"].to_numpy(dtype=float))
+    dl = np.diff(tail["low"].to_numpy(dtype=float))
+    volumes = tail["volume"].to_numpy(dtype=float)
+    avg_volume = float(volumes.mean())
+    current = float(volumes[-1])
+    return {
+        "bars": n,
+        "higher_highs": int((dh > 0).sum()),
+        "higher_lows": int((dl > 0).sum()),
+        "lower_highs": int((dh < 0).sum()),
+        "lower_lows": int((dl < 0).sum()),
+        "avg_volume": avg_volume,
+        "current_volume": current,
+        "relative_volume": current / avg_volume if avg_volume else 0.0,
+    }
+
+
+class FeatureWindow:
+    """
+    compute_features() maintained one bar at a time.
+
+    Pair counts and the volume sum are adjusted as bars enter and leave the
+    window, so each update is O(1).
+    """
+
+    def __init__(self, lookback: int = FEATURE_LOOKBACK):
+        self.lookback = lookback
+        self.bars = 0
+        self._window: deque[tuple[float, float, float]] = deque()
+        self._counts = {"higher_highs": 0, "higher_lows": 0, "lower_highs": 0, "lower_lows": 0}
+        self._volume_sum = 0.0
+
+    def _count_pair(self, a: tuple, b: tuple, sign: int) -> None:
+        c = self._counts
+        c["higher_highs"] += sign * (b[0] > a[0])
+        c["lower_highs"] += sign * (b[0] < a[0])
+        c["higher_lows"] += sign * (b[1] > a[1])
+        c["lower_lows"] += sign * (b[1] < a[1])
+
+    def update(self, high: float, low: float, volume: float) -> None:
+        """Add the next bar."""
+        bar = (high, low, volume)
+        window = self._window
+        if window:
+            self._count_pair(window[-1], bar, +1)
+        window.append(bar)
+        self._volume_sum += volume
+        if len(window) > self.lookback:
+            old = window.popleft()
+            self._count_pair(old, window[0], -1)
+            self._volume_sum -= old[2]
+        self.bars += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Same shape as compute_features() over the bars fed so far."""
+        if not self._window:
+            return dict(_NO_FEATURES)
+        avg_volume = self._volume_sum / len(self._window)
+        current = self._window[-1][2]
+        return {
+            "bars": self.bars,
+            **self._counts,
+            "avg_volume": avg_volume,
+            "current_volume": current,
+            "relative_volume": current / avg_volume if avg_volume else 0.0,
+        }
+
+
+def compute_features_array(
+    highs: np.ndarray, lows: np.ndarray, volumes: np.ndarray, lookback: int = FEATURE_LOOKBACK
+) -> list[dict[str, Any]]:
+    """compute_features() for many symbols at once; arrays are (symbols, bars)."""
+    n_symbols, n_bars = highs.shape
+    if n_bars == 0:
+        return [dict(_NO_FEATURES) for _ in range(n_symbols)]
+    dh = np.diff(highs[:, -lookback:], axis=1)
+    dl = np.diff(lows[:, -lookback:], axis=1)
+    avg_volume = volumes[:, -lookback:].mean(axis=1)
+    current = volumes[:, -1]
+    counts = {
+        "higher_highs": (dh > 0).sum(axis=1),
+        "higher_lows": (dl > 0).sum(axis=1),
+        "lower_highs": (dh < 0).sum(axis=1),
+        "lower_lows": (dl < 0).sum(axis=1),
+    }
+    out = []
+    for i in range(n_symbols):
+        avg, cur = float(avg_volume[i]), float(current[i])
+        out.append({
+            "bars": n_bars,
+            **{k: int(v[i]) for k, v in counts.items()},
+            "avg_volume": avg,
+            "current_volume": cur,
+            "relative_volume": cur / avg if avg else 0.0,
+        })
+    return out
+
+
+# ── Incremental per-symbol state ─────────────────────────────
+
+class SymbolState:
+    """
+    Swing levels and bar features for one symbol, kept in step with its frame.
+
+    sync() feeds only the bars newer than the last one seen; it returns False
+    when the frame doesn't continue this state (gap, reload, resized lookback).
+    """
+
+    def __init__(self, lookback: int):
+        self.lookback = lookback
+        self.last_timestamp = None
+        self.swings = SwingTracker(lookback=lookback)
+        self.features = FeatureWindow()
+
+    def sync(self, df: pd.DataFrame) -> bool:
+        timestamps = df["timestamp"]
+        n = len(timestamps)
+        if n != self.lookback:
+            return False
+        start = 0
+        if self.last_timestamp is not None:
+            # New bars are appended at the end, so search backwards
+            for i in range(n - 1, -1, -1):
+                if timestamps.iat[i] == self.last_timestamp:
+                    start = i + 1
+                    break
+            else:
+                return False
+
+        highs, lows, volumes = df["high"], df["low"], df["volume"]
+        for i in range(start, n):
+            high, low = float(highs.iat[i]), float(lows.iat[i])
+            self.swings.update(high, low)
+            self.features.update(high, low, float(volumes.iat[i]))
+        if start < n:
+            self.last_timestamp = timestamps.iat[n - 1]
+        return True
+
+
+# Bars (on the stream loop) and rescans (on the main loop) analyze the same
+# symbols from different threads; each symbol's state has its own lock
+_states: dict[str, SymbolState] = {}
+_state_locks: dict[str, threading.Lock] = {}
+_state_locks_lock = threading.Lock()
+
+
+@contextmanager
+def symbol_state(symbol: str, df: pd.DataFrame) -> Iterator[SymbolState]:
+    """
+    Incremental state for a symbol's latest frame (rebuilt when it doesn't continue).
+
+    The symbol's lock is held for the with-block, so read what you need from
+    the state inside it.
+    """
+    with _state_locks_lock:
+        lock = _state_locks.setdefault(symbol, threading.Lock())
+    with lock:
+        state = _states.get(symbol)
+        if state is None or not state.sync(df):
+            state = SymbolState(lookback=len(df))
+            state.sync(df)
+            _states[symbol] = state
+        yield state
+
+
+def clear_states() -> None:
+    """Drop all incremental per-symbol state (next call per symbol rebuilds it)."""
+    with _state_locks_lock:
+        _states.clear()
 
 
 # ── Trend Detection ──────────────────────────────────────────
 
-def detect_trend(df: pd.DataFrame, lookback: int = 20) -> dict[str, Any]:
+def detect_trend(
+    df: pd.DataFrame, lookback: int = 20, features: dict[str, Any] | None = None
+) -> dict[str, Any]:
     """
     Detect the current trend using higher highs/lows analysis.
 
+    Args:
+        features: Precomputed compute_features() for the same lookback (optional).
+
     Returns:
         Dict with 'trend' ('uptrend', 'downtrend', 'sideways'),
         'strength' (0-1), and details.
@@ -77,15 +376,18 @@ def detect_trend(df: pd.DataFrame, lookback: int = 20) -> dict[str, Any]:
     if len(df) < lookback:
         return {"trend": "sideways", "strength": 0.0, "details": {}}
 
-    recent = df.tail(lookback)
-    highs = recent["high"].values
-    lows = recent["low"].values
+    if features is None:
+        features = compute_features(df, lookback)
+    return _score_trend(features, lookback)
 
+
+def _score_trend(features: dict[str, Any], lookback: int = 20) -> dict[str, Any]:
+    """Trend verdict from higher/lower high/low counts (see detect_trend)."""
     # Count higher highs and higher lows
-    hh_count = sum(1 for i in range(1, len(highs)) if highs[i] > highs[i - 1])
-    hl_count = sum(1 for i in range(1, len(lows)) if lows[i] > lows[i - 1])
-    lh_count = sum(1 for i in range(1, len(highs)) if highs[i] < highs[i - 1])
-    ll_count = sum(1 for i in range(1, len(lows)) if lows[i] < lows[i - 1])
+    hh_count = features["higher_highs"]
+    hl_count = features["higher_lows"]
+    lh_count = features["lower_highs"]
+    ll_count = features["lower_lows"]
 
     total = lookback - 1
     uptrend_score = (hh_count + hl_count) / (2 * total)
@@ -115,10 +417,35 @@ def detect_trend(df: pd.DataFrame, lookback: int = 20) -> dict[str, Any]:
 
 # ── Breakout Detection ───────────────────────────────────────
 
+def _key_level_points(key_levels: dict[str, Any] | None) -> list[tuple[str, float]]:
+    """
+    (source, price) pairs from level_service key levels, most significant first.
+
+    Opening range levels only count once the range is complete.
+    """
+    if not key_levels:
+        return []
+    out: list[tuple[str, float]] = []
+    prior = key_levels.get("prior_day")
+    if prior:
+        out += [("prior_day_high", prior["high"]), ("prior_day_low", prior["low"]),
+                ("prior_day_close", prior["close"])]
+    rng = key_levels.get("opening_range")
+    if rng and rng.get("complete"):
+        out += [("opening_range_high", rng["high"]), ("opening_range_low", rng["low"])]
+    for timeframe in ("daily", "hourly"):
+        levels = key_levels.get(timeframe) or {}
+        out += [(f"{timeframe}_resistance", p) for p in levels.get("resistance", [])]
+        out += [(f"{timeframe}_support", p) for p in levels.get("support", [])]
+    return out
+
+
 def detect_breakout(
     df: pd.DataFrame,
     support_resistance: dict[str, list[float]] | None = None,
     volume_multiplier: float = 1.5,
+    key_levels: dict[str, Any] | None = None,
+    features: dict[str, Any] | None = None,
 ) -> list[dict[str, Any]]:
     """
     Detect price breakouts above resistance or below support.
@@ -127,6 +454,10 @@ def detect_breakout(
         df: DataFrame with OHLCV data.
         support_resistance: Pre-computed S/R levels (or computed fresh).
         volume_multiplier: Volume must be this much above average for confirmation.
+        key_levels: Higher-timeframe levels from level_service (optional). At most
+                    one breakout per direction is added from these, and only when
+                    the intraday levels didn't already produce one.
+        features: Precomputed compute_features() (optional).
 
     Returns:
         List of breakout signals.
@@ -137,19 +468,37 @@ def detect_breakout(
     if len(df) < 2:
         return []
 
-    signals = []
     curr = df.iloc[-1]
     prev = df.iloc[-2]
-    avg_volume = df["volume"].tail(20).mean()
-
-    volume_confirmed = curr["volume"] > avg_volume * volume_multiplier
+    if features is None:
+        features = compute_features(df)
+
+    return _find_breakouts(
+        len(df) - 1, curr.get("timestamp"), prev["close"], curr["close"],
+        support_resistance, features, volume_multiplier, key_levels,
+    )
+
+
+def _find_breakouts(
+    index: int,
+    timestamp: Any,
+    prev_close: float,
+    curr_close: float,
+    support_resistance: dict[str, list[float]],
+    features: dict[str, Any],
+    volume_multiplier: float = 1.5,
+    key_levels: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """Level crosses between the last two closes (see detect_breakout)."""
+    signals = []
+    volume_confirmed = features["current_volume"] > features["avg_volume"] * volume_multiplier
 
     # Breakout above resistance
     for level in support_resistance.get("resistance", []):
-        if prev["close"] < level and curr["close"] > level:
+        if prev_close < level and curr_close > level:
             signals.append({
-                "index": len(df) - 1,
-                "timestamp": curr.get("timestamp"),
+                "index": index,
+                "timestamp": timestamp,
                 "name": "breakout_above_resistance",
                 "direction": "long",
                 "strength": 0.8 if volume_confirmed else 0.5,
@@ -161,10 +510,10 @@ def detect_breakout(
 
     # Breakdown below support
     for level in support_resistance.get("support", []):
-        if prev["close"] > level and curr["close"] < level:
+        if prev_close > level and curr_close < level:
             signals.append({
-                "index": len(df) - 1,
-                "timestamp": curr.get("timestamp"),
+                "index": index,
+                "timestamp": timestamp,
                 "name": "breakdown_below_support",
                 "direction": "short",
                 "strength": 0.8 if volume_confirmed else 0.5,
@@ -174,23 +523,55 @@ def detect_breakout(
                 },
             })
 
+    # Higher-timeframe levels (prior day, opening range, daily/hourly swings)
+    directions = {s["direction"] for s in signals}
+    for source, level in _key_level_points(key_levels):
+        if prev_close < level < curr_close and "long" not in directions:
+            name, direction = "breakout_above_resistance", "long"
+        elif prev_close > level > curr_close and "short" not in directions:
+            name, direction = "breakdown_below_support", "short"
+        else:
+            continue
+        directions.add(direction)
+        signals.append({
+            "index": index,
+            "timestamp": timestamp,
+            "name": name,
+            "direction": direction,
+            "strength": 0.8 if volume_confirmed else 0.5,
+            "details": {
+                "level": level,
+                "source": source,
+                "volume_confirmed": volume_confirmed,
+            },
+        })
+
     return signals
 
 
 # ── Volume Analysis ──────────────────────────────────────────
 
-def analyze_volume(df: pd.DataFrame, lookback: int = 20) -> dict[str, Any]:
-    """Analyze volume relative to recent average."""
+def analyze_volume(
+    df: pd.DataFrame, lookback: int = 20, features: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """Analyze volume relative to recent average (optionally from precomputed features)."""
     if len(df) < lookback:
         return {"relative_volume": 1.0, "trend": "normal"}
 
-    avg_vol = df["volume"].tail(lookback).mean()
-    current_vol = df.iloc[-1]["volume"]
+    if features is None:
+        features = compute_features(df, lookback)
+    return _summarize_volume(features)
+
+
+def _summarize_volume(features: dict[str, Any]) -> dict[str, Any]:
+    """Relative volume verdict (see analyze_volume)."""
+    avg_vol = features["avg_volume"]
+    current_vol = features["current_volume"]
 
     if avg_vol == 0:
         return {"relative_volume": 0.0, "trend": "no_volume"}
 
-    relative = current_vol / avg_vol
+    relative = features["relative_volume"]
 
     if relative > 2.0:
         trend = "very_high"
@@ -211,20 +592,99 @@ def analyze_volume(df: pd.DataFrame, lookback: int = 20) -> dict[str, Any]:
 
 # ── Master Analysis ──────────────────────────────────────────
 
-def analyze_price_action(df: pd.DataFrame) -> dict[str, Any]:
+def analyze_price_action(
+    df: pd.DataFrame,
+    symbol: str | None = None,
+    key_levels: dict[str, Any] | None = None,
+) -> dict[str, Any]:
     """
     Run full price action analysis on a DataFrame.
 
-    Returns a dict with trend, support/resistance, breakouts, and volume.
+    When `symbol` is given (and the frame has timestamps), support/resistance
+    and the shared bar features are maintained incrementally across calls
+    instead of recomputed.
+    `key_levels` (from level_service) adds higher-timeframe breakouts and is
+    passed through for the AI prompt.
+
+    Returns a dict with trend, support/resistance, key levels, breakouts, and volume.
     """
-    sr = find_support_resistance(df)
-    trend = detect_trend(df)
-    breakouts = detect_breakout(df, sr)
-    volume = analyze_volume(df)
+    if symbol and "timestamp" in df.columns:
+        with symbol_state(symbol, df) as state:
+            sr = state.swings.levels()
+            features = state.features.snapshot()
+    else:
+        sr = find_support_resistance(df)
+        features = compute_features(df)
+    trend = detect_trend(df, features=features)
+    breakouts = detect_breakout(df, sr, key_levels=key_levels, features=features)
+    volume = analyze_volume(df, features=features)
 
     return {
         "trend": trend,
         "support_resistance": sr,
+        "key_levels": key_levels,
         "breakouts": breakouts,
         "volume": volume,
     }
+
+
+def analyze_price_action_array(
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    volumes: np.ndarray,
+    timestamps: list | None = None,
+    key_levels: list[dict[str, Any] | None] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    analyze_price_action() for many symbols sharing the same bar timestamps.
+
+    Swing extremes, trend counts and volume statistics are computed for all
+    symbols in one pass over (symbols, bars) arrays; only level clustering and
+    breakout checks (a handful of levels each) run per symbol.
+    """
+    h, l, c, v = (np.asarray(a, dtype=float) for a in (highs, lows, closes, volumes))
+    n_symbols, n_bars = c.shape
+    half = 20 // 2
+    size = 2 * half + 1
+    features = compute_features_array(h, l, v)
+
+    if n_bars >= size:
+        centre = slice(half, n_bars - half)
+        is_high = h[:, centre] == _rolling_extreme(h, size, np.maximum)
+        is_low = l[:, centre] == _rolling_extreme(l, size, np.minimum)
+
+    results = []
+    for i in range(n_symbols):
+        if n_bars >= size:
+            sr = {
+                "support": _cluster_levels(l[i, centre][is_low[i]], 0.005),
+                "resistance": _cluster_levels(h[i, centre][is_high[i]], 0.005),
+            }
+        else:
+            sr = {"support": [], "resistance": []}
+        levels = key_levels[i] if key_levels is not None else None
+
+        if n_bars < FEATURE_LOOKBACK:
+            trend = {"trend": "sideways", "strength": 0.0, "details": {}}
+            volume = {"relative_volume": 1.0, "trend": "normal"}
+        else:
+            trend = _score_trend(features[i])
+            volume = _summarize_volume(features[i])
+
+        breakouts = []
+        if n_bars >= 2:
+            breakouts = _find_breakouts(
+                n_bars - 1,
+                timestamps[-1] if timestamps is not None else None,
+                c[i, -2], c[i, -1], sr, features[i], key_levels=levels,
+            )
+
+        results.append({
+            "trend": trend,
+            "support_resistance": sr,
+            "key_levels": levels,
+            "breakouts": breakouts,
+            "volume": volume,
+        })
+    return results
@@ -3,44 +3,167 @@ Signal aggregation: combines candle patterns, price action, and indicators
 into a single scored signal.
 """
 
-import pandas as pd
+import hashlib
+import json
+import threading
+from collections import OrderedDict
 from typing import Any
 
-from bot.analysis.candle_patterns import detect_all_patterns
-from bot.analysis.price_action import analyze_price_action
-from bot.analysis.indicators import add_all_indicators, get_indicator_summary
+import numpy as np
+import pandas as pd
+
+from bot.analysis.candle_patterns import detect_recent_patterns_array
+from bot.analysis.price_action import (
+    analyze_price_action,
+    analyze_price_action_array,
+    clear_states,
+)
+from bot.analysis.indicators import indicator_summaries
+from bot.utils import tracing
+
+# Field order of the last axis of analyze_universe() input
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+# ── Analysis cache ───────────────────────────────────────────
+
+CACHE_SIZE = 256    # Cached analyses (LRU); a few per symbol is plenty
+
+_cache: OrderedDict[tuple, dict[str, Any]] = OrderedDict()
+_latest: dict[str, dict[str, Any]] = {}
+_cache_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def _cache_key(
+    df: pd.DataFrame, symbol: str, timeframe: str | None, key_levels: dict[str, Any] | None
+) -> tuple | None:
+    """
+    (symbol, timeframe, last bar timestamp, window, params hash), or None if uncacheable.
+
+    The last bar's close/volume are part of the key so a revised bar with the
+    same timestamp isn't served from cache.
+    """
+    if "timestamp" not in df.columns or len(df) == 0:
+        return None
+    last = len(df) - 1
+    params = hashlib.blake2b(
+        json.dumps(key_levels, sort_keys=True, default=str).encode(), digest_size=8
+    ).hexdigest() if key_levels else ""
+    return (
+        symbol,
+        timeframe or "",
+        str(df["timestamp"].iat[last]),
+        len(df),
+        float(df["close"].iat[last]),
+        float(df["volume"].iat[last]),
+        params,
+    )
+
+
+def latest_analysis(symbol: str | None = None) -> dict[str, Any] | None:
+    """
+    Most recent analysis per symbol (or for one symbol), as computed on the bar path.
+
+    Returns {symbol: {"timeframe", "timestamp", "analysis"}} or a single entry.
+    """
+    with _cache_lock:
+        if symbol is not None:
+            return _latest.get(symbol)
+        return dict(_latest)
+
+
+def cache_stats() -> dict[str, Any]:
+    """Hit/miss counters for the status server."""
+    with _cache_lock:
+        total = _hits + _misses
+        return {
+            "size": len(_cache),
+            "max_size": CACHE_SIZE,
+            "hits": _hits,
+            "misses": _misses,
+            "hit_rate": round(_hits / total, 3) if total else 0.0,
+        }
+
 
+def clear_cache() -> None:
+    """Forget cached analyses and per-symbol incremental state (benchmarks, tests)."""
+    global _hits, _misses
+    with _cache_lock:
+        _cache.clear()
+        _latest.clear()
+        _hits = _misses = 0
+    clear_states()
 
-def analyze_symbol(df: pd.DataFrame, symbol: str) -> dict[str, Any]:
+
+def analyze_symbol(
+    df: pd.DataFrame,
+    symbol: str,
+    key_levels: dict[str, Any] | None = None,
+    timeframe: str | None = None,
+) -> dict[str, Any]:
     """
-    Run full analysis on a symbol's candle data.
+    Run full analysis on a symbol's candle data, memoized per candle window.
+
+    Repeated calls on the same window (rescans, stream replays) return the
+    cached dict, which callers must treat as read-only.
 
     Args:
         df: DataFrame with OHLCV data (columns: open, high, low, close, volume, timestamp).
         symbol: The ticker symbol.
+        key_levels: Higher-timeframe levels from level_service (optional).
+        timeframe: Bar timeframe of df, part of the cache key.
 
     Returns:
         Dict with all analysis results and a combined signal.
     """
+    global _hits, _misses
+    key = _cache_key(df, symbol, timeframe, key_levels)
+    if key is not None:
+        with _cache_lock:
+            cached = _cache.get(key)
+            if cached is not None:
+                _cache.move_to_end(key)
+                _hits += 1
+                return cached
+            _misses += 1
+
+    analysis = _analyze(df, symbol, key_levels)
+
+    if key is not None:
+        with _cache_lock:
+            _cache[key] = analysis
+            _cache.move_to_end(key)
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+            _latest[symbol] = {"timeframe": key[1], "timestamp": key[2], "analysis": analysis}
+    return analysis
+
+
+def _analyze(
+    df: pd.DataFrame, symbol: str, key_levels: dict[str, Any] | None
+) -> dict[str, Any]:
+    """Uncached analysis (see analyze_symbol)."""
     if len(df) < 5:
-        return {
-            "symbol": symbol,
-            "signal": None,
-            "patterns": [],
-            "price_action": {},
-            "indicators": {},
-        }
+        return _empty_analysis(symbol)
 
-    # Run all analysis
-    patterns = detect_all_patterns(df)
-    price_action = analyze_price_action(df)
+    # Same vectorized kernels as analyze_universe, on a universe of one
+    ohlcv = {f: df[f].to_numpy(dtype=float)[np.newaxis, :] for f in FIELDS}
+    timestamps = df["timestamp"].tolist() if "timestamp" in df.columns else None
 
-    df_with_indicators = add_all_indicators(df)
-    indicator_summary = get_indicator_summary(df_with_indicators)
+    # Only the most recent patterns (last two candles) feed the signal
+    with tracing.span("pattern_detection"):
+        recent_patterns = detect_recent_patterns_array(
+            ohlcv["open"], ohlcv["high"], ohlcv["low"], ohlcv["close"], timestamps
+        )[0]
+    with tracing.span("price_action"):
+        price_action = analyze_price_action(df, symbol, key_levels)
 
-    # Get only the most recent patterns (last candle)
-    last_idx = len(df) - 1
-    recent_patterns = [p for p in patterns if p["index"] >= last_idx - 1]
+    with tracing.span("indicators"):
+        indicator_summary = indicator_summaries(
+            ohlcv["high"], ohlcv["low"], ohlcv["close"], ohlcv["volume"]
+        )[0]
 
     # Build combined signal
     combined = _build_combined_signal(
@@ -56,6 +179,67 @@ def analyze_symbol(df: pd.DataFrame, symbol: str) -> dict[str, Any]:
     }
 
 
+def _empty_analysis(symbol: str) -> dict[str, Any]:
+    return {
+        "symbol": symbol,
+        "signal": None,
+        "patterns": [],
+        "price_action": {},
+        "indicators": {},
+    }
+
+
+def analyze_universe(
+    data: np.ndarray,
+    symbols: list[str],
+    timestamps: list | None = None,
+    key_levels: dict[str, dict[str, Any] | None] | None = None,
+) -> dict[str, dict[str, Any]]:
+    """
+    Run full analysis for many symbols whose bars close at the same moments.
+
+    Patterns, indicators, trend, volume and swing extremes are computed with
+    NumPy over the whole universe at once; only level clustering, breakout
+    checks and signal scoring run per symbol.
+
+    Args:
+        data: Array of shape (symbols, bars, 5) with fields in FIELDS order
+              (open, high, low, close, volume), oldest bar first.
+        symbols: Ticker for each row of `data`.
+        timestamps: Bar timestamps shared by all symbols (optional).
+        key_levels: Higher-timeframe levels per symbol (optional).
+
+    Returns:
+        {symbol: analysis} with the same shape as analyze_symbol().
+    """
+    data = np.asarray(data, dtype=float)
+    if data.ndim != 3 or data.shape[2] != len(FIELDS) or data.shape[0] != len(symbols):
+        raise ValueError(
+            f"Expected data of shape ({len(symbols)}, bars, {len(FIELDS)}), got {data.shape}"
+        )
+    if data.shape[1] < 5:
+        return {symbol: _empty_analysis(symbol) for symbol in symbols}
+
+    o, h, l, c, v = (data[:, :, i] for i in range(len(FIELDS)))
+    levels = [key_levels.get(s) for s in symbols] if key_levels else None
+
+    with tracing.span("universe_analysis"):
+        patterns = detect_recent_patterns_array(o, h, l, c, timestamps)
+        price_actions = analyze_price_action_array(h, l, c, v, timestamps, levels)
+        indicators = indicator_summaries(h, l, c, v)
+
+        results = {}
+        for i, symbol in enumerate(symbols):
+            results[symbol] = {
+                "symbol": symbol,
+                "signal": _build_combined_signal(patterns[i], price_actions[i], indicators[i]),
+                "patterns": patterns[i],
+                "price_action": price_actions[i],
+                "indicators": indicators[i],
+            }
+    return results
+
+
 def _build_combined_signal(
     patterns: list[dict],
     price_action: dict[str, Any],
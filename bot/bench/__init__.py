@@ -0,0 +1,11 @@
+"""
+Offline benchmarks for the bot's hot paths.
+
+Everything here runs on seeded synthetic data (bench.synthetic) and needs no
+Alpaca or Supabase credentials.
+
+Usage:
+    python -m bot.bench.analysis --quick
+    python -m bot.bench.analysis --save bench_baseline.json
+    python -m bot.bench.analysis --compare bench_baseline.json
+"""
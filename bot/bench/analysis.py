@@ -0,0 +1,298 @@
+"""
+Benchmark for the analysis layer (patterns, price action, indicators, signals).
+
+Runs each function over synthetic bars for every generator in
+bench.synthetic and a range of window sizes and symbol counts, and reports
+wall time (min / p50 / mean over repeats) and tracemalloc allocations
+(peak and retained) per case. Results can be saved as a JSON baseline and
+later runs compared against it; a case is a regression when its p50 is
+more than --tolerance slower than the baseline.
+
+Usage:
+    python -m bot.bench.analysis                         # full matrix
+    python -m bot.bench.analysis --quick                 # small windows only
+    python -m bot.bench.analysis --only analyze_symbol --windows 100,1000
+    python -m bot.bench.analysis --save baseline.json
+    python -m bot.bench.analysis --compare baseline.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from bot.analysis import signals
+from bot.analysis.candle_patterns import detect_all_patterns
+from bot.analysis.indicators import add_all_indicators
+from bot.analysis.price_action import analyze_price_action
+from bot.bench.synthetic import GENERATORS, frames_from_universe, make_frame, make_universe
+
+
+WINDOWS = (20, 100, 1000, 10_000)        # Bars per frame for single-symbol cases
+SYMBOL_COUNTS = (1, 10, 100, 500)        # Universe sizes for multi-symbol cases
+UNIVERSE_BARS = 100                      # Window used for multi-symbol cases (= candle fetch)
+QUICK_WINDOWS = (20, 100)
+QUICK_SYMBOL_COUNTS = (1, 10)
+
+MIN_TIME = 0.2          # Keep repeating a case until this many seconds have been timed...
+MIN_REPEATS = 3         # ...and at least this many runs, unless a case is slow:
+MAX_TIME = 2.0          # stop once this much time is spent (always >= 1 run)
+MAX_REPEATS = 200
+NOISE_FLOOR_MS = 0.05   # Ignore regressions smaller than this in absolute terms
+
+
+# ── Measurement ──────────────────────────────────────────────
+
+def measure(
+    fn: Callable[[], Any],
+    setup: Callable[[], Any] | None = None,
+    allocations: bool = True,
+) -> dict[str, Any]:
+    """
+    Time fn() over several runs and measure its allocations in one extra run.
+
+    Args:
+        fn: Zero-argument callable under test.
+        setup: Untimed callable run before every call (e.g. clearing caches).
+        allocations: Also run once under tracemalloc (slower).
+
+    Returns:
+        Dict with repeats, min_ms, p50_ms, mean_ms and, with allocations,
+        alloc_peak_kb / alloc_retained_kb.
+    """
+    if setup:
+        setup()
+    fn()  # Warm-up (imports, lazy init, first-touch allocations)
+
+    times: list[float] = []
+    total = 0.0
+    while len(times) < MAX_REPEATS:
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        total += elapsed
+        if total >= MAX_TIME or (total >= MIN_TIME and len(times) >= MIN_REPEATS):
+            break
+
+    result: dict[str, Any] = {
+        "repeats": len(times),
+        "min_ms": round(min(times) * 1000, 4),
+        "p50_ms": round(statistics.median(times) * 1000, 4),
+        "mean_ms": round(total / len(times) * 1000, 4),
+    }
+
+    if allocations:
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            kept = fn()
+            after, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del kept
+        result["alloc_peak_kb"] = round((peak - before) / 1024, 1)
+        result["alloc_retained_kb"] = round((after - before) / 1024, 1)
+    return result
+
+
+# ── Cases ────────────────────────────────────────────────────
+
+def _case_id(name: str, generator: str, bars: int, symbols: int = 1) -> str:
+    return f"{name}/{generator}/bars={bars}/symbols={symbols}"
+
+
+def build_cases(
+    generators: list[str],
+    windows: tuple[int, ...],
+    symbol_counts: tuple[int, ...],
+    seed: int,
+) -> list[tuple[str, Callable[[], Any], Callable[[], Any] | None]]:
+    """(case id, fn, setup) for every function x generator x size."""
+    cases = []
+    for generator in generators:
+        for bars in windows:
+            df = make_frame(generator, bars, seed)
+            cases += [
+                (_case_id("detect_all_patterns", generator, bars),
+                 lambda df=df: detect_all_patterns(df), None),
+                (_case_id("analyze_price_action", generator, bars),
+                 lambda df=df: analyze_price_action(df), None),
+                (_case_id("add_all_indicators", generator, bars),
+                 lambda df=df: add_all_indicators(df), None),
+                # Cold: no cached analysis and no incremental swing/feature state
+                (_case_id("analyze_symbol", generator, bars),
+                 lambda df=df: signals.analyze_symbol(df, "SYN000"), signals.clear_cache),
+            ]
+
+        for count in symbol_counts:
+            data, symbols, ts = make_universe(generator, count, UNIVERSE_BARS, seed)
+            frames = frames_from_universe(data, symbols, ts)
+            cases += [
+                (_case_id("analyze_universe", generator, UNIVERSE_BARS, count),
+                 lambda d=data, s=symbols, t=ts: signals.analyze_universe(d, s, t), None),
+                (_case_id("analyze_symbol_loop", generator, UNIVERSE_BARS, count),
+                 lambda f=frames: {s: signals.analyze_symbol(df, s) for s, df in f.items()},
+                 signals.clear_cache),
+            ]
+    return cases
+
+
+def run(
+    generators: list[str],
+    windows: tuple[int, ...],
+    symbol_counts: tuple[int, ...],
+    seed: int = 0,
+    only: list[str] | None = None,
+    allocations: bool = True,
+    progress: Callable[[str, dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """
+    Run the benchmark matrix.
+
+    Returns:
+        {"meta": {...}, "results": {case_id: measurement}}
+    """
+    results = {}
+    for case_id, fn, setup in build_cases(generators, windows, symbol_counts, seed):
+        if only and case_id.split("/", 1)[0] not in only:
+            continue
+        results[case_id] = measure(fn, setup, allocations)
+        if progress:
+            progress(case_id, results[case_id])
+    signals.clear_cache()
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "generators": generators,
+            "windows": list(windows),
+            "symbol_counts": list(symbol_counts),
+        },
+        "results": results,
+    }
+
+
+# ── Baseline comparison ──────────────────────────────────────
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[dict[str, Any]]:
+    """
+    Per-case p50 ratio against a baseline (cases missing from either side are skipped).
+
+    A case regresses when it is more than `tolerance` (e.g. 0.2 = 20%) slower
+    and the difference is above NOISE_FLOOR_MS.
+    """
+    rows = []
+    for case_id, result in current["results"].items():
+        base = baseline.get("results", {}).get(case_id)
+        if not base:
+            continue
+        ratio = result["p50_ms"] / base["p50_ms"] if base["p50_ms"] else float("inf")
+        rows.append({
+            "case": case_id,
+            "baseline_ms": base["p50_ms"],
+            "current_ms": result["p50_ms"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + tolerance
+            and result["p50_ms"] - base["p50_ms"] > NOISE_FLOOR_MS,
+        })
+    return rows
+
+
+# ── CLI ──────────────────────────────────────────────────────
+
+def _int_list(value: str) -> tuple[int, ...]:
+    return tuple(int(v) for v in value.split(",") if v)
+
+
+def _print_result(case_id: str, result: dict[str, Any]) -> None:
+    alloc = (
+        f"  peak {result['alloc_peak_kb']:>10.1f} KB  kept {result['alloc_retained_kb']:>8.1f} KB"
+        if "alloc_peak_kb" in result else ""
+    )
+    print(
+        f"{case_id:<58} p50 {result['p50_ms']:>10.3f} ms  min {result['min_ms']:>10.3f} ms"
+        f"  x{result['repeats']:<3}{alloc}",
+        flush=True,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the analysis layer on synthetic OHLCV.")
+    parser.add_argument("--quick", action="store_true",
+                        help=f"windows {QUICK_WINDOWS}, symbols {QUICK_SYMBOL_COUNTS}")
+    parser.add_argument("--windows", type=_int_list, help="comma-separated bar counts")
+    parser.add_argument("--symbols", type=_int_list, help="comma-separated universe sizes")
+    parser.add_argument("--generators", default=",".join(GENERATORS),
+                        help="comma-separated generators (default: all)")
+    parser.add_argument("--only", help="comma-separated function names to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-alloc", action="store_true", help="skip tracemalloc runs")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed p50 slowdown vs baseline (default 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    generators = [g for g in args.generators.split(",") if g]
+    unknown = set(generators) - set(GENERATORS)
+    if unknown:
+        parser.error(f"unknown generators: {', '.join(sorted(unknown))}")
+    windows = args.windows or (QUICK_WINDOWS if args.quick else WINDOWS)
+    symbol_counts = args.symbols or (QUICK_SYMBOL_COUNTS if args.quick else SYMBOL_COUNTS)
+
+    report = run(
+        generators,
+        windows,
+        symbol_counts,
+        seed=args.seed,
+        only=args.only.split(",") if args.only else None,
+        allocations=not args.no_alloc,
+        progress=_print_result,
+    )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved {len(report['results'])} results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.tolerance)
+        regressions = [r for r in rows if r["regression"]]
+        print(f"\nCompared {len(rows)} cases against {args.compare} "
+              f"(tolerance {args.tolerance:.0%})")
+        for row in rows:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['case']:<58} {row['baseline_ms']:>10.3f} -> "
+                  f"{row['current_ms']:>10.3f} ms  x{row['ratio']:.2f}{flag}")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s)")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
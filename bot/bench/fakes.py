@@ -0,0 +1,434 @@
+"""
+In-process stand-ins for Alpaca, Supabase, PlusE and the AI provider.
+
+Used by the load test to drive the real bar pipeline without network or
+credentials. Each fake sleeps for a sample from a configurable latency
+distribution, the same way the real dependency would: blocking calls
+(Alpaca REST, the Supabase client) sleep the calling thread, async ones
+(PlusE, the AI) await asyncio.sleep.
+
+Usage:
+    with install(FakeConfig(db=Latency.parse("lognormal:20,0.5"))) as fakes:
+        fakes.seed_candles(frames, timeframe="5Min")
+        await main.on_bar(bar)
+"""
+
+import asyncio
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Iterator
+
+import pandas as pd
+
+
+# ── Latency distributions ────────────────────────────────────
+
+class Latency:
+    """
+    A latency distribution in milliseconds, sampled in seconds.
+
+    Specs (for Latency.parse):
+        const:MS                 always MS
+        uniform:LO,HI            uniform between LO and HI
+        lognormal:MEDIAN,SIGMA   log-normal with the given median (heavy right tail)
+        none                     zero
+    """
+
+    def __init__(self, kind: str = "none", params: tuple[float, ...] = (), seed: int = 0):
+        self.kind = kind
+        self.params = params
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec: str, seed: int = 0) -> "Latency":
+        kind, _, args = spec.partition(":")
+        params = tuple(float(a) for a in args.split(",") if a)
+        expected = {"none": 0, "const": 1, "uniform": 2, "lognormal": 2}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(
+                f"Bad latency spec {spec!r} (use const:MS, uniform:LO,HI, lognormal:MEDIAN,SIGMA or none)"
+            )
+        return cls(kind, params, seed)
+
+    def sample(self) -> float:
+        """One latency in seconds."""
+        with self._lock:
+            if self.kind == "const":
+                ms = self.params[0]
+            elif self.kind == "uniform":
+                ms = self._rng.uniform(*self.params)
+            elif self.kind == "lognormal":
+                median, sigma = self.params
+                ms = median * self._rng.lognormvariate(0, sigma)
+            else:
+                ms = 0.0
+        return ms / 1000
+
+    def block(self) -> None:
+        delay = self.sample()
+        if delay:
+            time.sleep(delay)
+
+    async def wait(self) -> None:
+        delay = self.sample()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{','.join(f'{p:g}' for p in self.params)}" if self.params else self.kind
+
+
+@dataclass
+class FakeConfig:
+    """Latencies and behaviour of the fakes."""
+
+    db: Latency = field(default_factory=lambda: Latency("lognormal", (15, 0.5), seed=1))
+    alpaca: Latency = field(default_factory=lambda: Latency("lognormal", (40, 0.4), seed=2))
+    pluse: Latency = field(default_factory=lambda: Latency("lognormal", (300, 0.5), seed=3))
+    ai: Latency = field(default_factory=lambda: Latency("lognormal", (2500, 0.4), seed=4))
+    enter_rate: float = 0.3       # Share of AI evaluations that say enter
+    equity: float = 100_000.0
+    seed: int = 0
+
+
+# ── Supabase ─────────────────────────────────────────────────
+
+class _Response(SimpleNamespace):
+    data: list[dict[str, Any]]
+
+
+class _Query:
+    """The slice of the PostgREST query builder the bot uses."""
+
+    def __init__(self, db: "FakeSupabase", table: str):
+        self._db = db
+        self._table = table
+        self._op = "select"
+        self._payload: Any = None
+        self._on_conflict: str | None = None
+        self._filters: list[tuple[str, str, Any]] = []
+        self._order: tuple[str, bool] | None = None
+        self._limit: int | None = None
+
+    def select(self, *_columns: str, **_kwargs: Any) -> "_Query":
+        self._op = "select"
+        return self
+
+    def insert(self, rows: dict | list[dict], **_kwargs: Any) -> "_Query":
+        self._op, self._payload = "insert", rows
+        return self
+
+    def upsert(self, rows: dict | list[dict], on_conflict: str = "id", **_kwargs: Any) -> "_Query":
+        self._op, self._payload, self._on_conflict = "upsert", rows, on_conflict
+        return self
+
+    def update(self, values: dict, **_kwargs: Any) -> "_Query":
+        self._op, self._payload = "update", values
+        return self
+
+    def delete(self, **_kwargs: Any) -> "_Query":
+        self._op = "delete"
+        return self
+
+    def _filter(self, op: str, column: str, value: Any) -> "_Query":
+        self._filters.append((op, column, value))
+        return self
+
+    def eq(self, column: str, value: Any) -> "_Query":
+        return self._filter("eq", column, value)
+
+    def neq(self, column: str, value: Any) -> "_Query":
+        return self._filter("neq", column, value)
+
+    def in_(self, column: str, values: list) -> "_Query":
+        return self._filter("in", column, list(values))
+
+    def gte(self, column: str, value: Any) -> "_Query":
+        return self._filter("gte", column, value)
+
+    def lte(self, column: str, value: Any) -> "_Query":
+        return self._filter("lte", column, value)
+
+    def gt(self, column: str, value: Any) -> "_Query":
+        return self._filter("gt", column, value)
+
+    def lt(self, column: str, value: Any) -> "_Query":
+        return self._filter("lt", column, value)
+
+    def order(self, column: str, desc: bool = False, **_kwargs: Any) -> "_Query":
+        self._order = (column, desc)
+        return self
+
+    def limit(self, count: int, **_kwargs: Any) -> "_Query":
+        self._limit = count
+        return self
+
+    def execute(self) -> _Response:
+        self._db.latency.block()
+        return _Response(data=self._db.run(self))
+
+
+_MATCHERS = {
+    "eq": lambda v, x: v == x,
+    "neq": lambda v, x: v != x,
+    "in": lambda v, x: v in x,
+    "gte": lambda v, x: v is not None and v >= x,
+    "lte": lambda v, x: v is not None and v <= x,
+    "gt": lambda v, x: v is not None and v > x,
+    "lt": lambda v, x: v is not None and v < x,
+}
+
+
+class FakeSupabase:
+    """
+    Thread-safe in-memory tables behind a supabase-py shaped client.
+
+    Rows are bucketed by their "symbol" column so per-symbol reads (candles,
+    fundamentals) don't scan the whole table.
+    """
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._tables: dict[str, dict[Any, dict[Any, dict[str, Any]]]] = {}
+        self._ids = itertools.count(1)
+        self.requests: dict[str, int] = {}
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def _buckets(self, table: str, filters: list[tuple[str, str, Any]]) -> list[dict]:
+        tbl = self._tables.setdefault(table, {})
+        symbol = next((v for op, c, v in filters if op == "eq" and c == "symbol"), None)
+        if symbol is not None:
+            return [tbl[symbol]] if symbol in tbl else []
+        return list(tbl.values())
+
+    def _store(self, table: str, row: dict[str, Any], key_cols: list[str] | None) -> dict:
+        row = dict(row)
+        row.setdefault("id", next(self._ids))
+        key = tuple(row.get(c) for c in key_cols) if key_cols else row["id"]
+        bucket = self._tables.setdefault(table, {}).setdefault(row.get("symbol"), {})
+        if key in bucket:
+            row = {**bucket[key], **row, "id": bucket[key]["id"]}
+        bucket[key] = row
+        return row
+
+    def run(self, query: _Query) -> list[dict[str, Any]]:
+        with self._lock:
+            self.requests[f"{query._table}.{query._op}"] = (
+                self.requests.get(f"{query._table}.{query._op}", 0) + 1
+            )
+            if query._op in ("insert", "upsert"):
+                rows = query._payload if isinstance(query._payload, list) else [query._payload]
+                key_cols = query._on_conflict.split(",") if query._op == "upsert" else None
+                return [dict(self._store(query._table, r, key_cols)) for r in rows]
+
+            matched = []
+            for bucket in self._buckets(query._table, query._filters):
+                for key, row in list(bucket.items()):
+                    if all(_MATCHERS[op](row.get(col), val) for op, col, val in query._filters):
+                        matched.append((bucket, key, row))
+
+            if query._op == "update":
+                for bucket, key, row in matched:
+                    row.update(query._payload)
+            elif query._op == "delete":
+                for bucket, key, _ in matched:
+                    del bucket[key]
+
+            rows = [row for _, _, row in matched]
+            if query._order:
+                column, desc = query._order
+                rows.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+            if query._limit is not None:
+                rows = rows[:query._limit]
+            return [dict(r) for r in rows]
+
+    def count(self, table: str) -> int:
+        with self._lock:
+            return sum(len(b) for b in self._tables.get(table, {}).values())
+
+
+# ── Alpaca, PlusE, AI ────────────────────────────────────────
+
+class FakeBroker:
+    """
+    Alpaca account/position/order calls (blocking, like alpaca-py).
+
+    Orders are acknowledged but never turn into positions, so the
+    max-positions check doesn't short-circuit the pipeline mid-run.
+    """
+
+    def __init__(self, config: FakeConfig):
+        self.config = config
+        self.orders: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def get_account(self) -> dict:
+        self.config.alpaca.block()
+        equity = self.config.equity
+        return {
+            "equity": equity, "cash": equity, "buying_power": equity * 2,
+            "portfolio_value": equity, "day_pnl": 0.0, "day_pnl_pct": 0.0,
+        }
+
+    def get_positions(self) -> list[dict]:
+        self.config.alpaca.block()
+        return []
+
+    def place_bracket_order(self, symbol: str, side: str, qty: float,
+                            stop_loss: float, take_profit: float) -> dict:
+        self.config.alpaca.block()
+        order = {
+            "order_id": str(uuid.uuid4()), "symbol": symbol, "side": side,
+            "qty": float(qty), "status": "accepted",
+        }
+        with self._lock:
+            self.orders.append(order)
+        return order
+
+    def get_open_orders(self, nested: bool = False) -> list[dict]:
+        self.config.alpaca.block()
+        return []
+
+    def get_historical_bars(self, *args: Any, **kwargs: Any) -> list[dict]:
+        self.config.alpaca.block()
+        return []
+
+
+class FakeAI:
+    """_call_ai replacement: waits, then answers with canned decisions (single or batched)."""
+
+    _SYMBOL = re.compile(r"^## Analysis for (\S+)", re.MULTILINE)
+
+    def __init__(self, config: FakeConfig):
+        self.config = config
+        self.calls = 0
+        self.batched_calls = 0
+        self._rng = random.Random(config.seed)
+
+    def _decision(self) -> dict[str, Any]:
+        enter = self._rng.random() < self.config.enter_rate
+        return {
+            "decision": self._rng.choice(["enter_long", "enter_short"]) if enter else "skip",
+            "confidence": 0.75 if enter else 0.3,
+            "reasoning": "load test",
+            "stop_loss": None,
+            "take_profit": None,
+            "key_factors": ["synthetic"],
+        }
+
+    async def __call__(self, prompt: str, system: str, **kwargs: Any) -> str:
+        self.calls += 1
+        await self.config.ai.wait()
+        symbols = self._SYMBOL.findall(prompt)
+        if len(symbols) > 1:
+            self.batched_calls += 1
+            return json.dumps({
+                symbol: {**self._decision(), "rank": rank}
+                for rank, symbol in enumerate(symbols, 1)
+            })
+        return json.dumps(self._decision())
+
+
+class Fakes:
+    """Handles to the installed fakes (for seeding and reporting)."""
+
+    def __init__(self, config: FakeConfig):
+        self.config = config
+        self.db = FakeSupabase(config.db)
+        self.broker = FakeBroker(config)
+        self.ai = FakeAI(config)
+        self.pluse_calls = 0
+
+    async def pluse_full_analysis(self, symbol: str) -> dict[str, str | None]:
+        self.pluse_calls += 1
+        await self.config.pluse.wait()
+        return {
+            "ticker_data": f"{symbol} synthetic ticker data",
+            "price_history": None,
+            "ml_prediction": None,
+            "news": None,
+        }
+
+    def seed_candles(self, frames: dict[str, pd.DataFrame], timeframe: str) -> None:
+        """Preload candle history (as upsert_candle would have written it)."""
+        for symbol, df in frames.items():
+            for row in df.itertuples(index=False):
+                self.db._store("candles", {
+                    "symbol": symbol,
+                    "timeframe": timeframe,
+                    "timestamp": row.timestamp.isoformat(),
+                    "open": float(row.open),
+                    "high": float(row.high),
+                    "low": float(row.low),
+                    "close": float(row.close),
+                    "volume": int(row.volume),
+                    "vwap": None,
+                }, ["symbol", "timeframe", "timestamp"])
+
+    def seed_fundamentals(self, symbols: list[str]) -> None:
+        """Fresh fundamentals cache rows, so get_fundamentals never goes to the network."""
+        now = datetime.now(timezone.utc).isoformat()
+        for symbol in symbols:
+            self.db._store("fundamentals", {
+                "symbol": symbol, "sector": "Technology", "pe_ratio": 25.0, "updated_at": now,
+            }, ["symbol"])
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "db_requests": dict(sorted(self.db.requests.items())),
+            "ai_calls": self.ai.calls,
+            "ai_batched_calls": self.ai.batched_calls,
+            "pluse_calls": self.pluse_calls,
+            "orders": len(self.broker.orders),
+        }
+
+
+# ── Install ──────────────────────────────────────────────────
+
+@contextmanager
+def install(config: FakeConfig | None = None) -> Iterator[Fakes]:
+    """
+    Swap the real clients for fakes until the block exits.
+
+    Patches alpaca_client's account/position/order functions, the Supabase
+    client singleton (so supabase_client, async_db and the write-behind queue
+    all hit the fake), pluse_client.get_full_analysis, analyst._call_ai, and
+    the strategy's market-hours check.
+    """
+    from bot.ai import analyst
+    from bot.data import alpaca_client, pluse_client, supabase_client
+    from bot.strategy.candle_strategy import CandleStrategy
+
+    fakes = Fakes(config or FakeConfig())
+    patches = [
+        (alpaca_client, "get_account", fakes.broker.get_account),
+        (alpaca_client, "get_positions", fakes.broker.get_positions),
+        (alpaca_client, "place_bracket_order", fakes.broker.place_bracket_order),
+        (alpaca_client, "get_open_orders", fakes.broker.get_open_orders),
+        (alpaca_client, "get_historical_bars", fakes.broker.get_historical_bars),
+        (supabase_client, "_client", fakes.db),
+        (pluse_client, "get_full_analysis", fakes.pluse_full_analysis),
+        (analyst, "_call_ai", fakes.ai),
+        (CandleStrategy, "_is_market_hours", staticmethod(lambda: True)),
+    ]
+    originals = [(obj, name, obj.__dict__[name]) for obj, name, _ in patches]
+    for obj, name, value in patches:
+        setattr(obj, name, value)
+    try:
+        yield fakes
+    finally:
+        for obj, name, value in originals:
+            setattr(obj, name, value)
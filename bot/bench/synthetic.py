@@ -0,0 +1,139 @@
+"""
+Seeded synthetic OHLCV generators for benchmarks and offline checks.
+
+Every generator is deterministic for a given seed and returns plain arrays,
+so the same bars can be fed to the DataFrame APIs (make_frame) and to the
+stacked (symbol x time) kernels (make_universe).
+
+Generators:
+  - random_walk: driftless log-normal walk
+  - trending:    steady drift with pullbacks
+  - gapping:     random walk with an overnight gap every session
+  - zero_range:  illiquid tape, many flat bars with open == high == low == close
+"""
+
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+
+BAR_MINUTES = 5
+SESSION_BARS = 78            # 5Min bars in a 6.5h session
+START = pd.Timestamp("2024-01-02 14:30", tz="UTC")
+START_PRICE = 100.0
+
+
+def _bars_from_closes(
+    rng: np.random.Generator, closes: np.ndarray, volatility: float
+) -> dict[str, np.ndarray]:
+    """Open at the previous close (plus noise), wicks beyond the body, lognormal volume."""
+    opens = np.empty_like(closes)
+    opens[..., 0] = closes[..., 0]
+    opens[..., 1:] = closes[..., :-1]
+    opens *= 1 + rng.normal(0, volatility / 4, closes.shape)
+
+    wick = np.abs(rng.normal(0, volatility / 2, (2,) + closes.shape)) * closes
+    highs = np.maximum(opens, closes) + wick[0]
+    lows = np.minimum(opens, closes) - wick[1]
+    volumes = np.round(rng.lognormal(np.log(50_000), 0.6, closes.shape))
+    return {
+        "open": np.round(opens, 2),
+        "high": np.round(highs, 2),
+        "low": np.round(lows, 2),
+        "close": np.round(closes, 2),
+        "volume": volumes,
+    }
+
+
+def _walk(rng: np.random.Generator, shape: tuple[int, int], drift: float, volatility: float):
+    returns = rng.normal(drift, volatility, shape)
+    return START_PRICE * np.exp(np.cumsum(returns, axis=-1))
+
+
+def random_walk(rng: np.random.Generator, shape: tuple[int, int]) -> dict[str, np.ndarray]:
+    return _bars_from_closes(rng, _walk(rng, shape, 0.0, 0.002), 0.002)
+
+
+def trending(rng: np.random.Generator, shape: tuple[int, int]) -> dict[str, np.ndarray]:
+    # Direction per symbol, so a universe has both up- and downtrends
+    direction = rng.choice([-1.0, 1.0], size=(shape[0], 1))
+    returns = direction * 0.0006 + rng.normal(0, 0.0015, shape)
+    closes = START_PRICE * np.exp(np.cumsum(returns, axis=-1))
+    return _bars_from_closes(rng, closes, 0.0015)
+
+
+def gapping(rng: np.random.Generator, shape: tuple[int, int]) -> dict[str, np.ndarray]:
+    returns = rng.normal(0.0, 0.002, shape)
+    returns[:, ::SESSION_BARS] += rng.normal(0, 0.015, returns[:, ::SESSION_BARS].shape)
+    closes = START_PRICE * np.exp(np.cumsum(returns, axis=-1))
+    bars = _bars_from_closes(rng, closes, 0.002)
+    # The gap happens between the prior close and the session's first open
+    bars["open"][:, ::SESSION_BARS] = bars["close"][:, ::SESSION_BARS]
+    bars["high"] = np.maximum(bars["high"], bars["open"])
+    bars["low"] = np.minimum(bars["low"], bars["open"])
+    return bars
+
+
+def zero_range(rng: np.random.Generator, shape: tuple[int, int]) -> dict[str, np.ndarray]:
+    bars = random_walk(rng, shape)
+    flat = rng.random(shape) < 0.4
+    flat[:, 0] = False
+    # A flat bar prints at the last traded price, often with no volume
+    last = pd.DataFrame(np.where(flat, np.nan, bars["close"])).ffill(axis=1).to_numpy()
+    for field in ("open", "high", "low", "close"):
+        bars[field] = np.where(flat, last, bars[field])
+    bars["volume"] = np.where(flat & (rng.random(shape) < 0.5), 0.0, bars["volume"])
+    return bars
+
+
+GENERATORS: dict[str, Callable[[np.random.Generator, tuple[int, int]], dict[str, np.ndarray]]] = {
+    "random_walk": random_walk,
+    "trending": trending,
+    "gapping": gapping,
+    "zero_range": zero_range,
+}
+
+
+def timestamps(bars: int) -> pd.DatetimeIndex:
+    """UTC bar timestamps, BAR_MINUTES apart."""
+    return pd.date_range(START, periods=bars, freq=f"{BAR_MINUTES}min")
+
+
+def make_universe(
+    kind: str, symbols: int, bars: int, seed: int = 0
+) -> tuple[np.ndarray, list[str], pd.DatetimeIndex]:
+    """
+    Synthetic bars for many symbols, stacked for signals.analyze_universe().
+
+    Returns:
+        (data of shape (symbols, bars, 5) in open/high/low/close/volume order,
+         symbol names, shared timestamps)
+    """
+    if kind not in GENERATORS:
+        raise ValueError(f"Unknown generator {kind!r} (expected one of {sorted(GENERATORS)})")
+    rng = np.random.default_rng(seed)
+    fields = GENERATORS[kind](rng, (symbols, bars))
+    data = np.stack(
+        [fields[f] for f in ("open", "high", "low", "close", "volume")], axis=-1
+    )
+    return data, [f"SYN{i:03d}" for i in range(symbols)], timestamps(bars)
+
+
+def make_frame(kind: str, bars: int, seed: int = 0, symbol: str = "SYN000") -> pd.DataFrame:
+    """One symbol's synthetic bars in the shape get_candles() returns."""
+    data, _, ts = make_universe(kind, 1, bars, seed)
+    return frames_from_universe(data, [symbol], ts)[symbol]
+
+
+def frames_from_universe(
+    data: np.ndarray, symbols: list[str], ts: pd.DatetimeIndex
+) -> dict[str, pd.DataFrame]:
+    """Split a stacked universe back into per-symbol DataFrames."""
+    frames = {}
+    for i, symbol in enumerate(symbols):
+        df = pd.DataFrame(data[i], columns=["open", "high", "low", "close", "volume"])
+        df.insert(0, "timestamp", ts)
+        df.insert(0, "symbol", symbol)
+        frames[symbol] = df
+    return frames
@@ -38,5 +38,34 @@ class Config:
     TAKE_PROFIT_PCT: float = float(os.getenv("TAKE_PROFIT_PCT", "0.035"))
     DAILY_LOSS_LIMIT_PCT: float = float(os.getenv("DAILY_LOSS_LIMIT_PCT", "0.03"))
 
+    # Bars handled at once on the bar stream (1 = alpaca-py's serial dispatch)
+    BAR_CONCURRENCY: int = int(os.getenv("BAR_CONCURRENCY", "8"))
+
+    # Seconds to collect concurrent signals into one AI evaluation (0 = off)
+    AI_BATCH_WINDOW: float = float(os.getenv("AI_BATCH_WINDOW", "0.25"))
+
+    # Seconds an AI call may take (all providers together) before it gives up
+    AI_DEADLINE: float = float(os.getenv("AI_DEADLINE", "20"))
+
+    # Seconds before a second AI provider is raced against a slow one (0 = off)
+    AI_HEDGE_AFTER: float = float(os.getenv("AI_HEDGE_AFTER", "8"))
+
+    # AI requests per minute per provider, shared by all callers (0 = unlimited)
+    CLAUDE_RPM: int = int(os.getenv("CLAUDE_RPM", "50"))
+    GEMINI_RPM: int = int(os.getenv("GEMINI_RPM", "60"))
+
+    # Share of each provider's RPM for background work (watchlist/fundamental
+    # analysis, journals; 0 = none); the rest is reserved for trade evaluations
+    AI_BACKGROUND_RPM_SHARE: float = float(os.getenv("AI_BACKGROUND_RPM_SHARE", "0.4"))
+
+    # Stream trade evaluations and act once the decision fields are in
+    AI_STREAM: bool = os.getenv("AI_STREAM", "true").lower() == "true"
+
+    # Trained pre-filter model (python -m bot.strategy.prefilter); empty = off
+    PREFILTER_MODEL_PATH: str = os.getenv("PREFILTER_MODEL_PATH", "")
+
+    # Activity log spillover (used while Supabase is unreachable)
+    ACTIVITY_SPILL_PATH: str = os.getenv("ACTIVITY_SPILL_PATH", "/tmp/activity_spill.jsonl")
+
 
 config = Config()
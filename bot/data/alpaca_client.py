@@ -1,6 +1,9 @@
 """Alpaca REST API client for account info, orders, and historical data."""
 
+import functools
+import time
 from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
 
 from alpaca.trading.client import TradingClient
 from alpaca.trading.requests import (
@@ -14,6 +17,7 @@ from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
 
 from bot.config import config
+from bot.utils import metrics
 from bot.utils.logger import log
 
 
@@ -48,8 +52,33 @@ def get_data_client() -> StockHistoricalDataClient:
     return _data_client
 
 
+# ── Instrumentation ──────────────────────────────────────────
+
+_call_latency = metrics.histogram("tradebot_broker_call_seconds", "Alpaca REST call latency.", ["op"])
+_call_errors = metrics.counter("tradebot_broker_errors_total", "Alpaca REST calls that raised.", ["op"])
+
+
+def _broker_call(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Record latency and errors of a REST wrapper under its function name."""
+    latency = _call_latency.labels(op=fn.__name__)
+    errors = _call_errors.labels(op=fn.__name__)
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            latency.observe(time.perf_counter() - start)
+    return wrapper
+
+
 # ── Account ──────────────────────────────────────────────────
 
+@_broker_call
 def get_account() -> dict:
     """Get current account information."""
     client = get_trading_client()
@@ -72,6 +101,7 @@ def get_account() -> dict:
 
 # ── Positions ────────────────────────────────────────────────
 
+@_broker_call
 def get_positions() -> list[dict]:
     """Get all open positions from Alpaca."""
     client = get_trading_client()
@@ -93,6 +123,7 @@ def get_positions() -> list[dict]:
 
 # ── Orders ───────────────────────────────────────────────────
 
+@_broker_call
 def place_limit_order(
     symbol: str,
     side: str,
@@ -124,6 +155,7 @@ def place_limit_order(
     }
 
 
+@_broker_call
 def place_market_order(symbol: str, side: str, qty: float) -> dict:
     """Place a market order (use sparingly -- limit orders preferred)."""
     client = get_trading_client()
@@ -146,6 +178,7 @@ def place_market_order(symbol: str, side: str, qty: float) -> dict:
     }
 
 
+@_broker_call
 def place_bracket_order(
     symbol: str,
     side: str,
@@ -191,30 +224,43 @@ def place_bracket_order(
     }
 
 
-def get_open_orders() -> list[dict]:
-    """Get all open/pending orders from Alpaca."""
-    from alpaca.trading.requests import GetOrdersRequest
-    from alpaca.trading.enums import QueryOrderStatus
+def order_to_dict(o, parent_id: str | None = None) -> dict:
+    """Convert an Alpaca Order model to a plain dict (legs included, linked to parent)."""
+    order_id = str(o.id)
+    return {
+        "order_id": order_id,
+        "parent_id": parent_id,
+        "symbol": o.symbol,
+        "side": o.side.value if o.side else None,
+        "qty": float(o.qty) if o.qty else 0,
+        "filled_qty": float(o.filled_qty) if o.filled_qty else 0,
+        "order_type": o.type.value if o.type else None,
+        "limit_price": float(o.limit_price) if o.limit_price else None,
+        "stop_price": float(o.stop_price) if o.stop_price else None,
+        "filled_avg_price": (
+            float(o.filled_avg_price) if o.filled_avg_price else None
+        ),
+        "status": o.status.value,
+        "order_class": o.order_class.value if o.order_class else None,
+        "legs": [order_to_dict(leg, parent_id=order_id) for leg in (o.legs or [])],
+    }
+
 
+@_broker_call
+def get_open_orders(nested: bool = False) -> list[dict]:
+    """
+    Get all open/pending orders from Alpaca.
+
+    With nested=True, bracket/OCO child legs are returned under their
+    parent's "legs" key instead of as separate top-level orders.
+    """
     client = get_trading_client()
-    request = GetOrdersRequest(status=QueryOrderStatus.OPEN)
+    request = GetOrdersRequest(status=QueryOrderStatus.OPEN, nested=nested)
     orders = client.get_orders(request)
-    return [
-        {
-            "order_id": str(o.id),
-            "symbol": o.symbol,
-            "side": o.side.value,
-            "qty": float(o.qty) if o.qty else 0,
-            "order_type": o.type.value if o.type else None,
-            "limit_price": float(o.limit_price) if o.limit_price else None,
-            "stop_price": float(o.stop_price) if o.stop_price else None,
-            "status": o.status.value,
-            "order_class": o.order_class.value if o.order_class else None,
-        }
-        for o in orders
-    ]
+    return [order_to_dict(o) for o in orders]
 
 
+@_broker_call
 def place_oco_exit(
     symbol: str,
     qty: float,
@@ -259,6 +305,7 @@ def place_oco_exit(
     }
 
 
+@_broker_call
 def cancel_order(order_id: str) -> None:
     """Cancel an open order."""
     client = get_trading_client()
@@ -266,29 +313,37 @@ def cancel_order(order_id: str) -> None:
     log.info(f"Order cancelled: {order_id}")
 
 
-def cancel_open_orders_for_symbol(symbol: str) -> int:
-    """Cancel all open orders for a given symbol. Returns count cancelled."""
-    orders = get_open_orders()
+@_broker_call
+def cancel_open_orders_for_symbol(symbol: str, order_ids: list[str] | None = None) -> int:
+    """
+    Cancel all open orders for a given symbol. Returns count cancelled.
+
+    Pass order_ids (e.g. from the order book) to skip listing every open
+    order over REST; None means "unknown, ask Alpaca".
+    """
+    if order_ids is None:
+        order_ids = [o["order_id"] for o in get_open_orders() if o["symbol"] == symbol]
     cancelled = 0
     client = get_trading_client()
-    for o in orders:
-        if o["symbol"] == symbol:
-            try:
-                client.cancel_order_by_id(o["order_id"])
-                cancelled += 1
-            except Exception as e:
-                log.warning(f"Failed to cancel order {o['order_id']}: {e}")
+    for order_id in order_ids:
+        try:
+            client.cancel_order_by_id(order_id)
+            cancelled += 1
+        except Exception as e:
+            log.warning(f"Failed to cancel order {order_id}: {e}")
     if cancelled:
         log.info(f"Cancelled {cancelled} open orders for {symbol}")
     return cancelled
 
 
+@_broker_call
 def replace_stop_order(
     symbol: str,
     side: str,
     qty: float,
     new_stop_loss: float,
     new_take_profit: float,
+    order_ids: list[str] | None = None,
 ) -> dict | None:
     """
     Cancel existing exit orders for a symbol and place new OCO exit
@@ -297,7 +352,7 @@ def replace_stop_order(
     This is how we "move" the server-side stop: cancel old -> place new.
     """
     try:
-        cancelled = cancel_open_orders_for_symbol(symbol)
+        cancelled = cancel_open_orders_for_symbol(symbol, order_ids)
         if cancelled == 0:
             log.warning(f"No orders to replace for {symbol}")
 
@@ -322,6 +377,7 @@ def replace_stop_order(
         return None
 
 
+@_broker_call
 def get_order(order_id: str) -> dict:
     """Get order details."""
     client = get_trading_client()
@@ -340,6 +396,7 @@ def get_order(order_id: str) -> dict:
     }
 
 
+@_broker_call
 def close_position(symbol: str) -> dict:
     """Close an entire position for a symbol."""
     client = get_trading_client()
@@ -363,28 +420,31 @@ TIMEFRAME_MAP = {
 }
 
 
+@_broker_call
 def get_historical_bars(
     symbol: str,
     timeframe: str = "5Min",
     limit: int = 200,
+    start: datetime | None = None,
 ) -> list[dict]:
-    """Fetch historical bars from Alpaca."""
+    """Fetch historical bars from Alpaca (oldest first, starting at `start` if given)."""
     client = get_data_client()
     tf = TIMEFRAME_MAP.get(timeframe, TIMEFRAME_MAP["5Min"])
 
     # Calculate start time — always go back enough calendar days
     # to cover weekends/holidays (at least 7 days for intraday)
     now = datetime.now(timezone.utc)
-    if "Min" in timeframe:
-        minutes = int(timeframe.replace("Min", ""))
-        # 6.5 trading hours/day, need enough calendar days
-        trading_days_needed = (minutes * limit) / (6.5 * 60) + 1
-        calendar_days = max(7, int(trading_days_needed * 1.6))
-        start = now - timedelta(days=calendar_days)
-    elif "Hour" in timeframe:
-        start = now - timedelta(days=max(7, limit // 6 + 3))
-    else:
-        start = now - timedelta(days=limit * 2)
+    if start is None:
+        if "Min" in timeframe:
+            minutes = int(timeframe.replace("Min", ""))
+            # 6.5 trading hours/day, need enough calendar days
+            trading_days_needed = (minutes * limit) / (6.5 * 60) + 1
+            calendar_days = max(7, int(trading_days_needed * 1.6))
+            start = now - timedelta(days=calendar_days)
+        elif "Hour" in timeframe:
+            start = now - timedelta(days=max(7, limit // 6 + 3))
+        else:
+            start = now - timedelta(days=limit * 2)
 
     request = StockBarsRequest(
         symbol_or_symbols=symbol,
@@ -1,28 +1,39 @@
-"""Alpaca WebSocket streaming for real-time candle bars."""
+"""Alpaca WebSocket streaming for real-time candle bars and order updates."""
 
 import asyncio
+import functools
 from typing import Callable, Awaitable
 
 from alpaca.data.live import StockDataStream
+from alpaca.trading.stream import TradingStream
 
 from bot.config import config
+from bot.data.alpaca_client import order_to_dict
 from bot.utils.logger import log
+from bot.utils import loop_monitor, tracing
 
 
 BarHandler = Callable[[dict], Awaitable[None]]
+TradeUpdateHandler = Callable[[dict], Awaitable[None]]
 
 
 class AlpacaBarStream:
     """Manages a WebSocket connection to Alpaca for real-time bar data."""
 
-    def __init__(self, symbols: list[str], on_bar: BarHandler):
+    def __init__(self, symbols: list[str], on_bar: BarHandler, max_concurrency: int | None = None):
         self.symbols = [s.strip().upper() for s in symbols]
         self.on_bar = on_bar
+        self.max_concurrency = max(1, max_concurrency or config.BAR_CONCURRENCY)
         self._stream: StockDataStream | None = None
         self._running = True
+        self._slots: asyncio.Semaphore | None = None       # Per connection loop
+        self._slots_loop: asyncio.AbstractEventLoop | None = None
+        self._tasks: set[asyncio.Task] = set()
 
     async def _handle_bar(self, bar) -> None:
         """Process an incoming bar from the WebSocket."""
+        # Handlers run on alpaca-py's own loop (new one per connection)
+        loop_monitor.ensure_watching("bar_stream")
         bar_data = {
             "symbol": bar.symbol,
             "timestamp": bar.timestamp,
@@ -38,7 +49,31 @@ class AlpacaBarStream:
             f"H={bar_data['high']:.2f} L={bar_data['low']:.2f} "
             f"C={bar_data['close']:.2f} V={bar_data['volume']}"
         )
-        await self.on_bar(bar_data)
+        if self.max_concurrency == 1:
+            await self._process(bar_data)
+            return
+
+        # alpaca-py awaits each handler before reading the next message, so
+        # run bars as tasks (up to max_concurrency) to let one bar close's
+        # symbols be analyzed (and batched for the AI) together. Waiting for
+        # a slot here pushes back on the stream once all are busy.
+        if self._slots is None or self._slots_loop is not asyncio.get_running_loop():
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._slots_loop = asyncio.get_running_loop()
+        await self._slots.acquire()
+        task = asyncio.create_task(self._process(bar_data), name=f"bar:{bar_data['symbol']}")
+        self._tasks.add(task)
+        task.add_done_callback(functools.partial(self._bar_done, self._slots))
+
+    async def _process(self, bar_data: dict) -> None:
+        with tracing.trace():
+            await self.on_bar(bar_data)
+
+    def _bar_done(self, slots: asyncio.Semaphore, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        slots.release()
+        if not task.cancelled() and task.exception() is not None:
+            log.error(f"Bar handler failed: {task.exception()}")
 
     async def start(self) -> None:
         """Start streaming bars with exponential backoff on failures."""
@@ -110,3 +145,121 @@ class AlpacaBarStream:
             except Exception:
                 pass
             log.info("Bar stream stopped")
+
+
+class _TradingStream(TradingStream):
+    """
+    TradingStream that reports when its connection is usable and when it's lost.
+
+    alpaca-py reconnects inside run() on its own, so the hooks sit on its
+    per-connection start/close rather than around run().
+    """
+
+    def __init__(
+        self,
+        *args,
+        on_connected: Callable[[], None] | None = None,
+        on_closed: Callable[[], None] | None = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self._on_connected = on_connected
+        self._on_closed = on_closed
+
+    async def _start_ws(self) -> None:
+        # Connected, authorized (it raises otherwise) and subscribed; events
+        # queue on the socket until the hook returns
+        await super()._start_ws()
+        if self._on_connected:
+            await asyncio.to_thread(self._on_connected)
+
+    async def close(self) -> None:
+        if self._on_closed:
+            self._on_closed()
+        await super().close()
+
+
+class AlpacaTradeUpdateStream:
+    """
+    Manages a WebSocket connection to Alpaca's trade_updates channel.
+
+    Every order event (new, fill, partial_fill, canceled, ...) is converted
+    to a plain dict and passed to on_update. on_connect runs (in a thread)
+    each time a connection has authenticated and subscribed, before its
+    events are handled, so callers can re-seed state missed while down;
+    on_disconnect runs whenever that connection is lost.
+    """
+
+    def __init__(
+        self,
+        on_update: TradeUpdateHandler,
+        on_connect: Callable[[], None] | None = None,
+        on_disconnect: Callable[[], None] | None = None,
+    ):
+        self.on_update = on_update
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+        self._stream: TradingStream | None = None
+        self._running = True
+
+    async def _handle_update(self, update) -> None:
+        """Process an incoming trade update from the WebSocket."""
+        loop_monitor.ensure_watching("trade_stream")
+        event = update.event.value if hasattr(update.event, "value") else str(update.event)
+        update_data = {
+            "event": event,
+            "order": order_to_dict(update.order),
+            "price": float(update.price) if update.price else None,
+            "qty": float(update.qty) if update.qty else None,
+            "position_qty": float(update.position_qty) if update.position_qty else None,
+            "timestamp": update.timestamp,
+        }
+        log.debug(
+            f"Trade update: {event} {update_data['order']['symbol']} "
+            f"{update_data['order']['side']} order={update_data['order']['order_id']}"
+        )
+        await self.on_update(update_data)
+
+    async def start(self) -> None:
+        """Start streaming trade updates with exponential backoff on failures."""
+        if not config.ALPACA_API_KEY or not config.ALPACA_SECRET_KEY:
+            raise ValueError("ALPACA_API_KEY and ALPACA_SECRET_KEY must be set")
+
+        backoff = 5
+
+        while self._running:
+            try:
+                self._stream = _TradingStream(
+                    api_key=config.ALPACA_API_KEY,
+                    secret_key=config.ALPACA_SECRET_KEY,
+                    paper=config.ALPACA_PAPER,
+                    on_connected=self.on_connect,
+                    on_closed=self.on_disconnect,
+                )
+                self._stream.subscribe_trade_updates(self._handle_update)
+                log.info("Streaming trade updates")
+
+                await asyncio.to_thread(self._stream.run)
+                backoff = 5
+
+            except Exception as e:
+                if not self._running:
+                    break
+                log.warning(
+                    f"Trade update stream error: {e} -- reconnecting in {backoff}s"
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 120)
+            finally:
+                if self.on_disconnect:
+                    self.on_disconnect()
+
+    def stop(self) -> None:
+        """Stop the stream."""
+        self._running = False
+        if self._stream:
+            try:
+                self._stream.stop()
+            except Exception:
+                pass
+            log.info("Trade update stream stopped")
@@ -0,0 +1,173 @@
+"""
+Async access layer for Supabase.
+
+The supabase-py client is synchronous, so every call from a coroutine used
+to block the event loop for the full HTTP round trip. Coroutines go through
+this module instead: calls run on a dedicated I/O thread pool behind a
+bounded queue, with a per-call timeout and a latency histogram per operation.
+
+Usage:
+    candles = await async_db.get_candles(symbol, timeframe, limit=100)
+    resp = await async_db.query(
+        lambda c: c.table("watchlist").select("symbol").eq("active", True),
+        op="watchlist.active",
+    )
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from bot.data import supabase_client as db
+from bot.utils.logger import log
+from bot.utils import metrics
+
+
+DB_WORKERS = 4           # Concurrent Supabase requests
+MAX_PENDING = 64         # Queued + in-flight calls before callers must wait
+DEFAULT_TIMEOUT = 10.0   # Seconds a caller waits for one call (incl. queueing)
+
+_executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="supabase")
+_pending = 0
+_pending_lock = threading.Lock()
+
+_latency = metrics.histogram("tradebot_db_call_seconds", "Supabase call latency (incl. queueing).", ["op"])
+_timeouts = metrics.counter("tradebot_db_timeouts_total", "Supabase calls that timed out.", ["op"])
+_errors = metrics.counter("tradebot_db_errors_total", "Supabase calls that raised.", ["op"])
+metrics.gauge("tradebot_db_pending", "Supabase calls queued or in flight.").set_function(lambda: _pending)
+
+
+class DBTimeoutError(TimeoutError):
+    """A Supabase call (or waiting for a free slot) exceeded its timeout."""
+
+
+# ── Core ─────────────────────────────────────────────────────
+
+def _try_acquire() -> bool:
+    global _pending
+    with _pending_lock:
+        if _pending >= MAX_PENDING:
+            return False
+        _pending += 1
+        return True
+
+
+def _release(_future=None) -> None:
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+
+
+async def call(
+    fn: Callable[..., Any],
+    *args: Any,
+    op: str | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    **kwargs: Any,
+) -> Any:
+    """
+    Run a blocking Supabase function on the I/O pool and await its result.
+
+    Waits (up to `timeout`) for a slot when MAX_PENDING calls are already
+    queued. Raises DBTimeoutError if the call doesn't finish in time; the
+    request itself keeps its slot until the worker thread returns, so the
+    queue stays bounded even when callers give up.
+    """
+    op = op or getattr(fn, "__name__", "call")
+    deadline = time.monotonic() + timeout
+
+    while not _try_acquire():
+        if time.monotonic() >= deadline:
+            _timeouts.labels(op=op).inc()
+            raise DBTimeoutError(f"Supabase queue full ({MAX_PENDING} pending) for {op}")
+        await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+
+    def _run() -> Any:
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _latency.labels(op=op).observe(time.perf_counter() - start)
+
+    future = _executor.submit(_run)
+    future.add_done_callback(_release)
+
+    try:
+        return await asyncio.wait_for(
+            asyncio.wrap_future(future), max(deadline - time.monotonic(), 0.001)
+        )
+    except asyncio.TimeoutError:
+        _timeouts.labels(op=op).inc()
+        log.warning(f"Supabase call {op} timed out after {timeout:.1f}s")
+        raise DBTimeoutError(f"Supabase call {op} timed out after {timeout:.1f}s") from None
+    except Exception:
+        _errors.labels(op=op).inc()
+        raise
+
+
+async def query(
+    build: Callable[[Any], Any],
+    op: str,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> Any:
+    """
+    Execute an ad-hoc PostgREST query on the I/O pool.
+
+    Args:
+        build: Takes the Supabase client, returns a query builder (without .execute()).
+        op: Name used for latency/timeout stats, e.g. "watchlist.active".
+    """
+    return await call(lambda: build(db.get_client()).execute(), op=op, timeout=timeout)
+
+
+def stats() -> dict[str, Any]:
+    """Per-operation latency/timeout/error summary for the status server."""
+    with _pending_lock:
+        pending = _pending
+    timeouts = {labels["op"]: int(c.value) for labels, c in _timeouts.children()}
+    errors = {labels["op"]: int(c.value) for labels, c in _errors.children()}
+    return {
+        "pending": pending,
+        "max_pending": MAX_PENDING,
+        "workers": DB_WORKERS,
+        "operations": {
+            labels["op"]: {
+                **hist.snapshot(),
+                "timeouts": timeouts.get(labels["op"], 0),
+                "errors": errors.get(labels["op"], 0),
+            }
+            for labels, hist in _latency.children()
+        },
+    }
+
+
+# ── Async versions of supabase_client functions ──────────────
+
+def _async(fn: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await call(fn, *args, op=fn.__name__, **kwargs)
+    return wrapper
+
+
+upsert_candle = _async(db.upsert_candle)
+get_candles = _async(db.get_candles)
+get_candles_bulk = _async(db.get_candles_bulk)
+insert_signal = _async(db.insert_signal)
+insert_trade = _async(db.insert_trade)
+update_trade = _async(db.update_trade)
+update_trades = _async(db.update_trades)
+get_open_trades = _async(db.get_open_trades)
+upsert_position = _async(db.upsert_position)
+upsert_positions = _async(db.upsert_positions)
+delete_position = _async(db.delete_position)
+delete_positions = _async(db.delete_positions)
+get_positions = _async(db.get_positions)
+insert_account_snapshot = _async(db.insert_account_snapshot)
+insert_news = _async(db.insert_news)
+get_setting = _async(db.get_setting)
+update_setting = _async(db.update_setting)
@@ -0,0 +1,135 @@
+"""
+Recent candles per symbol and timeframe, kept in memory for the status API.
+
+The dashboard charts used to read every candle from the Supabase `candles`
+table. The bot already sees every bar (backfill + stream), so it keeps the
+most recent MAX_BARS per series here, column by column, and the status
+server serves them straight from memory with cursor-based reads.
+
+Timestamps are stored as epoch milliseconds; a read returns the bars after
+a cursor plus the cursor for the next read.
+"""
+
+import bisect
+import threading
+from datetime import datetime
+from typing import Any
+
+MAX_BARS = 2000              # Bars kept per (symbol, timeframe)
+_TRIM_SLACK = 250            # Trim only once this many extra bars piled up
+
+COLUMNS = ("o", "h", "l", "c", "v", "vw")
+
+
+def to_ms(ts: Any) -> int:
+    """Bar timestamp (datetime, pandas Timestamp or ISO string) as epoch ms."""
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    return int(ts.timestamp() * 1000)
+
+
+class _Series:
+    """Columnar candles for one symbol/timeframe, sorted by time."""
+
+    __slots__ = ("t", "o", "h", "l", "c", "v", "vw")
+
+    def __init__(self):
+        self.t: list[int] = []
+        self.o: list[float] = []
+        self.h: list[float] = []
+        self.l: list[float] = []
+        self.c: list[float] = []
+        self.v: list[float] = []
+        self.vw: list[float | None] = []
+
+    def put(self, t: int, row: tuple) -> None:
+        """Insert a bar, replacing one with the same timestamp."""
+        if not self.t or t > self.t[-1]:
+            i = len(self.t)
+            self.t.append(t)
+            for name, value in zip(COLUMNS, row):
+                getattr(self, name).append(value)
+        else:
+            i = bisect.bisect_left(self.t, t)
+            if i < len(self.t) and self.t[i] == t:
+                for name, value in zip(COLUMNS, row):
+                    getattr(self, name)[i] = value
+            else:
+                self.t.insert(i, t)
+                for name, value in zip(COLUMNS, row):
+                    getattr(self, name).insert(i, value)
+
+    def trim(self, keep: int) -> None:
+        if len(self.t) > keep + _TRIM_SLACK:
+            drop = len(self.t) - keep
+            for name in self.__slots__:
+                del getattr(self, name)[:drop]
+
+
+class CandleStore:
+    """In-memory candle series for the status API (thread-safe)."""
+
+    def __init__(self, max_bars: int = MAX_BARS):
+        self._lock = threading.Lock()
+        self._series: dict[tuple[str, str], _Series] = {}
+        self._max_bars = max_bars
+
+    @staticmethod
+    def _row(bar: dict) -> tuple:
+        vwap = bar.get("vwap")
+        return (
+            float(bar["open"]), float(bar["high"]), float(bar["low"]),
+            float(bar["close"]), float(bar["volume"]),
+            float(vwap) if vwap is not None else None,
+        )
+
+    def add(self, symbol: str, timeframe: str, bar: dict) -> None:
+        """Record one bar (from the stream)."""
+        self.extend(symbol, timeframe, [bar])
+
+    def extend(self, symbol: str, timeframe: str, bars: list[dict]) -> None:
+        """Record a batch of bars (backfill); later duplicates replace earlier ones."""
+        rows = [(to_ms(b["timestamp"]), self._row(b)) for b in bars]
+        with self._lock:
+            series = self._series.setdefault((symbol, timeframe), _Series())
+            for t, row in rows:
+                series.put(t, row)
+            series.trim(self._max_bars)
+
+    def read(
+        self, symbol: str, timeframe: str, since: int | None = None, limit: int = MAX_BARS
+    ) -> dict[str, Any] | None:
+        """
+        Columnar candles after `since` (epoch ms, exclusive), oldest first.
+
+        Returns:
+            {"t": [...], "o": [...], ..., "cursor": <ms of last bar>} with at
+            most `limit` of the newest matching bars, or None when the series
+            isn't tracked.
+        """
+        with self._lock:
+            series = self._series.get((symbol, timeframe))
+            if series is None:
+                return None
+            end = len(series.t)
+            start = bisect.bisect_right(series.t, since) if since is not None else 0
+            start = max(start, end - limit)
+            data = {name: getattr(series, name)[start:end] for name in series.__slots__}
+            cursor = series.t[-1] if series.t else since
+        data["cursor"] = cursor
+        return data
+
+    def symbols(self, timeframe: str | None = None) -> list[str]:
+        with self._lock:
+            return sorted({s for s, tf in self._series if timeframe is None or tf == timeframe})
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "series": len(self._series),
+                "bars": sum(len(s.t) for s in self._series.values()),
+                "max_bars": self._max_bars,
+            }
+
+
+candles = CandleStore()
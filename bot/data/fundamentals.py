@@ -7,7 +7,7 @@ from typing import Any
 import httpx
 
 from bot.config import config
-from bot.data.supabase_client import get_client
+from bot.data import async_db
 from bot.utils.logger import log
 
 MASSIVE_API_KEY = os.getenv("MASSIVE_API_KEY", "")
@@ -176,15 +176,12 @@ async def fetch_fundamentals(symbol: str) -> dict[str, Any]:
 
 # ── Supabase Cache ────────────────────────────────────────────
 
-def _get_cached(symbol: str) -> dict[str, Any] | None:
+async def _get_cached(symbol: str) -> dict[str, Any] | None:
     """Get cached fundamentals from Supabase if still fresh."""
     try:
-        client = get_client()
-        resp = (
-            client.table("fundamentals")
-            .select("*")
-            .eq("symbol", symbol)
-            .execute()
+        resp = await async_db.query(
+            lambda c: c.table("fundamentals").select("*").eq("symbol", symbol),
+            op="fundamentals.get",
         )
         if not resp.data:
             return None
@@ -198,13 +195,15 @@ def _get_cached(symbol: str) -> dict[str, Any] | None:
         return None
 
 
-def _save_to_cache(data: dict[str, Any]) -> None:
+async def _save_to_cache(data: dict[str, Any]) -> None:
     """Upsert fundamentals into Supabase cache."""
     try:
-        client = get_client()
         row = {k: v for k, v in data.items() if v is not None}
         row["updated_at"] = datetime.now(timezone.utc).isoformat()
-        client.table("fundamentals").upsert(row, on_conflict="symbol").execute()
+        await async_db.query(
+            lambda c: c.table("fundamentals").upsert(row, on_conflict="symbol"),
+            op="fundamentals.upsert",
+        )
     except Exception as e:
         log.error(f"Failed to cache fundamentals for {data.get('symbol')}: {e}")
 
@@ -219,14 +218,14 @@ async def get_fundamentals(symbol: str, force_refresh: bool = False) -> dict[str
     Returns empty dict if data unavailable.
     """
     if not force_refresh:
-        cached = _get_cached(symbol)
+        cached = await _get_cached(symbol)
         if cached:
             log.debug(f"Using cached fundamentals for {symbol}")
             return cached
 
     data = await fetch_fundamentals(symbol)
     if data and data.get("symbol"):
-        _save_to_cache(data)
+        await _save_to_cache(data)
         return data
     return {}
 
@@ -0,0 +1,220 @@
+"""
+Higher-timeframe key levels per symbol, kept in memory for the bar path.
+
+The intraday S/R in price_action only sees the last 100 bars of
+config.TIMEFRAME (~1.5 sessions on 5Min). This service maintains, per symbol:
+  - daily and hourly swing support/resistance
+  - prior-day high/low/close
+  - today's opening range and session high/low
+
+Daily levels are fetched once per session and hourly levels once an hour in
+a background task; the opening range and session extremes are updated from
+streamed bars. The bar path only reads the cached snapshot.
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from bot.analysis.price_action import find_support_resistance
+from bot.data import alpaca_client as alpaca
+from bot.utils.logger import log
+
+ET = ZoneInfo("America/New_York")
+
+DAILY_DAYS = 180             # Calendar days of daily bars (~125 sessions)
+HOURLY_DAYS = 30             # Calendar days of hourly bars
+HOURLY_BARS = 150            # Most recent hourly bars used for swings
+MAX_BARS = 1000              # Request limit (Alpaca returns oldest first from `start`)
+SWING_WINDOW = 10            # Bars each side are +/- 5 on the higher timeframes
+OPENING_RANGE_MINUTES = 30
+HOURLY_REFRESH_SECS = 3600
+FETCH_CONCURRENCY = 4        # Parallel Alpaca history requests
+
+_SESSION_OPEN = (9, 30)
+_SESSION_CLOSE = (16, 0)
+
+
+def _et(ts: Any) -> datetime:
+    """Bar timestamp (datetime or ISO string) as an ET datetime."""
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    return ts.astimezone(ET)
+
+
+def _session_minute(ts: datetime) -> int:
+    """Minutes since 9:30 ET (negative before the open)."""
+    return (ts.hour - _SESSION_OPEN[0]) * 60 + ts.minute - _SESSION_OPEN[1]
+
+
+def _in_session(ts: datetime) -> bool:
+    close = (_SESSION_CLOSE[0] - _SESSION_OPEN[0]) * 60 + _SESSION_CLOSE[1] - _SESSION_OPEN[1]
+    return 0 <= _session_minute(ts) < close
+
+
+def _swing_levels(bars: list[dict]) -> dict[str, list[float]]:
+    if len(bars) < SWING_WINDOW + 1:
+        return {"support": [], "resistance": []}
+    df = pd.DataFrame(bars, columns=["high", "low"])
+    return find_support_resistance(df, window=SWING_WINDOW)
+
+
+def _prior_day(daily_bars: list[dict], today) -> dict[str, float] | None:
+    """Last completed daily bar before `today` (ET date)."""
+    for bar in reversed(daily_bars):
+        if _et(bar["timestamp"]).date() < today:
+            return {"high": bar["high"], "low": bar["low"], "close": bar["close"]}
+    return None
+
+
+class LevelService:
+    """Per-symbol key levels, refreshed in the background (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._levels: dict[str, dict[str, Any]] = {}
+        self._hourly_at: dict[str, float] = {}
+        self._refreshes = 0
+        self._errors = 0
+
+    # ── Background refresh ───────────────────────────────────
+
+    def _fetch_session(self, symbol: str, today) -> dict[str, Any]:
+        """Daily levels + today's intraday state from REST (blocking)."""
+        now = datetime.now(timezone.utc)
+        daily = alpaca.get_historical_bars(
+            symbol, timeframe="1Day", limit=MAX_BARS, start=now - timedelta(days=DAILY_DAYS)
+        )
+        session_open = datetime(today.year, today.month, today.day, *_SESSION_OPEN, tzinfo=ET)
+        intraday = (
+            alpaca.get_historical_bars(symbol, timeframe="5Min", limit=MAX_BARS, start=session_open)
+            if now > session_open else []
+        )
+
+        entry: dict[str, Any] = {
+            "session_date": today.isoformat(),
+            "prior_day": _prior_day(daily, today),
+            "daily": _swing_levels([b for b in daily if _et(b["timestamp"]).date() < today]),
+            "hourly": {"support": [], "resistance": []},
+            "opening_range": None,
+            "session": None,
+        }
+        for bar in intraday:
+            self._apply_bar(entry, bar, today)
+        return entry
+
+    def _fetch_hourly(self, symbol: str) -> dict[str, list[float]]:
+        start = datetime.now(timezone.utc) - timedelta(days=HOURLY_DAYS)
+        bars = alpaca.get_historical_bars(symbol, timeframe="1Hour", limit=MAX_BARS, start=start)
+        return _swing_levels(bars[-HOURLY_BARS:])
+
+    async def refresh(self, symbols: list[str]) -> None:
+        """Fetch whatever is stale: daily/session state once per day, hourly once an hour."""
+        today = datetime.now(ET).date()
+        sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+        async def _refresh_symbol(symbol: str) -> None:
+            async with sem:
+                try:
+                    with self._lock:
+                        current = self._levels.get(symbol)
+                    if current is None or current["session_date"] != today.isoformat():
+                        entry = await asyncio.to_thread(self._fetch_session, symbol, today)
+                        with self._lock:
+                            self._levels[symbol] = entry
+                        self._hourly_at.pop(symbol, None)
+
+                    if time.time() - self._hourly_at.get(symbol, 0) >= HOURLY_REFRESH_SECS:
+                        hourly = await asyncio.to_thread(self._fetch_hourly, symbol)
+                        with self._lock:
+                            self._levels[symbol]["hourly"] = hourly
+                            self._levels[symbol]["updated_at"] = time.time()
+                        self._hourly_at[symbol] = time.time()
+                        self._refreshes += 1
+                except Exception as e:
+                    self._errors += 1
+                    log.warning(f"Key level refresh failed for {symbol}: {e}")
+
+        await asyncio.gather(*(_refresh_symbol(s) for s in symbols))
+
+        with self._lock:
+            for symbol in [s for s in self._levels if s not in symbols]:
+                del self._levels[symbol]
+                self._hourly_at.pop(symbol, None)
+
+    async def run(self, get_symbols: Callable[[], list[str]], interval: float = 300) -> None:
+        """Background task: refresh stale levels for the current watchlist."""
+        while True:
+            await self.refresh(list(get_symbols()))
+            await asyncio.sleep(interval)
+
+    # ── Intraday updates ─────────────────────────────────────
+
+    @staticmethod
+    def _apply_bar(entry: dict[str, Any], bar: dict, today) -> None:
+        """Fold one intraday bar into opening range / session extremes."""
+        ts = _et(bar["timestamp"])
+        if ts.date() != today or not _in_session(ts):
+            return
+
+        session = entry["session"]
+        if session is None:
+            entry["session"] = {"high": bar["high"], "low": bar["low"]}
+        else:
+            session["high"] = max(session["high"], bar["high"])
+            session["low"] = min(session["low"], bar["low"])
+
+        if _session_minute(ts) < OPENING_RANGE_MINUTES:
+            rng = entry["opening_range"]
+            if rng is None:
+                entry["opening_range"] = {"high": bar["high"], "low": bar["low"]}
+            else:
+                rng["high"] = max(rng["high"], bar["high"])
+                rng["low"] = min(rng["low"], bar["low"])
+
+    def on_bar(self, bar: dict) -> None:
+        """Update the opening range and session high/low from a streamed bar."""
+        today = datetime.now(ET).date()
+        with self._lock:
+            entry = self._levels.get(bar["symbol"])
+            if entry is not None and entry["session_date"] == today.isoformat():
+                self._apply_bar(entry, bar, today)
+
+    # ── Queries ──────────────────────────────────────────────
+
+    def key_levels(self, symbol: str) -> dict[str, Any] | None:
+        """Snapshot of a symbol's higher-timeframe levels, or None if not loaded yet."""
+        with self._lock:
+            entry = self._levels.get(symbol)
+            if entry is None:
+                return None
+            now = datetime.now(ET)
+            rng = entry["opening_range"]
+            return {
+                "prior_day": dict(entry["prior_day"]) if entry["prior_day"] else None,
+                "opening_range": {
+                    **rng,
+                    "complete": _session_minute(now) >= OPENING_RANGE_MINUTES
+                    or now.date().isoformat() != entry["session_date"],
+                } if rng else None,
+                "session": dict(entry["session"]) if entry["session"] else None,
+                "daily": {k: list(v) for k, v in entry["daily"].items()},
+                "hourly": {k: list(v) for k, v in entry["hourly"].items()},
+            }
+
+    def stats(self) -> dict[str, Any]:
+        """Summary for the status server."""
+        with self._lock:
+            return {
+                "symbols": len(self._levels),
+                "refreshes": self._refreshes,
+                "errors": self._errors,
+            }
+
+
+levels = LevelService()
@@ -1,11 +1,14 @@
 """Supabase client for reading/writing trading data."""
 
+import asyncio
+import threading
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Callable
 
 from supabase import create_client, Client
 
 from bot.config import config
+from bot.utils import metrics
 from bot.utils.logger import log
 
 
@@ -71,6 +74,41 @@ def get_candles(
     return list(reversed(resp.data)) if resp.data else []
 
 
+_MAX_ROWS = 1000    # PostgREST's default max-rows per response
+
+
+def get_candles_bulk(
+    symbols: list[str], timeframe: str, limit: int = 200
+) -> dict[str, list[dict[str, Any]]]:
+    """
+    Fetch recent candles for several symbols with as few queries as possible.
+
+    Symbols are queried together in groups whose combined limit fits in one
+    response. A symbol whose bars are sparser than its neighbours' can come
+    back with fewer than `limit` rows; callers that need exactly `limit`
+    should re-fetch those with get_candles().
+    """
+    client = get_client()
+    per_query = max(1, _MAX_ROWS // max(limit, 1))
+    out: dict[str, list[dict[str, Any]]] = {s: [] for s in symbols}
+    for i in range(0, len(symbols), per_query):
+        group = symbols[i:i + per_query]
+        resp = (
+            client.table("candles")
+            .select("*")
+            .in_("symbol", group)
+            .eq("timeframe", timeframe)
+            .order("timestamp", desc=True)
+            .limit(limit * len(group))
+            .execute()
+        )
+        for row in resp.data or []:
+            rows = out.get(row["symbol"])
+            if rows is not None and len(rows) < limit:
+                rows.append(row)
+    return {s: list(reversed(rows)) for s, rows in out.items()}
+
+
 # ── Signals ──────────────────────────────────────────────────
 
 def insert_signal(
@@ -104,6 +142,45 @@ def insert_signal(
     return resp.data[0]["id"]
 
 
+def _fetch_all(build_query: Callable[[], Any]) -> list[dict[str, Any]]:
+    """
+    Every row of a query, one _MAX_ROWS page at a time.
+
+    `build_query` returns a fresh, uniquely ordered query per page: postgrest
+    builders accumulate parameters, so calling .range() twice on the same
+    builder sends two offsets.
+    """
+    rows: list[dict[str, Any]] = []
+    while True:
+        query = build_query().range(len(rows), len(rows) + _MAX_ROWS - 1)
+        page = query.execute().data or []
+        rows.extend(page)
+        if len(page) < _MAX_ROWS:
+            return rows
+
+
+def get_signal_history(since: datetime) -> list[dict[str, Any]]:
+    """Combined signals created since `since`, oldest first."""
+    return _fetch_all(lambda: (
+        get_client().table("signals")
+        .select("id, symbol, name, direction, strength, details, created_at")
+        .eq("signal_type", "combined")
+        .gte("created_at", since.isoformat())
+        .order("id")
+    ))
+
+
+def get_ai_decisions(since: datetime) -> list[dict[str, Any]]:
+    """AI trade decisions from the activity log since `since`, oldest first."""
+    return _fetch_all(lambda: (
+        get_client().table("activity_log")
+        .select("symbol, detail, metadata, created_at")
+        .eq("event_type", "trade_decision")
+        .gte("created_at", since.isoformat())
+        .order("id")
+    ))
+
+
 # ── Trades ───────────────────────────────────────────────────
 
 def insert_trade(trade_data: dict[str, Any]) -> int:
@@ -113,6 +190,18 @@ def insert_trade(trade_data: dict[str, Any]) -> int:
     return resp.data[0]["id"]
 
 
+def get_traded_signal_ids(since: datetime) -> set[int]:
+    """IDs of signals that led to a trade since `since`."""
+    rows = _fetch_all(lambda: (
+        get_client().table("trades")
+        .select("signal_id")
+        .gte("created_at", since.isoformat())
+        .not_.is_("signal_id", "null")
+        .order("id")
+    ))
+    return {row["signal_id"] for row in rows}
+
+
 def update_trade(trade_id: int, updates: dict[str, Any]) -> None:
     """Update an existing trade."""
     client = get_client()
@@ -120,8 +209,27 @@ def update_trade(trade_id: int, updates: dict[str, Any]) -> None:
     client.table("trades").update(updates).eq("id", trade_id).execute()
 
 
+def update_trades(updates: dict[int, dict[str, Any]]) -> int:
+    """
+    Update many trades, one request per distinct update payload.
+
+    Trades receiving identical changes (e.g. several cancelled at once)
+    share a single `id IN (...)` update. Returns the number of requests sent.
+    """
+    groups: dict[str, tuple[dict[str, Any], list[int]]] = {}
+    for trade_id, fields in updates.items():
+        key = repr(sorted(fields.items()))
+        groups.setdefault(key, (fields, []))[1].append(trade_id)
+
+    client = get_client()
+    now = datetime.now(timezone.utc).isoformat()
+    for fields, ids in groups.values():
+        client.table("trades").update({**fields, "updated_at": now}).in_("id", ids).execute()
+    return len(groups)
+
+
 def get_open_trades() -> list[dict[str, Any]]:
-    """Get all trades that are not yet closed."""
+    """Get all trades that are not yet closed (including queued, unflushed changes)."""
     client = get_client()
     resp = (
         client.table("trades")
@@ -129,7 +237,7 @@ def get_open_trades() -> list[dict[str, Any]]:
         .in_("status", ["pending", "filled"])
         .execute()
     )
-    return resp.data or []
+    return writer.overlay_open_trades(resp.data or [])
 
 
 # ── Positions ────────────────────────────────────────────────
@@ -143,12 +251,30 @@ def upsert_position(position_data: dict[str, Any]) -> None:
     ).execute()
 
 
+def upsert_positions(positions: list[dict[str, Any]]) -> None:
+    """Insert or update many positions in a single request."""
+    if not positions:
+        return
+    client = get_client()
+    now = datetime.now(timezone.utc).isoformat()
+    rows = [{**p, "updated_at": now} for p in positions]
+    client.table("positions").upsert(rows, on_conflict="symbol").execute()
+
+
 def delete_position(symbol: str) -> None:
     """Remove a closed position."""
     client = get_client()
     client.table("positions").delete().eq("symbol", symbol).execute()
 
 
+def delete_positions(symbols: list[str]) -> None:
+    """Remove many closed positions in a single request."""
+    if not symbols:
+        return
+    client = get_client()
+    client.table("positions").delete().in_("symbol", symbols).execute()
+
+
 def get_positions() -> list[dict[str, Any]]:
     """Get all current positions."""
     client = get_client()
@@ -210,3 +336,181 @@ def update_setting(key: str, value: Any) -> None:
         },
         on_conflict="key",
     ).execute()
+
+
+# ── Write-behind queue ───────────────────────────────────────
+
+class WriteBehindQueue:
+    """
+    Coalesces position and trade writes and flushes them in bulk.
+
+    Repeated writes of the same row within a flush window collapse into one.
+    Positions are only sent when a value changed since the last flush (as
+    full rows, since the upsert may insert); trades only send the fields
+    that changed. Writes to one symbol keep their order: an upsert queued
+    behind a pending delete is held until the delete has been sent. Safe to
+    call from any thread or event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._positions: dict[str, dict[str, Any]] = {}
+        self._position_deletes: set[str] = set()
+        self._held_positions: dict[str, dict[str, Any]] = {}   # Upserts waiting for a delete
+        self._trades: dict[int, dict[str, Any]] = {}
+        self._sent_positions: dict[str, dict[str, Any]] = {}
+        self._sent_trades: dict[int, dict[str, Any]] = {}
+        self.requests_sent = 0
+        self.writes_coalesced = 0
+
+    def upsert_position(self, position_data: dict[str, Any]) -> None:
+        """Queue a position upsert (latest write per symbol wins)."""
+        row = {k: v for k, v in position_data.items() if k != "updated_at"}
+        with self._lock:
+            queue = self._held_positions if row["symbol"] in self._position_deletes else self._positions
+            if row["symbol"] in queue:
+                self.writes_coalesced += 1
+            queue[row["symbol"]] = row
+
+    def delete_position(self, symbol: str) -> None:
+        """Queue a position delete (cancels any queued upsert for the symbol)."""
+        with self._lock:
+            if self._positions.pop(symbol, None) is not None:
+                self.writes_coalesced += 1
+            if self._held_positions.pop(symbol, None) is not None:
+                self.writes_coalesced += 1
+            self._position_deletes.add(symbol)
+
+    def update_trade(self, trade_id: int, updates: dict[str, Any]) -> None:
+        """Queue a trade update (merged with any queued update for the same trade)."""
+        fields = {k: v for k, v in updates.items() if k != "updated_at"}
+        with self._lock:
+            if trade_id in self._trades:
+                self.writes_coalesced += 1
+            self._trades.setdefault(trade_id, {}).update(fields)
+
+    def overlay_open_trades(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Apply queued trade updates to freshly read rows so readers see their own writes."""
+        with self._lock:
+            if not self._trades:
+                return rows
+            pending = {tid: dict(fields) for tid, fields in self._trades.items()}
+        merged = []
+        for row in rows:
+            fields = pending.get(row.get("id"))
+            if fields:
+                row = {**row, **fields}
+            if row.get("status") in ("pending", "filled"):
+                merged.append(row)
+        return merged
+
+    def pending(self) -> int:
+        """Number of rows waiting to be flushed."""
+        with self._lock:
+            return (
+                len(self._positions) + len(self._position_deletes)
+                + len(self._held_positions) + len(self._trades)
+            )
+
+    def flush(self) -> int:
+        """Send everything queued (blocking). Returns the number of requests sent."""
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self) -> int:
+        with self._lock:
+            positions, self._positions = self._positions, {}
+            deletes, self._position_deletes = self._position_deletes, set()
+            held, self._held_positions = self._held_positions, {}
+            trades, self._trades = self._trades, {}
+
+        requests = 0
+
+        changed = [
+            row for sym, row in positions.items()
+            if self._sent_positions.get(sym) != row
+        ]
+        try:
+            if changed:
+                upsert_positions(changed)
+                requests += 1
+                for row in changed:
+                    self._sent_positions[row["symbol"]] = row
+        except Exception as e:
+            log.warning(f"Position flush failed ({len(changed)} rows): {e}")
+            self._requeue(positions=positions)
+
+        try:
+            if deletes:
+                delete_positions(sorted(deletes))
+                requests += 1
+                for sym in deletes:
+                    self._sent_positions.pop(sym, None)
+            # The deletes are in; upserts that came after them go out next flush
+            self._requeue(positions=held)
+        except Exception as e:
+            log.warning(f"Position delete flush failed ({len(deletes)} rows): {e}")
+            self._requeue(deletes=deletes, held=held)
+
+        diffs: dict[int, dict[str, Any]] = {}
+        for trade_id, fields in trades.items():
+            sent = self._sent_trades.get(trade_id, {})
+            diff = {k: v for k, v in fields.items() if sent.get(k, object()) != v}
+            if diff:
+                diffs[trade_id] = diff
+        try:
+            if diffs:
+                requests += update_trades(diffs)
+                for trade_id, diff in diffs.items():
+                    if diff.get("status") in ("closed", "cancelled"):
+                        self._sent_trades.pop(trade_id, None)
+                    else:
+                        self._sent_trades.setdefault(trade_id, {}).update(diff)
+        except Exception as e:
+            log.warning(f"Trade flush failed ({len(diffs)} trades): {e}")
+            self._requeue(trades=trades)
+
+        self.requests_sent += requests
+        return requests
+
+    def _requeue(
+        self,
+        positions: dict[str, dict[str, Any]] | None = None,
+        deletes: set[str] | None = None,
+        trades: dict[int, dict[str, Any]] | None = None,
+        held: dict[str, dict[str, Any]] | None = None,
+    ) -> None:
+        """Put a batch back without overwriting newer queued writes or reordering them."""
+        with self._lock:
+            for sym, row in (positions or {}).items():
+                if sym not in self._position_deletes:
+                    self._positions.setdefault(sym, row)
+            for sym in deletes or ():
+                # The delete still comes first: anything queued since waits behind it
+                if sym in self._positions:
+                    self._held_positions[sym] = self._positions.pop(sym)
+                self._position_deletes.add(sym)
+            for sym, row in (held or {}).items():
+                if sym in self._position_deletes:
+                    self._held_positions.setdefault(sym, row)
+            for trade_id, fields in (trades or {}).items():
+                self._trades[trade_id] = {**fields, **self._trades.get(trade_id, {})}
+
+    async def run(self, interval: float = 2.0) -> None:
+        """Background task that flushes the queue every `interval` seconds."""
+        from bot.data.async_db import call
+
+        while True:
+            await asyncio.sleep(interval)
+            if self.pending():
+                try:
+                    await call(self.flush, op="write_behind_flush", timeout=30)
+                except Exception as e:
+                    log.warning(f"Write-behind flush failed: {e}")
+
+
+writer = WriteBehindQueue()
+metrics.gauge(
+    "tradebot_db_writebehind_pending", "Position/trade rows waiting for the next bulk flush."
+).set_function(writer.pending)
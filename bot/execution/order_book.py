@@ -0,0 +1,232 @@
+"""
+In-memory order and fill book, fed by Alpaca's trade-updates stream.
+
+Tracks every known order by ID and every open order by symbol, including
+bracket/OCO child legs (linked to their parent), plus a short history of
+fills. The position tracker, order manager and order-status sync query the
+book instead of polling Alpaca REST once per order.
+
+The stream runs on its own thread, so all access goes through a lock.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from bot.utils.logger import log
+
+
+# Alpaca order statuses after which an order can no longer fill or be cancelled
+TERMINAL_STATUSES = {
+    "filled", "canceled", "cancelled", "expired", "rejected", "replaced", "done_for_day",
+}
+
+# Order types that protect a position on the exit side
+PROTECTIVE_TYPES = {"stop", "limit", "stop_limit", "trailing_stop"}
+
+MAX_FILLS = 500          # Recent fills kept for queries
+MAX_TERMINAL = 1000      # Finished orders kept for status lookups
+
+
+class OrderBook:
+    """Order and fill state keyed by order ID and by symbol."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._orders: dict[str, dict[str, Any]] = {}
+        self._open_by_symbol: dict[str, set[str]] = {}
+        self._children: dict[str, set[str]] = {}
+        self._terminal: deque[str] = deque()
+        self._fills: deque[dict[str, Any]] = deque(maxlen=MAX_FILLS)
+        self._live = False
+        self._events = 0
+        self._last_event_at: float | None = None
+        self._seeded_at: float | None = None
+
+    # ── Updates ──────────────────────────────────────────────
+
+    def seed(self, orders: list[dict[str, Any]]) -> None:
+        """
+        Replace open-order state with a REST snapshot (from get_open_orders(nested=True)).
+
+        Finished orders already in the book are kept so status lookups still hit.
+        """
+        with self._lock:
+            for order_id in [oid for ids in self._open_by_symbol.values() for oid in ids]:
+                self._orders.pop(order_id, None)
+            self._open_by_symbol.clear()
+            for order in orders:
+                self._store(order)
+                for leg in order.get("legs") or []:
+                    self._store(leg)
+            self._seeded_at = time.time()
+        log.info(f"Order book seeded with {len(orders)} open orders")
+
+    def remember(self, order: dict[str, Any]) -> None:
+        """Store an order fetched over REST so later lookups don't hit Alpaca again."""
+        with self._lock:
+            self._store(order)
+
+    def apply(self, update: dict[str, Any]) -> dict[str, Any]:
+        """
+        Apply a trade-updates event and return the stored order.
+
+        Args:
+            update: Dict with 'event', 'order' (see alpaca_client.order_to_dict),
+                    and optional 'price', 'qty', 'timestamp'.
+        """
+        event = update["event"]
+        order = update["order"]
+        with self._lock:
+            self._events += 1
+            self._last_event_at = time.time()
+            stored = self._store(order)
+            for leg in order.get("legs") or []:
+                self._store(leg)
+            if event in ("fill", "partial_fill"):
+                self._fills.append({
+                    "order_id": stored["order_id"],
+                    "parent_id": stored.get("parent_id"),
+                    "symbol": stored["symbol"],
+                    "side": stored["side"],
+                    "price": update.get("price"),
+                    "qty": update.get("qty"),
+                    "event": event,
+                    "timestamp": update.get("timestamp"),
+                })
+            return dict(stored)
+
+    def set_live(self, live: bool) -> None:
+        """Mark whether the trade-updates stream is connected."""
+        self._live = live
+
+    def _store(self, order: dict[str, Any]) -> dict[str, Any]:
+        """Insert/update an order and maintain the indexes (lock must be held)."""
+        order_id = order["order_id"]
+        existing = self._orders.get(order_id, {})
+        stored = {**existing, **{k: v for k, v in order.items() if k != "legs"}}
+        # Legs don't know their parent in stream events; keep the link we learnt earlier
+        if not stored.get("parent_id") and existing.get("parent_id"):
+            stored["parent_id"] = existing["parent_id"]
+        stored["updated_at"] = time.time()
+        self._orders[order_id] = stored
+
+        parent_id = stored.get("parent_id")
+        if parent_id:
+            self._children.setdefault(parent_id, set()).add(order_id)
+
+        symbol = stored["symbol"]
+        if stored["status"] in TERMINAL_STATUSES:
+            open_ids = self._open_by_symbol.get(symbol)
+            if open_ids and order_id in open_ids:
+                open_ids.discard(order_id)
+                if not open_ids:
+                    del self._open_by_symbol[symbol]
+            if not existing or existing.get("status") not in TERMINAL_STATUSES:
+                self._terminal.append(order_id)
+                self._evict()
+        else:
+            self._open_by_symbol.setdefault(symbol, set()).add(order_id)
+        return stored
+
+    def _evict(self) -> None:
+        """Drop the oldest finished orders beyond MAX_TERMINAL (lock must be held)."""
+        while len(self._terminal) > MAX_TERMINAL:
+            order_id = self._terminal.popleft()
+            order = self._orders.get(order_id)
+            if order and order["status"] in TERMINAL_STATUSES:
+                del self._orders[order_id]
+                parent_id = order.get("parent_id")
+                if parent_id in self._children:
+                    self._children[parent_id].discard(order_id)
+                    if not self._children[parent_id]:
+                        del self._children[parent_id]
+
+    # ── Queries ──────────────────────────────────────────────
+
+    @property
+    def live(self) -> bool:
+        """True when the stream is connected and the book has been seeded."""
+        return self._live and self._seeded_at is not None
+
+    def get(self, order_id: str) -> dict[str, Any] | None:
+        """Get an order by ID, or None if the book has never seen it."""
+        with self._lock:
+            order = self._orders.get(order_id)
+            return dict(order) if order else None
+
+    def open_orders(self, symbol: str | None = None) -> list[dict[str, Any]]:
+        """Get open orders (parents and legs), optionally for one symbol."""
+        with self._lock:
+            if symbol is not None:
+                ids = self._open_by_symbol.get(symbol, set())
+            else:
+                ids = {oid for s in self._open_by_symbol.values() for oid in s}
+            return [dict(self._orders[oid]) for oid in ids]
+
+    def open_order_ids(self, symbol: str) -> list[str] | None:
+        """
+        IDs of open orders for a symbol, or None if the book isn't live.
+
+        None tells alpaca_client.cancel_open_orders_for_symbol to list over REST.
+        """
+        if not self.live:
+            return None
+        with self._lock:
+            return list(self._open_by_symbol.get(symbol, ()))
+
+    def children(self, parent_id: str) -> list[dict[str, Any]]:
+        """Get the bracket/OCO legs of a parent order."""
+        with self._lock:
+            return [
+                dict(self._orders[oid])
+                for oid in self._children.get(parent_id, ())
+                if oid in self._orders
+            ]
+
+    def is_exit_order(self, order: dict[str, Any]) -> bool:
+        """True if the order is a bracket/OCO exit leg rather than an entry."""
+        if order.get("parent_id"):
+            return True
+        if order.get("order_class") == "oco":
+            return True
+        with self._lock:
+            stored = self._orders.get(order["order_id"], {})
+        return bool(stored.get("parent_id"))
+
+    def protected_symbols(self) -> set[str]:
+        """Symbols that have at least one open stop/limit or bracket/OCO order."""
+        with self._lock:
+            protected = set()
+            for symbol, ids in self._open_by_symbol.items():
+                for oid in ids:
+                    order = self._orders[oid]
+                    if (
+                        order.get("order_type") in PROTECTIVE_TYPES
+                        or order.get("order_class") in ("bracket", "oco")
+                    ):
+                        protected.add(symbol)
+                        break
+            return protected
+
+    def recent_fills(self, symbol: str | None = None, limit: int = 50) -> list[dict[str, Any]]:
+        """Most recent fills first, optionally for one symbol."""
+        with self._lock:
+            fills = [f for f in reversed(self._fills) if symbol is None or f["symbol"] == symbol]
+            return fills[:limit]
+
+    def stats(self) -> dict[str, Any]:
+        """Summary for the status server."""
+        with self._lock:
+            return {
+                "live": self.live,
+                "open_orders": sum(len(ids) for ids in self._open_by_symbol.values()),
+                "known_orders": len(self._orders),
+                "events": self._events,
+                "last_event_at": self._last_event_at,
+                "seeded_at": self._seeded_at,
+            }
+
+
+book = OrderBook()
@@ -5,7 +5,8 @@ Order execution: places market orders for immediate fills.
 from typing import Any
 
 from bot.data import alpaca_client as alpaca
-from bot.data import supabase_client as db
+from bot.data import async_db
+from bot.execution.order_book import book
 from bot.utils.logger import log
 
 
@@ -47,7 +48,7 @@ async def enter_position(
         )
 
         # Record in database
-        trade_id = db.insert_trade({
+        trade_id = await async_db.insert_trade({
             "alpaca_order_id": order["order_id"],
             "symbol": symbol,
             "side": side,
@@ -101,7 +102,7 @@ async def exit_position(symbol: str, reason: str = "signal") -> dict[str, Any] |
 
     try:
         # Step 1: Cancel all open orders for this symbol to free held shares
-        cancelled = alpaca.cancel_open_orders_for_symbol(symbol)
+        cancelled = alpaca.cancel_open_orders_for_symbol(symbol, book.open_order_ids(symbol))
         if cancelled > 0:
             log.info(f"Cancelled {cancelled} orders for {symbol} before exit")
             # Brief pause for cancellations to settle
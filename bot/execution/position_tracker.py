@@ -11,11 +11,14 @@ Strategy tiers:
 """
 
 import asyncio
+from collections import OrderedDict
 from datetime import datetime, timezone
 
 from bot.data import alpaca_client as alpaca
 from bot.data import supabase_client as db
+from bot.data import async_db
 from bot.execution import order_manager
+from bot.execution.order_book import book
 from bot.utils.logger import log
 from bot.utils import activity
 
@@ -33,6 +36,12 @@ _partial_taken: set[str] = set()
 # Track last stop level pushed to Alpaca (avoid spamming cancel/replace)
 _last_pushed_stop: dict[str, float] = {}
 
+# Trades recently closed: a bracket fill and the position check can both see
+# the same exit, and only the first may record it (seconds apart, so only the
+# latest MAX_CLOSED_TRADE_IDS are kept)
+MAX_CLOSED_TRADE_IDS = 1000
+_closed_trade_ids: "OrderedDict[int, None]" = OrderedDict()
+
 
 # ── Tier configuration ───────────────────────────────────────
 
@@ -61,7 +70,7 @@ async def check_positions() -> None:
     """
     try:
         alpaca_positions = alpaca.get_positions()
-        open_trades = db.get_open_trades()
+        open_trades = await async_db.get_open_trades()
     except Exception as e:
         log.error(f"Position check failed: {e}")
         return
@@ -94,14 +103,14 @@ async def check_positions() -> None:
 
         # Update trade status to filled if still pending
         if trade["status"] == "pending":
-            db.update_trade(trade["id"], {
+            db.writer.update_trade(trade["id"], {
                 "status": "filled",
                 "entry_price": pos["avg_entry_price"],
                 "entry_time": datetime.now(timezone.utc).isoformat(),
             })
 
-        # Sync position to Supabase for dashboard
-        db.upsert_position(pos)
+        # Sync position to Supabase for dashboard (coalesced with the snapshot write)
+        db.writer.upsert_position(pos)
 
         entry_price = trade.get("entry_price") or pos.get("avg_entry_price", 0)
         stop_loss = trade.get("stop_loss")
@@ -153,7 +162,8 @@ async def check_positions() -> None:
             try:
                 # Cancel existing bracket/OCO orders first
                 await asyncio.to_thread(
-                    alpaca.cancel_open_orders_for_symbol, symbol
+                    alpaca.cancel_open_orders_for_symbol,
+                    symbol, book.open_order_ids(symbol),
                 )
                 await asyncio.sleep(0.3)
 
@@ -201,7 +211,7 @@ async def check_positions() -> None:
                 _last_pushed_stop[symbol] = new_sl
 
                 # Update trade record
-                db.update_trade(trade["id"], {
+                db.writer.update_trade(trade["id"], {
                     "quantity": int(remaining_qty),
                 })
 
@@ -265,6 +275,61 @@ async def check_positions() -> None:
                 continue
 
 
+async def on_order_update(update: dict) -> None:
+    """
+    Sync a trade record from a trade-updates event.
+
+    Entry fills/cancels update the trade status, and a filled bracket/OCO
+    exit leg closes the trade immediately instead of waiting for the next
+    order-status sync. Runs on the main loop (handed over by main.on_trade_update).
+    """
+    event = update["event"]
+    if event not in ("fill", "canceled", "expired", "rejected"):
+        return
+
+    order = update["order"]
+    try:
+        open_trades = await async_db.get_open_trades()
+    except Exception as e:
+        log.error(f"Order update sync failed for {order['symbol']}: {e}")
+        return
+
+    # Entry order: the trade record references it directly
+    trade = next((t for t in open_trades if t.get("alpaca_order_id") == order["order_id"]), None)
+    if trade:
+        if event == "fill" and trade["status"] == "pending":
+            db.writer.update_trade(trade["id"], {
+                "status": "filled",
+                "entry_price": order.get("filled_avg_price") or update.get("price") or trade.get("entry_price"),
+                "entry_time": datetime.now(timezone.utc).isoformat(),
+            })
+            log.info(f"Entry filled: {order['symbol']} @ ${order.get('filled_avg_price') or 0:.2f}")
+        elif event != "fill" and trade["status"] == "pending":
+            db.writer.update_trade(trade["id"], {"status": "cancelled"})
+            log.info(f"Order {order['order_id']} for {order['symbol']} marked as {event}")
+        return
+
+    # Exit leg: opposite side of a filled trade on the same symbol
+    if event != "fill" or not book.is_exit_order(order):
+        return
+    trade = next(
+        (
+            t for t in open_trades
+            if t["symbol"] == order["symbol"]
+            and t["status"] == "filled"
+            and order["side"] == ("sell" if t.get("side", "buy") == "buy" else "buy")
+        ),
+        None,
+    )
+    if not trade:
+        return
+
+    exit_price = order.get("filled_avg_price") or update.get("price") or trade.get("entry_price", 0)
+    reason = "bracket_take_profit" if order.get("order_type") == "limit" else "bracket_stop_loss"
+    if _close_trade(trade, exit_price, reason):
+        log.info(f"Bracket exit filled for {order['symbol']} @ ${exit_price:.2f} ({reason})")
+
+
 def _calculate_trailing_stop(
     entry_price: float,
     peak: float,
@@ -340,6 +405,7 @@ async def _maybe_push_stop(
         await asyncio.to_thread(
             alpaca.replace_stop_order,
             symbol, side, qty, new_stop, take_profit,
+            book.open_order_ids(symbol),
         )
         _last_pushed_stop[symbol] = new_stop
 
@@ -359,12 +425,20 @@ async def _maybe_push_stop(
         log.error(f"Failed to push stop for {symbol}: {e}")
 
 
-def _close_trade(trade: dict, exit_price: float, reason: str, pos: dict | None = None) -> None:
+def _close_trade(trade: dict, exit_price: float, reason: str, pos: dict | None = None) -> bool:
     """Update a trade record as closed with P&L calculation.
 
     Uses Alpaca's position data for accurate P&L when available,
-    falls back to manual calculation otherwise.
+    falls back to manual calculation otherwise. Returns False (and does
+    nothing) when the trade was already closed. Main loop only.
     """
+    if trade["id"] in _closed_trade_ids:
+        log.debug(f"Trade {trade['id']} ({trade['symbol']}) already closed, ignoring {reason}")
+        return False
+    _closed_trade_ids[trade["id"]] = None
+    if len(_closed_trade_ids) > MAX_CLOSED_TRADE_IDS:
+        _closed_trade_ids.popitem(last=False)
+
     quantity = trade.get("quantity", 0)
     side = trade.get("side", "buy")
 
@@ -394,7 +468,8 @@ def _close_trade(trade: dict, exit_price: float, reason: str, pos: dict | None =
         except (ValueError, TypeError):
             pass
 
-    db.update_trade(trade["id"], {
+    # Queued: flushed together with the position delete by the write-behind task
+    db.writer.update_trade(trade["id"], {
         "status": "closed",
         "exit_price": exit_price,
         "pnl": round(pnl, 2),
@@ -404,7 +479,7 @@ def _close_trade(trade: dict, exit_price: float, reason: str, pos: dict | None =
     })
 
     # Remove from positions table
-    db.delete_position(trade["symbol"])
+    db.writer.delete_position(trade["symbol"])
 
     # Clean up tracking state
     symbol = trade["symbol"]
@@ -428,3 +503,4 @@ def _close_trade(trade: dict, exit_price: float, reason: str, pos: dict | None =
         f"Trade closed: {trade['symbol']} | {reason} | "
         f"P&L=${pnl:+.2f} ({pnl_pct:+.1f}%)"
     )
+    return True
@@ -12,26 +12,38 @@ from datetime import datetime, timezone
 
 from bot.config import config
 from bot.utils.logger import log
-from bot.utils import activity
+from bot.utils import activity, live_feed, loop_monitor, metrics, tracing
 from bot.data import supabase_client as db
+from bot.data import async_db
 from bot.data import alpaca_client as alpaca
-from bot.data.alpaca_stream import AlpacaBarStream
+from bot.data.alpaca_stream import AlpacaBarStream, AlpacaTradeUpdateStream
 from bot.data import news_scanner
 from bot.strategy.risk_manager import RiskManager
 from bot.strategy.candle_strategy import CandleStrategy
+from bot.strategy.prefilter import Prefilter
 from bot.strategy.watchlist_manager import update_watchlist, reassess_watchlist, needs_reassessment, evaluate_news_candidates
 from bot.ai.news_analyst import analyze_news_batch
 from bot.ai.fundamental_analyst import analyze_watchlist
+from bot.ai.analyst import provider_stats as ai_provider_stats
 from bot.execution import position_tracker
 from bot.execution import order_manager
-from bot.utils.status_server import start_status_server, update_state, increment_state, push_log, set_rescan_callback
+from bot.execution.order_book import book as order_book
+from bot.data.level_service import levels as level_service
+from bot.data.candle_store import candles as candle_store
+from bot.analysis.signals import cache_stats as analysis_cache_stats
+from bot.utils.status_server import (
+    start_status_server, update_state, increment_state, push_log, set_rescan_callback, rescan_stats,
+    register_status_provider,
+)
 
 
 # ── Global state ─────────────────────────────────────────────
 
 _shutdown = asyncio.Event()
+_bars = metrics.counter("tradebot_bars_total", "Bars received from the stream.", ["symbol"])
+
 _risk_manager = RiskManager()
-_strategy = CandleStrategy(_risk_manager)
+_strategy = CandleStrategy(_risk_manager, prefilter=Prefilter.load(config.PREFILTER_MODEL_PATH))
 
 
 def _signal_handler(sig, frame):
@@ -41,16 +53,30 @@ def _signal_handler(sig, frame):
 
 # ── Manual rescan ─────────────────────────────────────────────
 
-async def rescan_symbol(symbol: str) -> dict:
+RESCAN_CANDLES = 100
+
+
+async def prefetch_rescan_candles(symbols: list[str]) -> dict[str, list[dict]]:
+    """Candles for a bulk rescan, fetched with shared Supabase queries."""
+    return await async_db.get_candles_bulk(symbols, config.TIMEFRAME, limit=RESCAN_CANDLES)
+
+
+async def rescan_symbol(symbol: str, candles: list[dict] | None = None) -> dict:
     """
     Force a manual rescan for a symbol using latest candle data from Supabase.
     Returns a summary dict of what happened.
+
+    Args:
+        symbol: Ticker to rescan.
+        candles: Candles from prefetch_rescan_candles (bulk rescans); symbols
+                 that came back short are fetched individually.
     """
     log.info(f"Manual rescan triggered for {symbol}")
     push_log(f"RESCAN {symbol} (manual)")
 
     # Fetch latest candles from Supabase
-    candles = db.get_candles(symbol, config.TIMEFRAME, limit=100)
+    if candles is None or len(candles) < RESCAN_CANDLES:
+        candles = await async_db.get_candles(symbol, config.TIMEFRAME, limit=RESCAN_CANDLES)
     if not candles or len(candles) < 20:
         return {"status": "skipped", "reason": f"Only {len(candles)} candles available, need 20+"}
 
@@ -59,7 +85,7 @@ async def rescan_symbol(symbol: str) -> dict:
     # Build a synthetic bar from the most recent candle
     bar = {
         "symbol": symbol,
-        "timestamp": latest["timestamp"],
+        "timestamp": datetime.fromisoformat(str(latest["timestamp"]).replace("Z", "+00:00")),
         "open": float(latest["open"]),
         "high": float(latest["high"]),
         "low": float(latest["low"]),
@@ -69,10 +95,10 @@ async def rescan_symbol(symbol: str) -> dict:
     }
 
     try:
-        trade = await _strategy.on_bar(bar)
+        trade = await _strategy.on_bar(bar, candles=candles)
         if trade:
             increment_state("trades_placed")
-            push_log(f"RESCAN TRADE {trade}")
+            push_log(f"RESCAN TRADE {trade}", category="trades")
             return {"status": "trade_executed", "trade": str(trade)}
         else:
             return {"status": "no_trade", "reason": "AI or strategy declined"}
@@ -81,11 +107,68 @@ async def rescan_symbol(symbol: str) -> dict:
         return {"status": "error", "reason": str(e)}
 
 
+# ── Order updates ─────────────────────────────────────────────
+
+def _seed_order_book() -> None:
+    """Load open orders (with bracket/OCO legs) from Alpaca into the order book."""
+    order_book.seed(alpaca.get_open_orders(nested=True))
+
+
+def _on_trade_stream_connect() -> None:
+    """
+    Re-seed the order book once the trade stream is authorized and subscribed.
+
+    Only then is the book live: events from here on are applied on top of
+    the seed, so missed events don't leave gaps.
+    """
+    _seed_order_book()
+    order_book.set_live(True)
+
+
+# The main event loop: trade updates are handed over to it from the stream's loop
+_main_loop: asyncio.AbstractEventLoop | None = None
+
+
+async def on_trade_update(update: dict) -> None:
+    """
+    Called for every order event from the Alpaca trade-updates stream.
+
+    The stream runs its own loop in a worker thread. Updates are handled on
+    the main loop, where check_positions and the order-status sync close
+    trades too; waiting for each one keeps them in stream order.
+    """
+    future = asyncio.run_coroutine_threadsafe(_handle_trade_update(update), _main_loop)
+    await asyncio.wrap_future(future)
+
+
+async def _handle_trade_update(update: dict) -> None:
+    """Apply one trade update (main loop)."""
+    order = order_book.apply(update)
+    live_feed.publish("order", {
+        **order, "event": update["event"], "fill_price": update.get("price"), "fill_qty": update.get("qty"),
+    })
+    if update["event"] in ("fill", "partial_fill"):
+        push_log(
+            f"FILL {order['symbol']} {order['side']} {update.get('qty')} "
+            f"@ {update.get('price')} ({update['event']})",
+            category="trades",
+        )
+    try:
+        await position_tracker.on_order_update(update)
+    except Exception as e:
+        log.error(f"Order update handling failed for {order['symbol']}: {e}")
+
+
 # ── Order status sync ─────────────────────────────────────────
 
 async def _sync_order_statuses() -> None:
-    """Sync pending/filled trade statuses from Alpaca back to Supabase."""
-    open_trades = db.get_open_trades()
+    """
+    Sync pending/filled trade statuses from Alpaca back to Supabase.
+
+    Order state comes from the order book while the trade-updates stream is
+    live; REST is only used for orders the book has never seen.
+    """
+    open_trades = await async_db.get_open_trades()
     if not open_trades:
         return
 
@@ -101,17 +184,20 @@ async def _sync_order_statuses() -> None:
         if not order_id:
             continue
         try:
-            order = await asyncio.to_thread(alpaca.get_order, order_id)
+            order = order_book.get(order_id) if order_book.live else None
+            if order is None:
+                order = await asyncio.to_thread(alpaca.get_order, order_id)
+                order_book.remember(order)
             alpaca_status = order.get("status", "")
 
             # Map Alpaca statuses to our trade statuses
             if alpaca_status == "filled" and trade["status"] == "pending":
-                db.update_trade(trade["id"], {
+                db.writer.update_trade(trade["id"], {
                     "status": "filled",
                     "entry_price": order.get("filled_avg_price") or trade.get("entry_price"),
                 })
             elif alpaca_status in ("canceled", "cancelled", "expired", "rejected"):
-                db.update_trade(trade["id"], {"status": "cancelled"})
+                db.writer.update_trade(trade["id"], {"status": "cancelled"})
                 log.info(f"Order {order_id} for {trade.get('symbol')} marked as {alpaca_status}")
 
             # Detect bracket SL/TP fills: order is filled but position is gone
@@ -122,13 +208,12 @@ async def _sync_order_statuses() -> None:
                 and position_symbols is not None
                 and trade["symbol"] not in position_symbols
             ):
-                # Position closed by bracket SL/TP — figure out exit price
+                # Position closed by bracket SL/TP — prefer the exit leg's fill price
                 exit_price = order.get("filled_avg_price") or trade.get("entry_price", 0)
-                # Try to get last known price from positions cache
-                try:
-                    recent_snap = await asyncio.to_thread(alpaca.get_account)
-                except Exception:
-                    recent_snap = None
+                for fill in order_book.recent_fills(trade["symbol"], limit=5):
+                    if fill["side"] != order.get("side") and fill["price"]:
+                        exit_price = fill["price"]
+                        break
 
                 position_tracker._close_trade(trade, exit_price, "bracket_exit")
                 log.info(f"Bracket exit detected for {trade['symbol']}")
@@ -170,7 +255,7 @@ async def _eod_liquidation() -> None:
             result = await order_manager.exit_position(symbol, "eod_close")
             if result:
                 # Update trade in DB
-                open_trades = db.get_open_trades()
+                open_trades = await async_db.get_open_trades()
                 for trade in open_trades:
                     if trade["symbol"] == symbol and trade["status"] in ("pending", "filled"):
                         position_tracker._close_trade(trade, pos["current_price"], "eod_close", pos=pos)
@@ -202,7 +287,7 @@ async def _protect_orphaned_positions() -> None:
     """
     try:
         positions = await asyncio.to_thread(alpaca.get_positions)
-        open_orders = await asyncio.to_thread(alpaca.get_open_orders)
+        await asyncio.to_thread(_seed_order_book)
     except Exception as e:
         log.error(f"Failed to check orphaned positions: {e}")
         return
@@ -211,20 +296,11 @@ async def _protect_orphaned_positions() -> None:
         log.info("No open positions to protect")
         return
 
-    # Build set of symbols that already have pending exit orders
-    protected_symbols: set[str] = set()
-    for order in open_orders:
-        # Any stop or limit order on the exit side means protection exists
-        if order.get("order_type") in ("stop", "limit", "stop_limit"):
-            protected_symbols.add(order["symbol"])
-
-    # Also check by order_class — bracket/oco child orders protect the position
-    for order in open_orders:
-        if order.get("order_class") in ("bracket", "oco"):
-            protected_symbols.add(order["symbol"])
+    # Symbols with an open stop/limit or bracket/OCO leg already have protection
+    protected_symbols = order_book.protected_symbols()
 
     # Get trade records to find SL/TP levels
-    open_trades = db.get_open_trades()
+    open_trades = await async_db.get_open_trades()
     trade_map = {t["symbol"]: t for t in open_trades if t["status"] in ("filled", "pending")}
 
     orphaned = 0
@@ -279,25 +355,30 @@ async def on_bar(bar: dict) -> None:
 
     # Write candle to Supabase for dashboard charting
     try:
-        db.upsert_candle(
-            symbol=symbol,
-            timeframe=config.TIMEFRAME,
-            timestamp=timestamp,
-            open_=bar["open"],
-            high=bar["high"],
-            low=bar["low"],
-            close=bar["close"],
-            volume=bar["volume"],
-            vwap=bar.get("vwap"),
-        )
+        with tracing.span("candle_write"):
+            await async_db.upsert_candle(
+                symbol=symbol,
+                timeframe=config.TIMEFRAME,
+                timestamp=timestamp,
+                open_=bar["open"],
+                high=bar["high"],
+                low=bar["low"],
+                close=bar["close"],
+                volume=bar["volume"],
+                vwap=bar.get("vwap"),
+            )
     except Exception as e:
         log.error(f"Failed to write candle for {symbol}: {e}")
         update_state(last_error=str(e))
         return
 
+    candle_store.add(symbol, config.TIMEFRAME, bar)
+    level_service.on_bar(bar)
+    _bars.labels(symbol=symbol).inc()
+    live_feed.publish("bar", bar)
     increment_state("bars_received")
     update_state(last_bar_time=f"{symbol} @ {timestamp}")
-    push_log(f"BAR {symbol} O={bar['open']:.2f} H={bar['high']:.2f} L={bar['low']:.2f} C={bar['close']:.2f} V={bar['volume']}")
+    push_log(f"BAR {symbol} O={bar['open']:.2f} H={bar['high']:.2f} L={bar['low']:.2f} C={bar['close']:.2f} V={bar['volume']}", category="bars")
 
     # Run the strategy (pattern detection -> AI -> execution)
     try:
@@ -305,7 +386,7 @@ async def on_bar(bar: dict) -> None:
         if trade:
             log.info(f"Trade executed: {trade}")
             increment_state("trades_placed")
-            push_log(f"TRADE {trade}")
+            push_log(f"TRADE {trade}", category="trades")
     except Exception as e:
         log.error(f"Strategy error on {symbol}: {e}")
         update_state(last_error=str(e))
@@ -320,7 +401,7 @@ async def snapshot_loop() -> None:
             account = alpaca.get_account()
             positions = alpaca.get_positions()
 
-            db.insert_account_snapshot(
+            await async_db.insert_account_snapshot(
                 equity=account["equity"],
                 cash=account["cash"],
                 buying_power=account["buying_power"],
@@ -329,9 +410,9 @@ async def snapshot_loop() -> None:
                 open_positions=len(positions),
             )
 
-            # Sync positions to Supabase
+            # Sync positions to Supabase (queued; unchanged rows are skipped at flush)
             for pos in positions:
-                db.upsert_position(pos)
+                db.writer.upsert_position(pos)
 
             update_state(
                 equity=account["equity"],
@@ -339,7 +420,11 @@ async def snapshot_loop() -> None:
                 buying_power=account["buying_power"],
                 day_pnl=account["day_pnl"],
                 open_positions=len(positions),
+                positions=positions,
+                positions_updated_at=datetime.now(timezone.utc).isoformat(),
             )
+            live_feed.publish("account", {**account, "open_positions": len(positions)})
+            live_feed.publish("positions", positions)
 
             log.info(
                 f"Snapshot: equity=${account['equity']:,.2f} "
@@ -396,7 +481,7 @@ async def watchlist_scan_loop() -> None:
     while not _shutdown.is_set():
         try:
             # ── Daily reassessment: prune stale stocks first ──
-            if needs_reassessment():
+            if await needs_reassessment():
                 push_log("WATCHLIST: Running daily reassessment...")
                 pruned = await reassess_watchlist()
 
@@ -542,6 +627,7 @@ def _backfill_symbol(symbol: str, timeframe: str, limit: int) -> int:
     import time as _time
 
     bars = alpaca.get_historical_bars(symbol=symbol, timeframe=timeframe, limit=limit)
+    candle_store.extend(symbol, timeframe, bars)
     for bar in bars:
         for attempt in range(3):
             try:
@@ -588,6 +674,9 @@ async def main() -> None:
     """Boot the trading bot."""
     import time
 
+    global _main_loop
+    _main_loop = asyncio.get_running_loop()
+
     log.info("=" * 60)
     log.info("  Autonomous Candle Trading Bot")
     log.info(f"  Watchlist: {', '.join(config.WATCHLIST)}")
@@ -614,7 +703,20 @@ async def main() -> None:
         claude_active=bool(config.ANTHROPIC_API_KEY),
     )
     await start_status_server(port=8080)
-    set_rescan_callback(rescan_symbol)
+    # Watch for blocking calls from the start (backfill and boot checks included)
+    loop_watch = asyncio.create_task(loop_monitor.watch("main"), name="loop_monitor")
+    set_rescan_callback(rescan_symbol, prefetch_rescan_candles)
+    register_status_provider("db", async_db.stats)
+    register_status_provider("order_book", order_book.stats)
+    register_status_provider("activity", activity.stats)
+    register_status_provider("key_levels", level_service.stats)
+    register_status_provider("analysis_cache", analysis_cache_stats)
+    register_status_provider("event_loop", loop_monitor.stats)
+    register_status_provider("live_feed", live_feed.stats)
+    register_status_provider("candle_store", candle_store.stats)
+    register_status_provider("rescans", rescan_stats)
+    register_status_provider("ai_providers", ai_provider_stats)
+    register_status_provider("prefilter", _strategy.prefilter.stats)
     log.info("Status page running on port 8080")
 
     # Verify connections
@@ -650,13 +752,22 @@ async def main() -> None:
     global _stream_ref
     stream = AlpacaBarStream(symbols=config.WATCHLIST, on_bar=on_bar)
     _stream_ref = stream
+    trade_stream = AlpacaTradeUpdateStream(
+        on_update=on_trade_update,
+        on_connect=_on_trade_stream_connect,
+        on_disconnect=lambda: order_book.set_live(False),
+    )
 
     tasks = [
+        loop_watch,
         asyncio.create_task(stream.start(), name="bar_stream"),
+        asyncio.create_task(trade_stream.start(), name="trade_stream"),
         asyncio.create_task(snapshot_loop(), name="snapshot_loop"),
         asyncio.create_task(watchlist_scan_loop(), name="watchlist_scan"),
         asyncio.create_task(news_analysis_loop(), name="news_analysis"),
-        asyncio.create_task(activity.periodic_flush(10), name="activity_flush"),
+        asyncio.create_task(activity.run_writer(), name="activity_writer"),
+        asyncio.create_task(db.writer.run(2), name="db_writer"),
+        asyncio.create_task(level_service.run(lambda: stream.symbols), name="key_levels"),
     ]
 
     log.info("Bot is running. Waiting for bars...")
@@ -667,8 +778,10 @@ async def main() -> None:
 
     await activity.flush()
     stream.stop()
+    trade_stream.stop()
     for task in tasks:
         task.cancel()
+    await async_db.call(db.writer.flush, op="write_behind_flush", timeout=30)
 
     await asyncio.gather(*tasks, return_exceptions=True)
     log.info("Bot stopped.")
@@ -2,18 +2,29 @@
 Main candle trading strategy: orchestrates analysis, AI evaluation, and execution.
 """
 
+import asyncio
+
 import pandas as pd
 from typing import Any
 
 from bot.config import config
 from bot.analysis.signals import analyze_symbol
 from bot.data import pluse_client as pluse
-from bot.data import supabase_client as db
+from bot.data import async_db
+from bot.data.level_service import levels as level_service
 from bot.ai.analyst import evaluate_signal
+from bot.strategy.prefilter import Prefilter
 from bot.strategy.risk_manager import RiskManager
 from bot.execution import order_manager
 from bot.utils.logger import log
-from bot.utils import activity
+from bot.utils import activity, live_feed, metrics, tracing
+
+
+_signals = metrics.counter(
+    "tradebot_signals_total", "Actionable signals sent to the AI.", ["symbol", "direction"]
+)
+_decisions = metrics.counter("tradebot_ai_decisions_total", "AI trade decisions.", ["decision"])
+_trades = metrics.counter("tradebot_trades_total", "Positions entered.", ["symbol", "direction"])
 
 
 class CandleStrategy:
@@ -23,13 +34,15 @@ class CandleStrategy:
     Flow per bar:
     1. Get recent candles from Supabase
     2. Run pattern detection + price action + indicators
-    3. If actionable signal found, fetch PlusE data
+    3. If actionable signal found (and the pre-filter doesn't rule it out), fetch PlusE data
     4. Ask AI to evaluate
     5. If AI says go, risk-check and execute
     """
 
-    def __init__(self, risk_manager: RiskManager):
+    def __init__(self, risk_manager: RiskManager, prefilter: Prefilter | None = None):
         self.risk = risk_manager
+        self.prefilter = prefilter or Prefilter()
+        self._followups: set[asyncio.Task] = set()
 
     @staticmethod
     def _is_market_hours() -> bool:
@@ -44,12 +57,16 @@ class CandleStrategy:
         market_close = now.replace(hour=16, minute=0, second=0, microsecond=0)
         return market_open <= now <= market_close
 
-    async def on_bar(self, bar: dict) -> dict[str, Any] | None:
+    async def on_bar(
+        self, bar: dict, candles: list[dict[str, Any]] | None = None
+    ) -> dict[str, Any] | None:
         """
         Process a new bar and potentially enter a trade.
 
         Args:
             bar: OHLCV bar data from Alpaca stream.
+            candles: Recent candles already fetched by the caller (rescans);
+                     read from Supabase when omitted.
 
         Returns:
             Trade result dict if a trade was entered, else None.
@@ -62,12 +79,15 @@ class CandleStrategy:
             return None
 
         # Skip entirely if max positions reached (no point analyzing)
-        can_trade, reason = self.risk.check_can_trade()
+        with tracing.span("risk_checks"):
+            can_trade, reason = await asyncio.to_thread(self.risk.check_can_trade)
         if not can_trade:
             return None
 
         # 1. Get recent candles from Supabase for analysis
-        candles = db.get_candles(symbol, config.TIMEFRAME, limit=100)
+        if candles is None:
+            with tracing.span("candle_fetch"):
+                candles = await async_db.get_candles(symbol, config.TIMEFRAME, limit=100)
         if len(candles) < 20:
             return None
 
@@ -77,7 +97,9 @@ class CandleStrategy:
         df["volume"] = df["volume"].astype(int)
 
         # 2. Run full analysis
-        analysis = analyze_symbol(df, symbol)
+        analysis = analyze_symbol(
+            df, symbol, level_service.key_levels(symbol), timeframe=config.TIMEFRAME
+        )
         signal = analysis.get("signal")
 
         if not signal or not signal.get("actionable"):
@@ -88,6 +110,8 @@ class CandleStrategy:
             f"({signal['pattern']}) strength={signal['strength']}"
         )
 
+        _signals.labels(symbol=symbol, direction=signal["direction"]).inc()
+
         # Log pattern detection
         activity.pattern_detected(
             symbol=symbol,
@@ -97,26 +121,45 @@ class CandleStrategy:
         )
 
         # Write signal to DB for dashboard
-        signal_id = db.insert_signal(
-            symbol=symbol,
-            timeframe=config.TIMEFRAME,
-            timestamp=bar["timestamp"],
-            signal_type="combined",
-            name=signal["pattern"],
-            direction=signal["direction"],
-            strength=signal["strength"],
-            details={
-                "confirmations": signal.get("confirmations", []),
-                "indicators": analysis.get("indicators", {}),
-            },
-        )
+        with tracing.span("signal_write"):
+            signal_id = await async_db.insert_signal(
+                symbol=symbol,
+                timeframe=config.TIMEFRAME,
+                timestamp=bar["timestamp"],
+                signal_type="combined",
+                name=signal["pattern"],
+                direction=signal["direction"],
+                strength=signal["strength"],
+                details={
+                    "confirmations": signal.get("confirmations", []),
+                    "indicators": analysis.get("indicators", {}),
+                },
+            )
+
+        live_feed.publish("signal", {
+            "id": signal_id,
+            "symbol": symbol,
+            "timestamp": bar["timestamp"],
+            "pattern": signal["pattern"],
+            "direction": signal["direction"],
+            "strength": signal["strength"],
+            "confirmations": signal.get("confirmations", []),
+        })
+
+        # 3. Clear skips never reach the AI (or the PlusE/fundamentals fetches)
+        p_skip = self.prefilter.should_skip(signal, analysis.get("indicators", {}))
+        if p_skip is not None:
+            _decisions.labels(decision="prefilter_skip").inc()
+            log.info(f"Pre-filter skipped {symbol}: AI skip probability {p_skip:.2f}")
+            return None
 
         current_price = bar["close"]
 
         # 4. Fetch PlusE data for AI context
         pluse_data = None
         try:
-            pluse_data = await pluse.get_full_analysis(symbol)
+            with tracing.span("pluse"):
+                pluse_data = await pluse.get_full_analysis(symbol)
         except Exception as e:
             log.warning(f"PlusE data unavailable for {symbol}: {e}")
 
@@ -124,30 +167,30 @@ class CandleStrategy:
         fund_data = None
         try:
             from bot.data.fundamentals import get_fundamentals
-            fund_data = await get_fundamentals(symbol)
+            with tracing.span("fundamentals"):
+                fund_data = await get_fundamentals(symbol)
         except Exception as e:
             log.debug(f"Fundamentals unavailable for {symbol}: {e}")
 
         # 5. AI evaluation
         try:
-            ai_decision = await evaluate_signal(
-                symbol=symbol,
-                signal=signal,
-                price_action=analysis["price_action"],
-                indicators=analysis["indicators"],
-                pluse_data=pluse_data,
-                current_price=current_price,
-                fundamentals=fund_data,
-            )
+            with tracing.span("ai_call"):
+                ai_decision = await evaluate_signal(
+                    symbol=symbol,
+                    signal=signal,
+                    price_action=analysis["price_action"],
+                    indicators=analysis["indicators"],
+                    pluse_data=pluse_data,
+                    current_price=current_price,
+                    fundamentals=fund_data,
+                )
         except Exception as e:
             log.error(f"AI evaluation failed for {symbol}: {e}")
             return None
 
         decision = ai_decision.get("decision", "skip")
         confidence = ai_decision.get("confidence", 0)
-
-        # Force-flush activity buffer so skip decisions appear on dashboard immediately
-        await activity.flush()
+        _decisions.labels(decision=decision).inc()
 
         if decision == "skip" or confidence < 0.6:
             log.info(
@@ -155,34 +198,58 @@ class CandleStrategy:
             )
             return None
 
-        # 6. Position sizing
-        quantity, size_reason = self.risk.calculate_position_size(current_price)
-        if quantity < 1:
-            log.info(f"Position too small for {symbol}: {size_reason}")
+        # Bars and rescans run concurrently: another symbol may have taken the
+        # last slot while this one waited on the AI. Reserve one atomically so
+        # entries approved together can't overrun max positions
+        with tracing.span("risk_checks"):
+            can_trade, reason = await asyncio.to_thread(self.risk.reserve_entry, symbol)
+        if not can_trade:
+            log.info(f"AI approved {symbol} but trading is no longer allowed: {reason}")
             return None
 
-        # 7. Calculate stops
-        direction = "long" if decision == "enter_long" else "short"
-        stops = self.risk.calculate_stops(
-            entry_price=current_price,
-            direction=direction,
-            ai_stop=ai_decision.get("stop_loss"),
-            ai_target=ai_decision.get("take_profit"),
-        )
+        trade = None
+        try:
+            # 6. Position sizing
+            with tracing.span("position_sizing"):
+                quantity, size_reason = self.risk.calculate_position_size(current_price)
+            if quantity < 1:
+                log.info(f"Position too small for {symbol}: {size_reason}")
+                return None
 
-        # 8. Execute
-        trade = await order_manager.enter_position(
-            symbol=symbol,
-            direction=direction,
-            quantity=quantity,
-            entry_price=current_price,
-            stop_loss=stops["stop_loss"],
-            take_profit=stops["take_profit"],
-            signal_id=signal_id,
-            ai_reasoning=ai_decision.get("reasoning"),
-        )
+            # 7. Calculate stops
+            direction = "long" if decision == "enter_long" else "short"
+            stops = self.risk.calculate_stops(
+                entry_price=current_price,
+                direction=direction,
+                ai_stop=ai_decision.get("stop_loss"),
+                ai_target=ai_decision.get("take_profit"),
+            )
+
+            # 8. Execute
+            with tracing.span("order_placement"):
+                trade = await order_manager.enter_position(
+                    symbol=symbol,
+                    direction=direction,
+                    quantity=quantity,
+                    entry_price=current_price,
+                    stop_loss=stops["stop_loss"],
+                    take_profit=stops["take_profit"],
+                    signal_id=signal_id,
+                    ai_reasoning=ai_decision.get("reasoning"),
+                )
+        finally:
+            if not trade:
+                self.risk.release_entry(symbol)
 
         if trade:
+            tracing.mark("bar_to_order")
+            details = ai_decision.get("details")
+            if details is not None and trade.get("trade_id"):
+                task = asyncio.ensure_future(self._save_reasoning(trade["trade_id"], details))
+                self._followups.add(task)
+                task.add_done_callback(self._followups.discard)
+            _trades.labels(symbol=symbol, direction=direction).inc()
+            live_feed.publish("trade", trade)
             activity.trade_executed(
                 symbol=symbol,
                 side=direction,
@@ -192,7 +259,7 @@ class CandleStrategy:
             # Store news from PlusE if available
             if pluse_data and pluse_data.get("news"):
                 try:
-                    db.insert_news({
+                    await async_db.insert_news({
                         "symbol": symbol,
                         "headline": f"AI Trade Signal: {signal['pattern']}",
                         "summary": str(pluse_data["news"])[:500],
@@ -203,3 +270,12 @@ class CandleStrategy:
                     pass
 
         return trade
+
+    @staticmethod
+    async def _save_reasoning(trade_id: int, details: asyncio.Task) -> None:
+        """Store the AI reasoning on a trade entered before the reply finished streaming."""
+        try:
+            reply = await details
+            await async_db.update_trade(trade_id, {"ai_reasoning": reply.get("reasoning")})
+        except Exception as e:
+            log.warning(f"Could not save AI reasoning for trade {trade_id}: {e}")
@@ -0,0 +1,413 @@
+"""
+Local pre-filter: skip signals the AI would almost certainly reject.
+
+Every actionable signal used to go to the LLM, and most came back "skip"
+(or below the 0.6 confidence bar). A small logistic model, trained offline
+on the stored signals and the AI decisions logged for them, predicts the
+probability that the AI skips a signal from the features the strategy
+already has (signal strength, confirmations, indicator summary). Signals
+whose skip probability is at or above the model's threshold never reach
+the AI. The threshold is calibrated on held-out history so that nearly all
+the signals it filters were in fact skipped by the AI, and the precision
+stored with the model is measured on a second held-out set the threshold
+never saw.
+
+Scoring is a dot product over a dozen features, a few microseconds. With
+no model file configured the pre-filter is off and every signal goes to
+the AI as before.
+
+Usage:
+    python -m bot.strategy.prefilter export --days 60 --out signals.jsonl
+    python -m bot.strategy.prefilter train signals.jsonl --out prefilter.json
+    python -m bot.strategy.prefilter evaluate signals.jsonl --model prefilter.json
+
+    prefilter = Prefilter.load(config.PREFILTER_MODEL_PATH)
+    strategy = CandleStrategy(risk_manager, prefilter=prefilter)
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable
+
+from bot.utils import metrics
+from bot.utils.logger import log
+
+
+AI_CONFIDENCE_BAR = 0.6      # Below this the strategy treats an AI "enter" as a skip
+SKIP_PRECISION = 0.97        # Share of filtered signals the AI must have skipped
+MIN_FILTERED = 20            # Held-out signals above the threshold needed to trust it
+DECISION_WINDOW = 300        # Seconds between a signal and the AI decision logged for it
+
+_checked = metrics.counter("tradebot_prefilter_checks_total", "Signals scored by the pre-filter.")
+_saved = metrics.counter(
+    "tradebot_prefilter_skips_total", "Signals skipped by the pre-filter (AI calls saved)."
+)
+
+
+# ── Features ─────────────────────────────────────────────────
+
+def features(signal: dict[str, Any], indicators: dict[str, Any]) -> dict[str, float]:
+    """
+    Model inputs from a combined signal and its indicator summary.
+
+    Only uses what the signals table stores (strength, direction, pattern,
+    confirmations and indicators), so live scoring and training agree.
+    """
+    direction = signal.get("direction")
+    long = direction == "long"
+    confirmations = signal.get("confirmations") or []
+    strength = float(signal.get("strength") or 0.0)
+
+    feats = {
+        "strength": strength,
+        "long": 1.0 if long else 0.0,
+        "trend_aligned": 1.0 if "trend_aligned" in confirmations else 0.0,
+        "counter_trend": 1.0 if "counter_trend" in confirmations else 0.0,
+        "volume_confirmed": 1.0 if "volume_confirmed" in confirmations else 0.0,
+        "momentum_votes": float(sum(
+            1 for c in confirmations if c.startswith(("rsi_", "macd_", "ema_"))
+        )),
+        "breakout": 1.0 if any(c.startswith(("breakout_", "breakdown_")) for c in confirmations) else 0.0,
+        f"pattern:{signal.get('pattern') or signal.get('name')}": 1.0,
+    }
+
+    rsi = (indicators.get("rsi") or {}).get("value")
+    if rsi is not None:
+        # Room left in the signal's direction: +1 deeply oversold for a long
+        feats["rsi_room"] = (50.0 - rsi) / 50.0 if long else (rsi - 50.0) / 50.0
+
+    bollinger = (indicators.get("bollinger") or {}).get("signal")
+    feats["bollinger_with"] = 1.0 if bollinger == ("oversold" if long else "overbought") else 0.0
+    vwap = (indicators.get("vwap") or {}).get("signal")
+    feats["vwap_with"] = 1.0 if vwap == ("above" if long else "below") else 0.0
+    return feats
+
+
+# ── Model ────────────────────────────────────────────────────
+
+class PrefilterModel:
+    """Logistic regression over sparse named features; predicts P(AI skips)."""
+
+    def __init__(
+        self,
+        weights: dict[str, float],
+        bias: float,
+        threshold: float = 1.0,
+        info: dict[str, Any] | None = None,
+    ):
+        self.weights = weights
+        self.bias = bias
+        self.threshold = threshold
+        self.info = info or {}
+
+    def skip_probability(self, feats: dict[str, float]) -> float:
+        z = self.bias
+        for name, value in feats.items():
+            z += self.weights.get(name, 0.0) * value
+        if z < -30:
+            return 0.0
+        return 1.0 / (1.0 + math.exp(-z))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"weights": self.weights, "bias": self.bias, "threshold": self.threshold, "info": self.info}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "PrefilterModel":
+        return cls(data["weights"], data["bias"], data.get("threshold", 1.0), data.get("info"))
+
+
+def train(
+    examples: list[tuple[dict[str, float], bool]],
+    epochs: int = 300,
+    learning_rate: float = 0.5,
+    l2: float = 1e-3,
+) -> PrefilterModel:
+    """
+    Fit a logistic model to (features, ai_skipped) pairs by batch gradient descent.
+
+    The threshold is left at 1.0 (never filter); see calibrate().
+    """
+    names = sorted({name for feats, _ in examples for name in feats})
+    weights = dict.fromkeys(names, 0.0)
+    base_rate = sum(1 for _, skipped in examples if skipped) / max(len(examples), 1)
+    base_rate = min(max(base_rate, 1e-3), 1 - 1e-3)
+    model = PrefilterModel(weights, math.log(base_rate / (1 - base_rate)))
+
+    n = max(len(examples), 1)
+    for _ in range(epochs):
+        grad = dict.fromkeys(names, 0.0)
+        grad_bias = 0.0
+        for feats, skipped in examples:
+            error = model.skip_probability(feats) - (1.0 if skipped else 0.0)
+            grad_bias += error
+            for name, value in feats.items():
+                grad[name] += error * value
+        model.bias -= learning_rate * grad_bias / n
+        for name in names:
+            weights[name] -= learning_rate * (grad[name] / n + l2 * weights[name])
+    return model
+
+
+def calibrate(
+    model: PrefilterModel,
+    examples: list[tuple[dict[str, float], bool]],
+    precision: float = SKIP_PRECISION,
+    min_filtered: int = MIN_FILTERED,
+) -> float:
+    """
+    Lowest threshold at which at least `precision` of the filtered examples
+    were AI skips (1.0 = never filter when no threshold qualifies).
+    """
+    scored = sorted(((model.skip_probability(f), s) for f, s in examples), reverse=True)
+    threshold = 1.0
+    skipped = 0
+    for count, (p, was_skipped) in enumerate(scored, 1):
+        skipped += was_skipped
+        if count >= min_filtered and skipped / count >= precision:
+            threshold = p
+    return threshold
+
+
+def evaluate(model: PrefilterModel, examples: list[tuple[dict[str, float], bool]]) -> dict[str, Any]:
+    """What the model would have filtered on `examples` at its threshold."""
+    filtered = [s for f, s in examples if model.skip_probability(f) >= model.threshold]
+    ai_skips = sum(1 for _, s in examples if s)
+    wrongly = sum(1 for s in filtered if not s)
+    return {
+        "examples": len(examples),
+        "ai_skip_rate": round(ai_skips / len(examples), 3) if examples else None,
+        "filtered": len(filtered),
+        "calls_saved_pct": round(100 * len(filtered) / len(examples), 1) if examples else None,
+        "filtered_ai_would_take": wrongly,
+        "precision": round(1 - wrongly / len(filtered), 3) if filtered else None,
+    }
+
+
+# ── Runtime ──────────────────────────────────────────────────
+
+class Prefilter:
+    """Scores live signals with a trained model and counts the AI calls it saves."""
+
+    def __init__(self, model: PrefilterModel | None = None, path: str | None = None):
+        self.model = model
+        self.path = path
+        self.checked = 0
+        self.skipped = 0
+        self._seconds = 0.0
+
+    @classmethod
+    def load(cls, path: str) -> "Prefilter":
+        """Pre-filter from a model JSON file; disabled when `path` is empty or unreadable."""
+        if not path:
+            return cls()
+        try:
+            with open(path) as f:
+                model = PrefilterModel.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            log.warning(f"Pre-filter model {path} not loaded, sending every signal to the AI: {e}")
+            return cls(path=path)
+        log.info(f"Pre-filter model loaded from {path} (threshold {model.threshold:.3f})")
+        return cls(model, path)
+
+    def should_skip(self, signal: dict[str, Any], indicators: dict[str, Any]) -> float | None:
+        """The skip probability when the signal should not go to the AI, else None."""
+        if self.model is None or self.model.threshold >= 1.0:
+            return None
+        start = time.perf_counter()
+        p_skip = self.model.skip_probability(features(signal, indicators))
+        self._seconds += time.perf_counter() - start
+        self.checked += 1
+        _checked.inc()
+        if p_skip < self.model.threshold:
+            return None
+        self.skipped += 1
+        _saved.inc()
+        return p_skip
+
+    def stats(self) -> dict[str, Any]:
+        """Pre-filter state and savings for /api/status."""
+        return {
+            "enabled": self.model is not None and self.model.threshold < 1.0,
+            "model": self.path,
+            "threshold": self.model.threshold if self.model else None,
+            "trained": self.model.info if self.model else None,
+            "checked": self.checked,
+            "ai_calls_saved": self.skipped,
+            "saved_pct": round(100 * self.skipped / self.checked, 1) if self.checked else None,
+            "avg_score_us": round(1e6 * self._seconds / self.checked, 2) if self.checked else None,
+        }
+
+
+# ── Training data ────────────────────────────────────────────
+
+def _ts(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def label_signals(
+    signals: list[dict[str, Any]],
+    decisions: list[dict[str, Any]],
+    traded: set[int],
+) -> list[dict[str, Any]]:
+    """
+    Join stored signals with the AI decision logged after each one.
+
+    Each decision is matched to the latest unlabelled signal for its symbol
+    created within DECISION_WINDOW seconds before it. Decisions produced by
+    AI errors or unparseable replies are dropped, and so are signals the
+    pre-filter itself skipped (they have no decision). A signal that led to
+    a trade is labelled "taken" regardless.
+
+    Returns:
+        JSONL-ready rows: {"id", "symbol", "created_at", "features", "skipped"}.
+    """
+    by_symbol: dict[str, list[dict[str, Any]]] = {}
+    for sig in signals:
+        by_symbol.setdefault(sig["symbol"], []).append(sig)
+
+    labels: dict[int, bool] = {}
+    for event in decisions:
+        detail = event.get("detail") or ""
+        if detail.startswith(("AI error", "AI response parsing failed")):
+            continue
+        meta = event.get("metadata") or {}
+        at = _ts(event["created_at"])
+        candidates = [
+            s for s in by_symbol.get(event.get("symbol"), [])
+            if s["id"] not in labels and 0 <= at - _ts(s["created_at"]) <= DECISION_WINDOW
+        ]
+        if not candidates:
+            continue
+        sig = max(candidates, key=lambda s: _ts(s["created_at"]))
+        labels[sig["id"]] = (
+            meta.get("decision", "skip") == "skip"
+            or float(meta.get("confidence") or 0) < AI_CONFIDENCE_BAR
+        )
+
+    rows = []
+    for sig in signals:
+        if sig["id"] in traded:
+            labels[sig["id"]] = False
+        if sig["id"] not in labels:
+            continue
+        details = sig.get("details") or {}
+        signal = {
+            "direction": sig["direction"],
+            "strength": sig["strength"],
+            "pattern": sig["name"],
+            "confirmations": details.get("confirmations", []),
+        }
+        rows.append({
+            "id": sig["id"],
+            "symbol": sig["symbol"],
+            "created_at": sig["created_at"],
+            "features": features(signal, details.get("indicators") or {}),
+            "skipped": labels[sig["id"]],
+        })
+    return rows
+
+
+def _read_examples(path: str) -> list[tuple[dict[str, float], bool]]:
+    with open(path) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [(row["features"], bool(row["skipped"])) for row in rows]
+
+
+def _split(examples: list, holdout: float, test: float, seed: int) -> tuple[list, list, list]:
+    """Shuffle into (fit, calibration, test) sets with the given shares held out."""
+    shuffled = list(examples)
+    random.Random(seed).shuffle(shuffled)
+    fit_end = int(len(shuffled) * (1 - holdout - test))
+    calibration_end = int(len(shuffled) * (1 - test))
+    return shuffled[:fit_end], shuffled[fit_end:calibration_end], shuffled[calibration_end:]
+
+
+# ── CLI ──────────────────────────────────────────────────────
+
+def _export(args: argparse.Namespace) -> int:
+    from bot.data import supabase_client as db
+
+    since = datetime.now(timezone.utc) - timedelta(days=args.days)
+    rows = label_signals(
+        db.get_signal_history(since), db.get_ai_decisions(since), db.get_traded_signal_ids(since)
+    )
+    with open(args.out, "w") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+    skipped = sum(1 for r in rows if r["skipped"])
+    print(f"{len(rows)} labelled signals ({skipped} AI skips) written to {args.out}")
+    return 0
+
+
+def _train(args: argparse.Namespace) -> int:
+    examples = _read_examples(args.data)
+    if len(examples) < 2 * args.min_filtered:
+        print(f"Only {len(examples)} examples; need at least {2 * args.min_filtered}")
+        return 1
+    fit, holdout, test = _split(examples, args.holdout, args.test, args.seed)
+    if not fit or not test:
+        print("--holdout and --test leave no examples to fit or to test on")
+        return 1
+    model = train(fit, epochs=args.epochs)
+    model.threshold = calibrate(model, holdout, args.precision, args.min_filtered)
+    # The threshold was chosen on `holdout`, so its precision there is biased
+    # upwards; the figure that counts comes from `test`
+    report = evaluate(model, test)
+    model.info = {
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "examples": len(examples),
+        "precision_target": args.precision,
+        "calibration": evaluate(model, holdout),
+        "test": report,
+    }
+    with open(args.out, "w") as f:
+        json.dump(model.to_dict(), f, indent=2, sort_keys=True)
+    print(f"threshold {model.threshold:.3f}  test: {json.dumps(report)}")
+    print(f"Model written to {args.out}")
+    return 0
+
+
+def _evaluate(args: argparse.Namespace) -> int:
+    with open(args.model) as f:
+        model = PrefilterModel.from_dict(json.load(f))
+    print(json.dumps(evaluate(model, _read_examples(args.data)), indent=2))
+    return 0
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Train and evaluate the signal pre-filter.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="label stored signals with the AI decisions (Supabase)")
+    export.add_argument("--days", type=int, default=60, help="history to export")
+    export.add_argument("--out", default="prefilter_signals.jsonl")
+    export.set_defaults(run=_export)
+
+    fit = commands.add_parser("train", help="fit and calibrate a model from exported signals")
+    fit.add_argument("data", help="JSONL from the export command")
+    fit.add_argument("--out", default="prefilter.json")
+    fit.add_argument("--precision", type=float, default=SKIP_PRECISION,
+                     help="share of filtered signals the AI must have skipped")
+    fit.add_argument("--min-filtered", type=int, default=MIN_FILTERED)
+    fit.add_argument("--holdout", type=float, default=0.3, help="share kept out for calibration")
+    fit.add_argument("--test", type=float, default=0.2, help="share kept out to report precision on")
+    fit.add_argument("--epochs", type=int, default=300)
+    fit.add_argument("--seed", type=int, default=0)
+    fit.set_defaults(run=_train)
+
+    check = commands.add_parser("evaluate", help="what a model would filter on exported signals")
+    check.add_argument("data")
+    check.add_argument("--model", default="prefilter.json")
+    check.set_defaults(run=_evaluate)
+
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
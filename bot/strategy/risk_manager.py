@@ -2,6 +2,8 @@
 Risk management: position sizing, daily loss limits, max positions.
 """
 
+import threading
+import time
 from typing import Any
 
 from bot.config import config
@@ -10,6 +12,9 @@ from bot.data import supabase_client as db
 from bot.utils.logger import log
 
 
+ENTRY_RESERVATION_TTL = 120.0   # Seconds an entry counts as a position before its fill shows up
+
+
 class RiskManager:
     """Enforces risk rules before allowing trade execution."""
 
@@ -20,6 +25,10 @@ class RiskManager:
         self.take_profit_pct = config.TAKE_PROFIT_PCT
         self.daily_loss_limit_pct = config.DAILY_LOSS_LIMIT_PCT
         self._halted = False
+        # Entries placed but not yet filled are invisible to get_positions();
+        # bars and rescans on two loops reserve slots here (symbol -> time)
+        self._entries: dict[str, float] = {}
+        self._entry_lock = threading.RLock()
 
     def check_can_trade(self) -> tuple[bool, str]:
         """
@@ -50,14 +59,45 @@ class RiskManager:
         # Check max positions
         try:
             positions = alpaca.get_positions()
-            if len(positions) >= self.max_positions:
-                return False, f"Max positions reached ({len(positions)}/{self.max_positions})"
+            open_count = self._open_count(positions)
+            if open_count >= self.max_positions:
+                return False, f"Max positions reached ({open_count}/{self.max_positions})"
         except Exception as e:
             log.error(f"Failed to check positions: {e}")
             return False, f"Position check failed: {e}"
 
         return True, "OK"
 
+    def reserve_entry(self, symbol: str) -> tuple[bool, str]:
+        """
+        check_can_trade() and, if allowed, hold a position slot for `symbol`.
+
+        The check and the reservation are atomic across threads, so entries
+        approved at the same moment can't overrun max_positions. The slot
+        is held until the fill shows up in the positions (or after
+        ENTRY_RESERVATION_TTL); call release_entry() if no order was placed.
+        """
+        with self._entry_lock:
+            allowed, reason = self.check_can_trade()
+            if allowed:
+                self._entries[symbol] = time.monotonic()
+            return allowed, reason
+
+    def release_entry(self, symbol: str) -> None:
+        """Give back a slot from reserve_entry() when the entry didn't happen."""
+        with self._entry_lock:
+            self._entries.pop(symbol, None)
+
+    def _open_count(self, positions: list[dict[str, Any]]) -> int:
+        """Filled positions plus reserved entries that haven't filled yet."""
+        held = {p["symbol"] for p in positions}
+        cutoff = time.monotonic() - ENTRY_RESERVATION_TTL
+        with self._entry_lock:
+            for symbol, reserved_at in list(self._entries.items()):
+                if symbol in held or reserved_at < cutoff:
+                    del self._entries[symbol]
+            return len(held) + len(self._entries)
+
     def calculate_position_size(self, current_price: float) -> tuple[float, str]:
         """
         Calculate the number of shares to buy based on position sizing rules.
@@ -18,7 +18,7 @@ from bot.utils.logger import log
 from bot.utils import activity
 from bot.data import reddit_scanner
 from bot.data import news_scanner
-from bot.data import supabase_client as db
+from bot.data import async_db
 from bot.data.fundamentals import (
     get_fundamentals_batch,
     get_stock_snapshots_batch,
@@ -44,6 +44,9 @@ CORE_SYMBOLS = {"SPY", "QQQ"}
 # How long to cooldown a rejected symbol before re-evaluating (hours)
 REJECTION_COOLDOWN_HOURS = 6
 
+# Seconds the (large) evaluation prompts may take across AI providers
+AI_EVAL_DEADLINE = 90.0
+
 
 # ── Rejection Cooldown ────────────────────────────────────────
 # Tracks recently rejected symbols so we don't re-evaluate them
@@ -53,7 +56,7 @@ _rejection_cache: dict[str, datetime] = {}  # symbol -> rejected_at (UTC)
 _rejection_cache_loaded = False
 
 
-def _load_rejections_from_db() -> None:
+async def _load_rejections_from_db() -> None:
     """Load recent rejections from Supabase watchlist table on first run."""
     global _rejection_cache_loaded
     if _rejection_cache_loaded:
@@ -61,14 +64,15 @@ def _load_rejections_from_db() -> None:
     _rejection_cache_loaded = True
 
     try:
-        client = db.get_client()
         cutoff = (datetime.now(timezone.utc) - timedelta(hours=REJECTION_COOLDOWN_HOURS)).isoformat()
-        resp = (
-            client.table("watchlist")
-            .select("symbol, updated_at")
-            .eq("source", "rejected")
-            .gte("updated_at", cutoff)
-            .execute()
+        resp = await async_db.query(
+            lambda c: (
+                c.table("watchlist")
+                .select("symbol, updated_at")
+                .eq("source", "rejected")
+                .gte("updated_at", cutoff)
+            ),
+            op="watchlist.rejections",
         )
         for row in (resp.data or []):
             sym = row["symbol"]
@@ -93,37 +97,37 @@ def _is_on_cooldown(symbol: str) -> bool:
     return True
 
 
-def _record_rejection(symbol: str, reason: str) -> None:
+async def _record_rejection(symbol: str, reason: str) -> None:
     """Record a rejection in memory and persist to Supabase."""
     now = datetime.now(timezone.utc)
     _rejection_cache[symbol] = now
 
     # Persist to DB so it survives deploys
+    row = {
+        "symbol": symbol,
+        "source": "rejected",
+        "reason": reason,
+        "score": 0,
+        "discovery_sources": [],
+        "active": False,
+        "updated_at": now.isoformat(),
+    }
     try:
-        client = db.get_client()
-        client.table("watchlist").upsert(
-            {
-                "symbol": symbol,
-                "source": "rejected",
-                "reason": reason,
-                "score": 0,
-                "discovery_sources": [],
-                "active": False,
-                "updated_at": now.isoformat(),
-            },
-            on_conflict="symbol",
-        ).execute()
+        await async_db.query(
+            lambda c: c.table("watchlist").upsert(row, on_conflict="symbol"),
+            op="watchlist.reject",
+        )
     except Exception as e:
         log.debug(f"Failed to persist rejection for {symbol}: {e}")
 
 
-def _record_rejections_batch(rejected: list[dict]) -> None:
+async def _record_rejections_batch(rejected: list[dict]) -> None:
     """Record multiple rejections from AI response."""
     for r in rejected:
         sym = r.get("symbol", "")
         reason = r.get("reason", "AI rejected")
         if sym:
-            _record_rejection(sym, reason)
+            await _record_rejection(sym, reason)
 
 
 # ── AI Evaluation ─────────────────────────────────────────────
@@ -273,7 +277,7 @@ async def _ai_evaluate_candidates(candidates: list[dict]) -> list[dict]:
     )
 
     try:
-        response = await _call_ai(prompt, WATCHLIST_EVAL_SYSTEM)
+        response = await _call_ai(prompt, WATCHLIST_EVAL_SYSTEM, deadline=AI_EVAL_DEADLINE, workload="background")
 
         # Parse JSON - handle markdown code fences
         json_str = response.strip()
@@ -305,7 +309,7 @@ async def _ai_evaluate_candidates(candidates: list[dict]) -> list[dict]:
             log.info(f"Market context: {context}")
 
         # Record rejections so we don't re-evaluate them next cycle
-        _record_rejections_batch(rejected)
+        await _record_rejections_batch(rejected)
 
         activity.ai_response(
             agent="analyst",
@@ -431,7 +435,7 @@ async def discover_candidates(current_watchlist: list[str] | None = None) -> lis
         headlines_map.setdefault(sym, []).extend(item.get("headlines", []))
 
     # Load rejection history (once per process lifetime)
-    _load_rejections_from_db()
+    await _load_rejections_from_db()
 
     # Skip symbols already on the active watchlist OR recently rejected
     already_active = set(config.WATCHLIST) | CORE_SYMBOLS
@@ -506,13 +510,13 @@ async def discover_candidates(current_watchlist: list[str] | None = None) -> lis
         price = snap.get("price", 0)
         if price and price < 0.50:
             log.info(f"  Pre-filter REJECT {sym}: penny stock (${price:.2f})")
-            _record_rejection(sym, f"Penny stock (${price:.2f})")
+            await _record_rejection(sym, f"Penny stock (${price:.2f})")
             continue
 
         market_cap = fund.get("market_cap", 0)
         if market_cap and market_cap < 50e6:
             log.info(f"  Pre-filter REJECT {sym}: micro-cap (${market_cap / 1e6:.0f}M)")
-            _record_rejection(sym, f"Micro-cap (${market_cap / 1e6:.0f}M)")
+            await _record_rejection(sym, f"Micro-cap (${market_cap / 1e6:.0f}M)")
             continue
 
         enriched.append(c)
@@ -539,8 +543,8 @@ async def evaluate_news_candidates(news_candidates: list[dict]) -> list[str]:
     if not news_candidates:
         return []
 
-    _load_rejections_from_db()
-    current_active = get_active_watchlist()
+    await _load_rejections_from_db()
+    current_active = await get_active_watchlist()
 
     # Early exit if watchlist is full
     if len(current_active) >= MAX_WATCHLIST_SIZE:
@@ -588,11 +592,11 @@ async def evaluate_news_candidates(news_candidates: list[dict]) -> list[str]:
         # Basic filters
         price = snap.get("price", 0)
         if price and price < 0.50:
-            _record_rejection(sym, f"Penny stock (${price:.2f})")
+            await _record_rejection(sym, f"Penny stock (${price:.2f})")
             continue
         market_cap = fund.get("market_cap", 0)
         if market_cap and market_cap < 50e6:
-            _record_rejection(sym, f"Micro-cap (${market_cap / 1e6:.0f}M)")
+            await _record_rejection(sym, f"Micro-cap (${market_cap / 1e6:.0f}M)")
             continue
 
         enriched.append({
@@ -640,7 +644,7 @@ async def evaluate_news_candidates(news_candidates: list[dict]) -> list[str]:
     # Persist
     now = datetime.now(timezone.utc)
     try:
-        _save_watchlist_to_db(new_watchlist, added_symbols, enriched, now)
+        await _save_watchlist_to_db(new_watchlist, added_symbols, enriched, now)
     except Exception as e:
         log.error(f"Failed to persist news-triggered watchlist update: {e}")
 
@@ -682,7 +686,7 @@ async def update_watchlist() -> list[str]:
     log.info("Starting dynamic watchlist update...")
 
     # Step 0: Load current active watchlist so we don't re-evaluate existing symbols
-    current_active = get_active_watchlist()
+    current_active = await get_active_watchlist()
     log.info(f"Current watchlist: {', '.join(current_active)}")
 
     # Early exit: skip discovery + AI if watchlist is already at capacity
@@ -714,7 +718,7 @@ async def update_watchlist() -> list[str]:
     # Step 4: Persist to Supabase
     now = datetime.now(timezone.utc)
     try:
-        _save_watchlist_to_db(new_watchlist, added_symbols, candidates, now)
+        await _save_watchlist_to_db(new_watchlist, added_symbols, candidates, now)
     except Exception as e:
         log.error(f"Failed to persist watchlist to Supabase: {e}")
 
@@ -730,23 +734,23 @@ async def update_watchlist() -> list[str]:
     return new_watchlist
 
 
-def _save_watchlist_to_db(
+async def _save_watchlist_to_db(
     watchlist: list[str],
     added: list[dict],
     candidates: list[dict],
     timestamp: datetime,
 ) -> None:
     """Persist the watchlist state to Supabase."""
-    client = db.get_client()
-
     # Load existing metadata so we can preserve source/reason for non-new symbols
     existing_meta: dict[str, dict] = {}
     try:
-        resp = (
-            client.table("watchlist")
-            .select("symbol, source, reason, score, discovery_sources, added_at")
-            .eq("active", True)
-            .execute()
+        resp = await async_db.query(
+            lambda c: (
+                c.table("watchlist")
+                .select("symbol, source, reason, score, discovery_sources, added_at")
+                .eq("active", True)
+            ),
+            op="watchlist.active_meta",
         )
         for row in (resp.data or []):
             existing_meta[row["symbol"]] = row
@@ -754,11 +758,15 @@ def _save_watchlist_to_db(
         pass
 
     # Deactivate all current entries
-    client.table("watchlist").update(
-        {"active": False, "updated_at": timestamp.isoformat()}
-    ).eq("active", True).execute()
+    await async_db.query(
+        lambda c: c.table("watchlist").update(
+            {"active": False, "updated_at": timestamp.isoformat()}
+        ).eq("active", True),
+        op="watchlist.deactivate",
+    )
 
     # Insert/update each symbol
+    rows = []
     for sym in watchlist:
         # Find if it was NEWLY added from this cycle's discovery
         discovered = next((a for a in added if a["symbol"] == sym), None)
@@ -793,19 +801,22 @@ def _save_watchlist_to_db(
             sources_list = []
             added_at = existing.get("added_at", timestamp.isoformat())
 
-        client.table("watchlist").upsert(
-            {
-                "symbol": sym,
-                "source": source,
-                "reason": reason,
-                "score": score,
-                "discovery_sources": sources_list,
-                "active": True,
-                "added_at": added_at,
-                "updated_at": timestamp.isoformat(),
-            },
-            on_conflict="symbol",
-        ).execute()
+        rows.append({
+            "symbol": sym,
+            "source": source,
+            "reason": reason,
+            "score": score,
+            "discovery_sources": sources_list,
+            "active": True,
+            "added_at": added_at,
+            "updated_at": timestamp.isoformat(),
+        })
+
+    if rows:
+        await async_db.query(
+            lambda c: c.table("watchlist").upsert(rows, on_conflict="symbol"),
+            op="watchlist.upsert",
+        )
 
 
 # ── Daily Reassessment ────────────────────────────────────────
@@ -853,21 +864,22 @@ Be decisive. A lean, focused watchlist is better than a bloated one.
 _last_reassessment: datetime | None = None
 
 
-def needs_reassessment() -> bool:
+async def needs_reassessment() -> bool:
     """Check if a daily reassessment is due."""
     global _last_reassessment
 
     # Load last reassessment time from DB on first check
     if _last_reassessment is None:
         try:
-            client = db.get_client()
-            resp = (
-                client.table("activity_log")
-                .select("created_at")
-                .eq("event_type", "watchlist_reassessment")
-                .order("created_at", desc=True)
-                .limit(1)
-                .execute()
+            resp = await async_db.query(
+                lambda c: (
+                    c.table("activity_log")
+                    .select("created_at")
+                    .eq("event_type", "watchlist_reassessment")
+                    .order("created_at", desc=True)
+                    .limit(1)
+                ),
+                op="activity_log.last_reassessment",
             )
             if resp.data:
                 _last_reassessment = datetime.fromisoformat(
@@ -897,7 +909,7 @@ async def reassess_watchlist() -> list[str]:
     log.info("=" * 40)
     log.info("DAILY REASSESSMENT — reviewing entire watchlist...")
 
-    current = get_active_watchlist()
+    current = await get_active_watchlist()
     protected = set(config.WATCHLIST) | CORE_SYMBOLS
     reviewable = [s for s in current if s not in protected]
 
@@ -949,12 +961,13 @@ async def reassess_watchlist() -> list[str]:
     # Load watchlist metadata (when added, why, source)
     watchlist_meta: dict[str, dict] = {}
     try:
-        client = db.get_client()
-        resp = (
-            client.table("watchlist")
-            .select("symbol, source, reason, score, added_at")
-            .eq("active", True)
-            .execute()
+        resp = await async_db.query(
+            lambda c: (
+                c.table("watchlist")
+                .select("symbol, source, reason, score, added_at")
+                .eq("active", True)
+            ),
+            op="watchlist.active_meta",
         )
         for row in (resp.data or []):
             watchlist_meta[row["symbol"]] = row
@@ -1044,7 +1057,7 @@ async def reassess_watchlist() -> list[str]:
     removed_symbols: list[str] = []
 
     try:
-        response = await _call_ai(prompt, REASSESS_SYSTEM)
+        response = await _call_ai(prompt, REASSESS_SYSTEM, deadline=AI_EVAL_DEADLINE, workload="background")
 
         # Parse JSON
         json_str = response.strip()
@@ -1099,9 +1112,8 @@ async def reassess_watchlist() -> list[str]:
     now = datetime.now(timezone.utc)
     if removed_symbols:
         try:
-            client = db.get_client()
             for sym in removed_symbols:
-                client.table("watchlist").update({
+                updates = {
                     "active": False,
                     "source": "removed",
                     "reason": next(
@@ -1110,7 +1122,11 @@ async def reassess_watchlist() -> list[str]:
                         "Removed in daily reassessment"
                     ),
                     "updated_at": now.isoformat(),
-                }).eq("symbol", sym).execute()
+                }
+                await async_db.query(
+                    lambda c: c.table("watchlist").update(updates).eq("symbol", sym),
+                    op="watchlist.remove",
+                )
         except Exception as e:
             log.error(f"Failed to deactivate removed symbols: {e}")
 
@@ -1141,16 +1157,17 @@ async def reassess_watchlist() -> list[str]:
 
 # ── Utility ──────────────────────────────────────────────────
 
-def get_active_watchlist() -> list[str]:
+async def get_active_watchlist() -> list[str]:
     """Get the current active watchlist from Supabase."""
     try:
-        client = db.get_client()
-        resp = (
-            client.table("watchlist")
-            .select("symbol")
-            .eq("active", True)
-            .order("score", desc=True)
-            .execute()
+        resp = await async_db.query(
+            lambda c: (
+                c.table("watchlist")
+                .select("symbol")
+                .eq("active", True)
+                .order("score", desc=True)
+            ),
+            op="watchlist.active",
         )
         symbols = [r["symbol"] for r in (resp.data or [])]
         if symbols:
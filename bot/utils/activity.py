@@ -6,39 +6,259 @@ dashboard can show the entire agent network in real time.
 """
 
 import asyncio
+import json
+import os
+import time
+from collections import deque
 from datetime import datetime, timezone
 from typing import Any
 
+from bot.config import config
+from bot.utils import live_feed, metrics
 from bot.utils.logger import log
 
 
-# ── Buffered writer (batches DB writes) ──────────────────────
+# ── Activity sink (bounded queue + single writer task) ───────
 
-_buffer: list[dict] = []
-_flush_lock = asyncio.Lock()
+MAX_QUEUE = 2000            # Events held in memory before new ones are dropped
+BATCH_SIZE = 50             # Max events per insert
+FLUSH_INTERVAL = 2.0        # Max seconds an event waits for its batch to fill
+WRITE_RETRIES = 3           # Attempts per batch before spilling to disk
+RETRY_BACKOFF = 0.5         # Seconds, doubled per attempt
+SPILL_MAX_BYTES = 5_000_000 # Cap on the on-disk spillover file
+REPLAY_INTERVAL = 30.0      # Min seconds between spillover replay attempts
 
+# Written as soon as they are queued instead of waiting for a full batch
+URGENT_EVENTS = ("trade_decision", "trade", "error")
 
-def _get_client():
-    """Lazy import to avoid circular deps."""
-    from bot.data.supabase_client import get_client
-    return get_client()
 
+class ActivitySink:
+    """
+    Single writer for the activity_log table.
+
+    emit() only enqueues (from any thread or event loop); one task on the
+    main loop batches events by size and time, retries failed inserts with
+    backoff, and spills batches to a JSONL file while Supabase is down.
+    Spilled events are replayed once writes succeed again.
+    """
 
-async def _flush_buffer() -> None:
-    """Write buffered events to Supabase."""
-    global _buffer
-    async with _flush_lock:
-        if not _buffer:
+    def __init__(self, spill_path: str):
+        self.spill_path = spill_path
+        self.replay_path = spill_path + ".replay"   # Spill being replayed
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._prestart: deque[dict] = deque()
+        self._last_replay = 0.0
+        self.dropped = 0
+        self.written = 0
+        self.retries = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.corrupt = 0
+        self.failed_batches = 0
+
+    # ── Producer side ────────────────────────────────────────
+
+    def put(self, event: dict) -> None:
+        """Enqueue an event without blocking; drops it (counted) when the queue is full."""
+        loop = self._loop
+        if loop is None:
+            if len(self._prestart) >= MAX_QUEUE:
+                self.dropped += 1
+            else:
+                self._prestart.append(event)
             return
-        batch = _buffer.copy()
-        _buffer.clear()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._put_nowait(event)
+        else:
+            try:
+                loop.call_soon_threadsafe(self._put_nowait, event)
+            except RuntimeError:
+                self.dropped += 1  # Loop closed during shutdown
+
+    def _put_nowait(self, event: dict) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
 
-    try:
-        client = _get_client()
-        client.table("activity_log").insert(batch).execute()
-    except Exception as e:
-        log.warning(f"Activity log flush failed ({len(batch)} events): {e}")
-        # Don't re-add to buffer to avoid infinite growth
+    async def flush(self, timeout: float = 10.0) -> None:
+        """Wait until everything queued so far has been written (or spilled)."""
+        if self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        try:
+            if running is self._loop:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            else:
+                future = asyncio.run_coroutine_threadsafe(self._queue.join(), self._loop)
+                await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            log.warning(f"Activity flush timed out with {self._queue.qsize()} events queued")
+
+    # ── Writer side ──────────────────────────────────────────
+
+    async def run(self) -> None:
+        """Writer task: batch, insert, retry, spill. Run once on the main loop."""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=MAX_QUEUE)
+        while self._prestart:
+            self._put_nowait(self._prestart.popleft())
+
+        while True:
+            batch = await self._collect()
+            try:
+                if await self._write(batch):
+                    await self._maybe_replay()
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _collect(self) -> list[dict]:
+        """Wait for one event, then gather more until the batch is full, urgent or timed out."""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + FLUSH_INTERVAL
+        while len(batch) < BATCH_SIZE and batch[-1]["event_type"] not in URGENT_EVENTS:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            # asyncio.timeout, not wait_for: on 3.11 wait_for can swallow a
+            # cancel that races with the get, and the writer never stops
+            try:
+                async with asyncio.timeout(remaining):
+                    batch.append(await self._queue.get())
+            except TimeoutError:
+                break
+        while len(batch) < BATCH_SIZE and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _insert(self, batch: list[dict]) -> None:
+        from bot.data import async_db  # Lazy import to avoid circular deps
+        await async_db.query(
+            lambda c: c.table("activity_log").insert(batch),
+            op="activity_log.insert",
+        )
+
+    async def _write(self, batch: list[dict]) -> bool:
+        """Insert a batch with retry/backoff; spill it to disk if every attempt fails."""
+        for attempt in range(WRITE_RETRIES):
+            try:
+                await self._insert(batch)
+                self.written += len(batch)
+                return True
+            except Exception as e:
+                if attempt == WRITE_RETRIES - 1:
+                    log.warning(f"Activity log write failed ({len(batch)} events), spilling to disk: {e}")
+                    break
+                self.retries += 1
+                await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+        self.failed_batches += 1
+        await asyncio.to_thread(self._spill, batch)
+        return False
+
+    def _spill(self, batch: list[dict]) -> None:
+        """Append a batch to the spillover file (runs in a thread)."""
+        try:
+            size = os.path.getsize(self.spill_path) if os.path.exists(self.spill_path) else 0
+            lines = [json.dumps(e, default=str) + "\n" for e in batch]
+            if size + sum(len(line) for line in lines) > SPILL_MAX_BYTES:
+                self.dropped += len(batch)
+                return
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+            self.spilled += len(batch)
+        except OSError as e:
+            self.dropped += len(batch)
+            log.warning(f"Activity spill failed ({len(batch)} events dropped): {e}")
+
+    def _has_spilled(self) -> bool:
+        return os.path.exists(self.replay_path) or os.path.exists(self.spill_path)
+
+    def _take_spilled(self) -> list[dict]:
+        """
+        Read and remove spilled events (runs in a thread).
+
+        A .replay file left by an interrupted pass is taken before the
+        spillover file is moved aside again. Unparseable lines (a crash
+        mid-append) are skipped and counted.
+        """
+        if not os.path.exists(self.replay_path):
+            if not os.path.exists(self.spill_path):
+                return []
+            os.replace(self.spill_path, self.replay_path)
+        events = []
+        with open(self.replay_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    self.corrupt += 1
+        os.remove(self.replay_path)
+        return events
+
+    async def _maybe_replay(self) -> None:
+        """After a successful write, re-send spilled events (at most every REPLAY_INTERVAL)."""
+        now = time.monotonic()
+        if now - self._last_replay < REPLAY_INTERVAL or not self._has_spilled():
+            return
+        self._last_replay = now
+
+        try:
+            events = await asyncio.to_thread(self._take_spilled)
+        except OSError as e:
+            log.warning(f"Activity spill replay failed: {e}")
+            return
+
+        for i in range(0, len(events), BATCH_SIZE):
+            chunk = events[i : i + BATCH_SIZE]
+            try:
+                await self._insert(chunk)
+                self.replayed += len(chunk)
+            except Exception as e:
+                log.warning(f"Activity spill replay interrupted: {e}")
+                await asyncio.to_thread(self._spill, events[i:])
+                self.spilled -= len(events) - i  # Re-spilled, not new
+                return
+        if events:
+            log.info(f"Replayed {len(events)} spilled activity events")
+
+    def depth(self) -> int:
+        """Events waiting to be written."""
+        return self._queue.qsize() if self._queue else len(self._prestart)
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth and delivery counters for /api/status."""
+        return {
+            "queued": self.depth(),
+            "max_queue": MAX_QUEUE,
+            "dropped": self.dropped,
+            "written": self.written,
+            "retries": self.retries,
+            "failed_batches": self.failed_batches,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "corrupt_spilled": self.corrupt,
+            "spill_file_bytes": (
+                os.path.getsize(self.spill_path) if os.path.exists(self.spill_path) else 0
+            ),
+        }
+
+
+_sink = ActivitySink(config.ACTIVITY_SPILL_PATH)
+metrics.gauge(
+    "tradebot_activity_queue_depth", "Activity events waiting to be written."
+).set_function(_sink.depth)
 
 
 def emit(
@@ -72,27 +292,23 @@ def emit(
         "level": level,
         "created_at": datetime.now(timezone.utc).isoformat(),
     }
-    _buffer.append(event)
-
-    # Flush immediately for important events, otherwise at 3
-    important = event_type in ("trade_decision", "trade", "error")
-    if important or len(_buffer) >= 3:
-        asyncio.ensure_future(_flush_buffer())
+    _sink.put(event)
+    live_feed.publish("activity", event)
 
 
 async def flush() -> None:
-    """Force flush any remaining events."""
-    await _flush_buffer()
+    """Wait for all queued events to be written."""
+    await _sink.flush()
 
 
-async def periodic_flush(interval: float = 10.0) -> None:
-    """Background task that flushes the buffer every `interval` seconds."""
-    while True:
-        await asyncio.sleep(interval)
-        try:
-            await _flush_buffer()
-        except Exception:
-            pass
+async def run_writer() -> None:
+    """Background task that writes queued events to Supabase."""
+    await _sink.run()
+
+
+def stats() -> dict[str, Any]:
+    """Activity queue counters for the status server."""
+    return _sink.stats()
 
 
 # ── Convenience methods ──────────────────────────────────────
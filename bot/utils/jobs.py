@@ -0,0 +1,196 @@
+"""
+Small in-process job queue for work triggered from the status server.
+
+Jobs are keyed (e.g. by symbol): submitting a key that is already queued or
+running returns the existing job instead of starting a duplicate. A fixed
+pool of worker tasks caps how many jobs run at once. Finished jobs are kept
+(bounded) so clients can fetch results by ID, and each state change is
+published to the live feed as a "job" event.
+
+Usage:
+    queue = JobQueue("rescan", workers=2)
+    job, existing = queue.submit("AAPL", lambda: rescan_symbol("AAPL"))
+    await queue.wait(job.id, timeout=10)
+    queue.get(job.id).to_dict()
+"""
+
+import asyncio
+import itertools
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable
+
+from bot.utils import live_feed
+from bot.utils.logger import log
+
+
+class Job:
+    """One unit of work and its outcome."""
+
+    def __init__(self, job_id: str, kind: str, key: str, run: Callable[[], Awaitable[Any]]):
+        self.id = job_id
+        self.kind = kind
+        self.key = key
+        self.run = run
+        self.status = "queued"      # queued -> running -> done | error
+        self.result: Any = None
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.done = asyncio.Event()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "key": self.key,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """Deduplicating job queue with a fixed worker pool (one event loop)."""
+
+    def __init__(
+        self,
+        kind: str,
+        workers: int = 2,
+        max_queued: int = 200,
+        keep_finished: int = 500,
+        timeout: float = 60.0,
+    ):
+        self.kind = kind
+        self.workers = workers
+        self.max_queued = max_queued
+        self.keep_finished = keep_finished
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._queue: deque[Job] = deque()
+        self._wakeup: asyncio.Event | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._active: dict[str, Job] = {}                   # key -> queued/running job
+        self._jobs: OrderedDict[str, Job] = OrderedDict()   # id -> job (oldest first)
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+
+    # ── Submission ───────────────────────────────────────────
+
+    def submit(self, key: str, run: Callable[[], Awaitable[Any]]) -> tuple[Job, bool]:
+        """
+        Queue `run()` under `key` (call on the loop that runs the workers).
+
+        Returns:
+            (job, existing): existing is True when a job for `key` was
+            already queued or running and that job is returned instead.
+
+        Raises:
+            OverflowError: max_queued jobs are already waiting.
+        """
+        current = self._active.get(key)
+        if current is not None:
+            self.deduplicated += 1
+            return current, True
+        if len(self._queue) >= self.max_queued:
+            raise OverflowError(f"{self.kind} queue full ({self.max_queued} jobs waiting)")
+
+        job = Job(f"{self.kind}-{next(self._ids)}", self.kind, key, run)
+        self._active[key] = job
+        self._jobs[job.id] = job
+        self._trim()
+        self._queue.append(job)
+        self.submitted += 1
+        self._ensure_workers()
+        self._wakeup.set()
+        live_feed.publish("job", job.to_dict())
+        return job, False
+
+    def capacity(self) -> int:
+        """How many more jobs can be queued before submit() overflows."""
+        return max(self.max_queued - len(self._queue), 0)
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def active(self, key: str) -> Job | None:
+        """The queued or running job for `key`, if any."""
+        return self._active.get(key)
+
+    async def wait(self, job_id: str, timeout: float) -> Job | None:
+        """Wait up to `timeout` seconds for a job to finish; returns it either way."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def _trim(self) -> None:
+        """Forget the oldest finished jobs beyond keep_finished."""
+        excess = len(self._jobs) - self.keep_finished
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].done.is_set():
+                del self._jobs[job_id]
+                excess -= 1
+
+    # ── Workers ──────────────────────────────────────────────
+
+    def _ensure_workers(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._tasks = [t for t in self._tasks if not t.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.get_running_loop().create_task(
+                self._worker(), name=f"{self.kind}_worker"
+            ))
+
+    async def _worker(self) -> None:
+        while True:
+            while not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            await self._execute(self._queue.popleft())
+
+    async def _execute(self, job: Job) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        live_feed.publish("job", job.to_dict())
+        try:
+            job.result = await asyncio.wait_for(job.run(), self.timeout)
+            job.status = "done"
+            self.completed += 1
+        except asyncio.TimeoutError:
+            job.status, job.error = "error", f"timed out after {self.timeout:.0f}s"
+            self.failed += 1
+        except Exception as e:
+            log.error(f"{self.kind} job {job.id} ({job.key}) failed: {e}")
+            job.status, job.error = "error", str(e)
+            self.failed += 1
+        finally:
+            job.finished_at = time.time()
+            if self._active.get(job.key) is job:
+                del self._active[job.key]
+            job.done.set()
+            live_feed.publish("job", job.to_dict())
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth and counters for /api/status."""
+        return {
+            "workers": self.workers,
+            "queued": len(self._queue),
+            "running": sum(1 for j in self._active.values() if j.status == "running"),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
@@ -0,0 +1,217 @@
+"""
+Live event feed for the dashboard (server-sent events).
+
+Producers call publish(topic, data) from any thread or event loop: bars,
+signals, trades, order events, activity events, account/position snapshots,
+log lines and background job updates. The status server streams them to
+each connected client as SSE, filtered to the topics the client asked for.
+
+Each client has a bounded buffer. Events are encoded once per publish and
+shared by every subscriber; a client whose buffer fills up (it stopped
+reading, or reads slower than events arrive) is evicted instead of holding
+memory or slowing down the producers. The dashboard reconnects and
+re-fetches a snapshot after an eviction.
+
+Usage:
+    live_feed.publish("bar", bar)
+    sub = live_feed.subscribe({"bar", "log"})      # on the server's loop
+    payload = await sub.next(timeout=15)
+    live_feed.unsubscribe(sub)
+"""
+
+import asyncio
+import itertools
+import json
+import time
+from collections import deque
+from typing import Any
+
+from bot.utils import metrics
+from bot.utils.logger import log
+
+
+TOPICS = ("bar", "signal", "trade", "order", "activity", "account", "positions", "log", "job")
+
+CLIENT_BUFFER = 500          # Events buffered per client before it is evicted
+MAX_CLIENTS = 50             # Concurrent subscribers
+
+_published = metrics.counter("tradebot_feed_events_total", "Events published to the live feed.", ["topic"])
+_evicted = metrics.counter("tradebot_feed_evictions_total", "Live feed clients evicted as slow consumers.")
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize numpy scalars, timestamps, etc."""
+    if hasattr(obj, "item"):
+        return obj.item()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+
+def encode(seq: int, topic: str, data: Any) -> bytes:
+    """One SSE message: id, event name and a JSON data line."""
+    body = json.dumps(data, default=_json_default, separators=(",", ":"))
+    return f"id: {seq}\nevent: {topic}\ndata: {body}\n\n".encode()
+
+
+class Subscriber:
+    """One connected client: its topic filter and pending messages."""
+
+    def __init__(self, topics: set[str], buffer: int = CLIENT_BUFFER):
+        self.topics = topics
+        self.connected_at = time.time()
+        self.delivered = 0
+        self.evicted = False
+        self._buffer: deque[bytes] = deque()
+        self._limit = buffer
+        self._ready = asyncio.Event()
+
+    def offer(self, payload: bytes) -> bool:
+        """Buffer a message; False (and evicted) when the buffer is already full."""
+        if len(self._buffer) >= self._limit:
+            self.evicted = True
+            self._buffer.clear()
+            self._ready.set()
+            return False
+        self._buffer.append(payload)
+        self._ready.set()
+        return True
+
+    async def next(self, timeout: float) -> bytes | None:
+        """
+        Everything buffered so far as one chunk, or None after `timeout`
+        seconds with nothing to send (time for a keep-alive).
+        """
+        if not self._buffer and not self.evicted:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self.evicted:
+            return None
+        chunk = b"".join(self._buffer)
+        self.delivered += len(self._buffer)
+        self._buffer.clear()
+        return chunk
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+
+class LiveFeed:
+    """Fan-out of published events to subscribers on one event loop."""
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._subscribers: list[Subscriber] = []
+        self._seq = itertools.count(1)
+        self.published = 0
+        self.evictions = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Deliver on `loop` (the status server's loop)."""
+        self._loop = loop
+
+    # ── Producer side ────────────────────────────────────────
+
+    def publish(self, topic: str, data: Any) -> None:
+        """Send an event to interested subscribers (any thread; never blocks)."""
+        loop = self._loop
+        if loop is None or not self._subscribers:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._dispatch(topic, data)
+        else:
+            try:
+                loop.call_soon_threadsafe(self._dispatch, topic, data)
+            except RuntimeError:
+                pass  # Loop closed during shutdown
+
+    def _dispatch(self, topic: str, data: Any) -> None:
+        targets = [s for s in self._subscribers if topic in s.topics]
+        if not targets:
+            return
+        try:
+            payload = encode(next(self._seq), topic, data)
+        except (TypeError, ValueError) as e:
+            log.debug(f"Live feed: could not encode {topic} event: {e}")
+            return
+        self.published += 1
+        _published.labels(topic=topic).inc()
+        for sub in targets:
+            if not sub.offer(payload):
+                self._evict(sub)
+
+    def _evict(self, sub: Subscriber) -> None:
+        if sub in self._subscribers:
+            self._subscribers.remove(sub)
+            self.evictions += 1
+            _evicted.inc()
+            log.warning(f"Live feed: evicted slow client after {sub.delivered} events")
+
+    # ── Subscriber side (server loop) ────────────────────────
+
+    def subscribe(self, topics: set[str]) -> Subscriber | None:
+        """Register a client for `topics`; None when MAX_CLIENTS are connected."""
+        if len(self._subscribers) >= MAX_CLIENTS:
+            return None
+        sub = Subscriber(topics)
+        self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        if sub in self._subscribers:
+            self._subscribers.remove(sub)
+
+    def stats(self) -> dict[str, Any]:
+        """Connected clients and delivery counters for /api/status."""
+        now = time.time()
+        return {
+            "clients": len(self._subscribers),
+            "max_clients": MAX_CLIENTS,
+            "client_buffer": CLIENT_BUFFER,
+            "published": self.published,
+            "evictions": self.evictions,
+            "subscribers": [
+                {
+                    "topics": sorted(s.topics),
+                    "connected_s": round(now - s.connected_at, 1),
+                    "delivered": s.delivered,
+                    "pending": s.pending,
+                }
+                for s in self._subscribers
+            ],
+        }
+
+
+_feed = LiveFeed()
+
+
+def bind(loop: asyncio.AbstractEventLoop) -> None:
+    """Attach the feed to the status server's event loop."""
+    _feed.bind(loop)
+
+
+def publish(topic: str, data: Any) -> None:
+    """Publish an event to live feed subscribers (safe from any thread)."""
+    _feed.publish(topic, data)
+
+
+def subscribe(topics: set[str]) -> Subscriber | None:
+    """Register a subscriber (call on the bound loop)."""
+    return _feed.subscribe(topics)
+
+
+def unsubscribe(sub: Subscriber) -> None:
+    _feed.unsubscribe(sub)
+
+
+def stats() -> dict[str, Any]:
+    """Live feed summary for the status server."""
+    return _feed.stats()
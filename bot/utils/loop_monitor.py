@@ -0,0 +1,225 @@
+"""
+Event-loop health: scheduling lag per loop and stacks of blocking callbacks.
+
+A heartbeat task on each watched loop sleeps HEARTBEAT_INTERVAL and records
+how late it wakes up (the loop's scheduling lag). A watchdog thread checks
+the heartbeats; when one is overdue by more than STALL_THRESHOLD, the loop's
+thread is stuck in some callback, so the watchdog grabs that thread's stack
+right then. That stack points at the blocking call (a sync HTTP request, a
+long pandas pass, ...). Only sys._current_frames() is used, no asyncio
+debug mode, so it is cheap enough to leave on in production.
+
+The bot runs more than one loop: the main loop, plus one per alpaca-py
+stream (each runs asyncio.run in its own thread, and bar handlers execute
+there). Streams call ensure_watching() from their handlers.
+
+Usage:
+    asyncio.create_task(loop_monitor.watch("main"))
+    loop_monitor.ensure_watching("bar_stream")     # from inside a handler
+    register_status_provider("event_loop", loop_monitor.stats)
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any
+
+from bot.utils.logger import log
+from bot.utils import metrics
+
+
+HEARTBEAT_INTERVAL = 0.1     # Seconds between heartbeats on each loop
+STALL_THRESHOLD = 0.25       # Overdue heartbeat (s) that counts as a blocked loop
+WATCHDOG_INTERVAL = 0.05     # How often the watchdog thread checks heartbeats
+MAX_STALLS = 20              # Recent stalls kept (with stacks) for /api/status
+STACK_DEPTH = 15             # Innermost frames kept per captured stack
+
+_lag = metrics.histogram(
+    "tradebot_event_loop_lag_seconds", "How late each loop heartbeat fired.", ["loop"]
+)
+_stalls = metrics.counter(
+    "tradebot_event_loop_stalls_total", "Times a loop was blocked past the stall threshold.", ["loop"]
+)
+
+_BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_ROOT_DIR = os.path.dirname(_BOT_DIR)
+
+
+class _LoopWatch:
+    """Heartbeat state for one event loop."""
+
+    def __init__(self, name: str, loop: asyncio.AbstractEventLoop):
+        self.name = name
+        self.loop = loop
+        self.thread_id = threading.get_ident()
+        self.lag = _lag.labels(loop=name)
+        self.last_beat = time.monotonic()
+        self.active = True
+        self.stalls = 0
+        self.stalled: dict[str, Any] | None = None
+
+
+def _format_stack(frame) -> tuple[list[str], str | None]:
+    """(innermost STACK_DEPTH frames as 'file:line in func', innermost bot/ frame)."""
+    frames = traceback.extract_stack(frame)
+    # Drop the event loop's own frames: keep what runs inside the callback
+    for i in range(len(frames) - 1, -1, -1):
+        if frames[i].name == "_run" and frames[i].filename.endswith(os.path.join("asyncio", "events.py")):
+            frames = frames[i + 1:]
+            break
+    frames = frames[-STACK_DEPTH:]
+    lines = []
+    culprit = None
+    for f in frames:
+        path = os.path.relpath(f.filename, _ROOT_DIR) if f.filename.startswith(_ROOT_DIR) else f.filename
+        line = f"{path}:{f.lineno} in {f.name}"
+        lines.append(line)
+        if f.filename.startswith(_BOT_DIR) and not f.filename.endswith("loop_monitor.py"):
+            culprit = line
+    return lines, culprit
+
+
+class LoopMonitor:
+    """Lag histograms and blocked-callback stacks for every watched loop (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._watches: dict[str, _LoopWatch] = {}
+        self._recent: deque[dict[str, Any]] = deque(maxlen=MAX_STALLS)
+        self._watchdog: threading.Thread | None = None
+
+    # ── Heartbeat (runs on the watched loop) ─────────────────
+
+    async def watch(self, name: str) -> None:
+        """Heartbeat task for the running loop; runs until cancelled."""
+        loop = asyncio.get_running_loop()
+        watch = _LoopWatch(name, loop)
+        with self._lock:
+            self._watches[name] = watch
+        self._start_watchdog()
+
+        try:
+            while True:
+                start = time.monotonic()
+                await asyncio.sleep(HEARTBEAT_INTERVAL)
+                now = time.monotonic()
+                lag = max(0.0, now - start - HEARTBEAT_INTERVAL)
+                watch.lag.observe(lag)
+                with self._lock:
+                    watch.last_beat = now
+                    stall, watch.stalled = watch.stalled, None
+                    if stall is not None:
+                        stall["blocked_ms"] = round(lag * 1000, 1)
+                if stall is not None:
+                    where = stall["culprit"] or (stall["stack"][-1] if stall["stack"] else "unknown")
+                    log.warning(f"Event loop '{name}' blocked for {stall['blocked_ms']:.0f}ms at {where}")
+        finally:
+            with self._lock:
+                watch.active = False
+                if self._watches.get(name) is watch:
+                    del self._watches[name]
+
+    def ensure_watching(self, name: str) -> None:
+        """Start a heartbeat on the running loop unless `name` is already watching it."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            current = self._watches.get(name)
+            if current is not None and current.loop is loop and current.active:
+                return
+            # Placeholder so concurrent callers don't start a second heartbeat
+            self._watches[name] = _LoopWatch(name, loop)
+        loop.create_task(self.watch(name), name=f"loop_monitor:{name}")
+
+    # ── Watchdog (own thread) ────────────────────────────────
+
+    def _start_watchdog(self) -> None:
+        with self._lock:
+            if self._watchdog is not None:
+                return
+            self._watchdog = threading.Thread(
+                target=self._run_watchdog, name="loop-watchdog", daemon=True
+            )
+        self._watchdog.start()
+
+    def _run_watchdog(self) -> None:
+        while True:
+            time.sleep(WATCHDOG_INTERVAL)
+            try:
+                self._check()
+            except Exception as e:
+                log.debug(f"Loop watchdog check failed: {e}")
+
+    def _check(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            watches = [
+                w for w in self._watches.values()
+                if w.active and w.stalled is None
+                and now - w.last_beat - HEARTBEAT_INTERVAL > STALL_THRESHOLD
+            ]
+        if not watches:
+            return
+
+        frames = sys._current_frames()
+        for watch in watches:
+            frame = frames.get(watch.thread_id)
+            stack, culprit = _format_stack(frame) if frame is not None else ([], None)
+            stall = {
+                "loop": watch.name,
+                "at": time.time(),
+                "blocked_ms": None,     # Filled in when the loop recovers
+                "culprit": culprit,
+                "stack": stack,
+            }
+            with self._lock:
+                if watch.stalled is not None or not watch.active:
+                    continue
+                watch.stalled = stall
+                watch.stalls += 1
+                _stalls.labels(loop=watch.name).inc()
+                self._recent.append(stall)
+
+    # ── Queries ──────────────────────────────────────────────
+
+    def stats(self) -> dict[str, Any]:
+        """Per-loop lag summary, stall counts and the most recent stalls (newest first)."""
+        with self._lock:
+            watches = list(self._watches.values())
+            recent = [dict(s) for s in reversed(self._recent)]
+        now = time.monotonic()
+        return {
+            "heartbeat_ms": HEARTBEAT_INTERVAL * 1000,
+            "stall_threshold_ms": STALL_THRESHOLD * 1000,
+            "loops": {
+                w.name: {
+                    "lag": w.lag.snapshot(),
+                    "stalls": w.stalls,
+                    "blocked_now": w.stalled is not None,
+                    "since_heartbeat_ms": round((now - w.last_beat) * 1000, 1),
+                }
+                for w in watches if w.active
+            },
+            "recent_stalls": recent,
+        }
+
+
+monitor = LoopMonitor()
+
+
+def watch(name: str):
+    """Coroutine: heartbeat for the running loop (run as a background task)."""
+    return monitor.watch(name)
+
+
+def ensure_watching(name: str) -> None:
+    """Watch the running loop under `name` (idempotent; call from any coroutine)."""
+    monitor.ensure_watching(name)
+
+
+def stats() -> dict[str, Any]:
+    """Summary for the status server."""
+    return monitor.stats()
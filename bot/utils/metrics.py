@@ -0,0 +1,370 @@
+"""
+Lightweight in-process metrics: counters, gauges and fixed-bucket histograms.
+
+Histograms use a fixed set of bucket bounds, so memory stays constant no
+matter how many observations are recorded, and quantiles are estimated
+by interpolating within the bucket that contains them.
+
+Modules declare their metrics once at import time through the registry and
+update them on the hot path; the status server exports everything at
+/metrics (Prometheus text format) and summarizes it in /api/status.
+
+Usage:
+    _bars = metrics.counter("tradebot_bars_total", "Bars received.", ["symbol"])
+    _bars.labels(symbol="AAPL").inc()
+
+    _pending = metrics.gauge("tradebot_db_pending", "Queued Supabase calls.")
+    _pending.set_function(lambda: _pending_count)   # read at scrape time
+"""
+
+import bisect
+import threading
+from typing import Any, Callable, Iterable
+
+
+# Upper bounds in seconds (last bucket is +Inf)
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+    0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+class Histogram:
+    """Fixed-size histogram of observed values (thread-safe)."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-th quantile (0-1) by linear interpolation within a bucket."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self.count
+            max_seen = self.max
+        if total == 0:
+            return 0.0
+
+        rank = q * total
+        cumulative = 0
+        for idx, count in enumerate(counts):
+            if cumulative + count >= rank and count > 0:
+                lower = self.buckets[idx - 1] if idx > 0 else 0.0
+                upper = self.buckets[idx] if idx < len(self.buckets) else max_seen
+                upper = min(upper, max_seen)
+                fraction = (rank - cumulative) / count
+                return lower + (upper - lower) * fraction
+            cumulative += count
+        return max_seen
+
+    def cumulative_counts(self) -> list[tuple[float, int]]:
+        """(upper_bound, cumulative_count) pairs, ending with +Inf."""
+        with self._lock:
+            counts = list(self._counts)
+        out = []
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            out.append((bound, running))
+        return out
+
+    def snapshot(self) -> dict[str, Any]:
+        """Summary suitable for JSON status output (values in milliseconds)."""
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum / self.count * 1000, 2),
+            "p50_ms": round(self.quantile(0.50) * 1000, 2),
+            "p95_ms": round(self.quantile(0.95) * 1000, 2),
+            "p99_ms": round(self.quantile(0.99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+# ── Counters and gauges ──────────────────────────────────────
+
+class CounterValue:
+    """A monotonically increasing value (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class GaugeValue:
+    """A value that can go up and down, or be read from a callback at collection time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0.0
+        self._fn: Callable[[], float] | None = None
+
+    def set(self, value: float) -> None:
+        self._value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Report fn() instead of the stored value (e.g. a queue's current depth)."""
+        self._fn = fn
+
+    @property
+    def value(self) -> float:
+        if self._fn is not None:
+            try:
+                return float(self._fn())
+            except Exception:
+                return float("nan")
+        return self._value
+
+
+# ── Metric families ──────────────────────────────────────────
+
+class _Metric:
+    """A named metric with zero or more label dimensions; one child per label set."""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: dict[tuple[str, ...], Any] = {}
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, **labels: Any) -> Any:
+        """The child for one label set (created on first use)."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _unlabelled(self) -> Any:
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels {self.labelnames}; use .labels()")
+        return self.labels()
+
+    def children(self) -> list[tuple[dict[str, str], Any]]:
+        """(labels, child) pairs, sorted by label values."""
+        with self._lock:
+            items = sorted(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in items]
+
+    def remove(self, **labels: Any) -> None:
+        """Forget one label set (e.g. a symbol dropped from the watchlist)."""
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        with self._lock:
+            self._children.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._children.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> CounterValue:
+        return CounterValue()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> GaugeValue:
+        return GaugeValue()
+
+    def set(self, value: float) -> None:
+        self._unlabelled().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._unlabelled().dec(amount)
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        self._unlabelled().set_function(fn)
+
+
+class LabelledHistogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+
+    def _new_child(self) -> Histogram:
+        return Histogram(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._unlabelled().observe(value)
+
+
+# ── Registry ─────────────────────────────────────────────────
+
+class Registry:
+    """All metrics of the process, by name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls: type, name: str, help: str, labelnames: Iterable[str], **kwargs: Any):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered as a different {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> LabelledHistogram:
+        return self._get_or_create(LabelledHistogram, name, help, labelnames, buckets=buckets)
+
+    def metrics(self, names: Iterable[str] | None = None) -> list[_Metric]:
+        with self._lock:
+            if names is None:
+                return [self._metrics[n] for n in sorted(self._metrics)]
+            return [self._metrics[n] for n in names if n in self._metrics]
+
+    def render_prometheus(self, names: Iterable[str] | None = None) -> str:
+        """Prometheus text exposition (version 0.0.4) for all or the named metrics."""
+        lines = []
+        for metric in self.metrics(names):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, child in metric.children():
+                if metric.kind == "histogram":
+                    lines.extend(render_histogram(metric.name, child, labels))
+                else:
+                    lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(child.value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON summary: {metric: value | {label set: value}} (histograms in ms)."""
+        out: dict[str, Any] = {}
+        for metric in self.metrics():
+            values = {}
+            for labels, child in metric.children():
+                key = ",".join(f"{k}={v}" for k, v in labels.items())
+                values[key] = child.snapshot() if metric.kind == "histogram" else child.value
+            out[metric.name] = values.get("", {}) if not metric.labelnames else values
+        return out
+
+
+registry = Registry()
+
+
+def counter(name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+    """Get or create a counter in the process registry."""
+    return registry.counter(name, help, labelnames)
+
+
+def gauge(name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+    """Get or create a gauge in the process registry."""
+    return registry.gauge(name, help, labelnames)
+
+
+def histogram(
+    name: str,
+    help: str,
+    labelnames: Iterable[str] = (),
+    buckets: tuple[float, ...] = LATENCY_BUCKETS,
+) -> LabelledHistogram:
+    """Get or create a histogram in the process registry."""
+    return registry.histogram(name, help, labelnames, buckets)
+
+
+# ── Prometheus text format ───────────────────────────────────
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_histogram(name: str, hist: Histogram, labels: dict[str, str] | None = None) -> list[str]:
+    """Prometheus exposition lines (_bucket/_sum/_count) for one labelled histogram."""
+    labels = labels or {}
+    lines = [
+        f"{name}_bucket{_format_labels({**labels, 'le': _format_bound(bound)})} {count}"
+        for bound, count in hist.cumulative_counts()
+    ]
+    lines.append(f"{name}_sum{_format_labels(labels)} {hist.sum}")
+    lines.append(f"{name}_count{_format_labels(labels)} {hist.count}")
+    return lines
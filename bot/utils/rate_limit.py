@@ -0,0 +1,70 @@
+"""
+Token-bucket rate limiting for outbound API calls.
+
+A bucket refills at `rate_per_minute` tokens per minute up to `burst`
+tokens; each call takes one token and waits (asyncio.sleep, never blocking
+the loop) when none is left. Used per AI provider and workload, so
+concurrent callers share one request budget instead of each pacing itself
+with fixed sleeps.
+
+Usage:
+    limiter = TokenBucket(rate_per_minute=50, burst=5)
+    await limiter.acquire()
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any
+
+
+class TokenBucket:
+    """Async token bucket, shareable across event loops (refills lazily)."""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate = rate_per_minute / 60.0
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Take one token, sleeping until one is available."""
+        start = time.monotonic()
+        with self._lock:
+            self._refill()
+            # Reserve the token now (the count may go negative), so concurrent
+            # callers queue up behind each other instead of all waking at once
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            self.waited += 1
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                # Cancelled waiter (a losing hedge, a deadline): hand the token back
+                with self._lock:
+                    self._tokens += 1
+                raise
+            self.wait_seconds += time.monotonic() - start
+        self.acquired += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            self._refill()
+        return {
+            "rate_per_minute": round(self.rate * 60, 1),
+            "burst": self.burst,
+            "available": round(max(self._tokens, 0.0), 2),
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "wait_seconds": round(self.wait_seconds, 1),
+        }
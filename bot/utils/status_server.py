@@ -1,17 +1,54 @@
 """Lightweight HTTP status server for the trading bot.
 
+Responses for / and /api/status are built from a versioned snapshot: the
+body is re-encoded only when _state or the log buffer changed (or the cached
+copy is older than SNAPSHOT_MAX_AGE, for uptime and provider sections), and
+clients that send If-None-Match get a 304 while nothing has changed. The
+/api/status ETag leaves out the clock fields (timestamp, uptime, market
+countdowns), so they alone don't turn a poll into a 200.
+
 Exposes:
   /         - HTML status page (auto-refresh)
   /health   - JSON health check for Fly.io
   /api/status - Full JSON status for dashboard polling
+  /api/latency - Per-stage bar-to-order latency (?format=prometheus for text)
+  /api/analysis[/{symbol}] - Latest cached per-symbol analysis
+  /api/candles/{symbol} - In-memory candles, columnar (?tf=&since=<ms>&limit=)
+  /api/positions - Positions from the last account snapshot
+  /api/logs - Log lines after a cursor (?category=bars|trades|errors&since=<seq>)
+  /api/rescan[/{symbol}] - Queue rescan jobs (whole watchlist or ?symbols=)
+  /api/jobs/{id} - Rescan job status and result
+  /api/stream - Server-sent events (?topics=bar,signal,log; default all)
+  /metrics  - All registered metrics in Prometheus text format
+
+The data endpoints (analysis, candles, positions) answer with compact JSON,
+or MessagePack for ?format=msgpack / Accept: application/msgpack, and are
+gzip-compressed when the client accepts it.
 """
 
+import asyncio
+import hashlib
+import json
 import time
+from collections import deque
 from datetime import datetime, timezone, timedelta
+from typing import Any, Callable
 from zoneinfo import ZoneInfo
 
 from aiohttp import web
 
+try:
+    import msgpack  # Installed with alpaca-py
+except ImportError:
+    msgpack = None
+
+from bot.analysis import signals
+from bot.config import config
+from bot.data.candle_store import MAX_BARS as MAX_CANDLES, candles as candle_store
+from bot.utils import live_feed, metrics, tracing
+from bot.utils.jobs import Job, JobQueue
+from bot.utils.logger import log
+
 ET = ZoneInfo("America/New_York")
 
 # ── Shared state (updated by the bot) ─────────────────────────
@@ -35,26 +72,113 @@ _state: dict = {
     "last_watchlist_scan": None,
 }
 
-_log_buffer: list[str] = []
-MAX_LOG_LINES = 100
+# ── Log rings ────────────────────────────────────────────────
+
+MAX_LOG_LINES = 100         # Lines kept in the main log ring
+MAX_CATEGORY_LINES = 200    # Lines kept per category ring
+STATUS_LOG_LINES = 30       # Lines embedded in /api/status
+
+
+class LogRing:
+    """
+    Fixed-capacity ring of log lines with O(1) append.
+
+    Every line gets the next sequence number, so readers can ask for "lines
+    after seq N" and only receive what they haven't seen. Sequence numbers
+    are contiguous within a ring, which makes a cursor read an index
+    calculation rather than a scan.
+    """
+
+    def __init__(self, capacity: int):
+        self._lines: deque[str] = deque(maxlen=capacity)
+        self.seq = 0                # Sequence number of the newest line
+
+    def append(self, line: str) -> int:
+        self._lines.append(line)
+        self.seq += 1
+        return self.seq
+
+    def tail(self, n: int) -> list[str]:
+        """The newest n lines, oldest first."""
+        return list(self._lines)[-n:] if n > 0 else []
+
+    def since(self, seq: int, limit: int) -> dict[str, Any]:
+        """
+        Up to `limit` lines with sequence numbers above `seq`, oldest first.
+
+        'missed' counts lines after the cursor that already fell out of the
+        ring (the client polled too slowly). A cursor ahead of the ring (the
+        bot restarted) reads from the start.
+        """
+        lines = list(self._lines)
+        if seq > self.seq:
+            seq = 0
+        first = self.seq - len(lines) + 1           # seq of lines[0]
+        start = max(seq + 1, first)
+        missed = max(0, first - (seq + 1)) if seq < self.seq else 0
+        entries = [
+            {"seq": n, "line": lines[n - first]}
+            for n in range(start, min(start + limit, self.seq + 1))
+        ]
+        return {"seq": self.seq, "missed": missed, "lines": entries}
+
+
+_log_ring = LogRing(MAX_LOG_LINES)
+_category_rings: dict[str, LogRing] = {
+    "bars": LogRing(MAX_CATEGORY_LINES),
+    "trades": LogRing(MAX_CATEGORY_LINES),
+    "errors": LogRing(MAX_CATEGORY_LINES),
+}
+
+# Bumped on every _state / log change; cached responses compare against it
+_version = 0
+SNAPSHOT_MAX_AGE = 1.0      # Seconds a cached body is served without a state change
+
+
+# Extra /api/status sections computed on request (registered by other modules)
+_status_providers: dict[str, Callable[[], Any]] = {}
+
+
+def register_status_provider(name: str, fn: Callable[[], Any]) -> None:
+    """Add a section to /api/status whose value is fn() at request time."""
+    _status_providers[name] = fn
 
 
 def update_state(**kwargs) -> None:
     """Update bot state from main loop."""
+    global _version
     _state.update(kwargs)
+    _version += 1
+    if kwargs.get("last_error"):
+        _category_rings["errors"].append(_stamp(str(kwargs["last_error"])))
 
 
 def increment_state(key: str, amount: int = 1) -> None:
     """Increment a counter in state."""
+    global _version
     _state[key] = _state.get(key, 0) + amount
+    _version += 1
+
+
+def _stamp(line: str) -> str:
+    return f"[{datetime.now(timezone.utc).strftime('%H:%M:%S')}] {line}"
+
 
+def push_log(line: str, category: str | None = None) -> None:
+    """
+    Push a log line to the log ring.
 
-def push_log(line: str) -> None:
-    """Push a log line to the ring buffer."""
-    ts = datetime.now(timezone.utc).strftime("%H:%M:%S")
-    _log_buffer.append(f"[{ts}] {line}")
-    if len(_log_buffer) > MAX_LOG_LINES:
-        _log_buffer.pop(0)
+    Args:
+        line: Text shown on the dashboard.
+        category: Also keep it in that category's ring ('bars', 'trades', 'errors').
+    """
+    global _version
+    stamped = _stamp(line)
+    _log_ring.append(stamped)
+    if category:
+        _category_rings[category].append(stamped)
+    _version += 1
+    live_feed.publish("log", stamped)
 
 
 def _uptime() -> str:
@@ -128,18 +252,162 @@ def _market_schedule() -> dict:
     }
 
 
+def _json_default(obj: Any) -> Any:
+    """Serialize numpy scalars, timestamps, etc. found in analysis dicts."""
+    if hasattr(obj, "item"):
+        return obj.item()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, default=_json_default)
+
+
+def _wants_msgpack(request: web.Request) -> bool:
+    if request.query.get("format") == "msgpack":
+        return True
+    accept = request.headers.get("Accept", "")
+    return "application/msgpack" in accept or "application/x-msgpack" in accept
+
+
+def _data_response(request: web.Request, data: Any, status: int = 200) -> web.Response:
+    """Compact JSON or MessagePack (when asked and available), gzip when accepted."""
+    if msgpack is not None and _wants_msgpack(request):
+        body = msgpack.packb(data, default=_json_default)
+        content_type = "application/msgpack"
+    else:
+        body = json.dumps(data, default=_json_default, separators=(",", ":")).encode()
+        content_type = "application/json"
+    response = web.Response(body=body, status=status, content_type=content_type,
+                            headers={**_cors_headers(), "Vary": "Accept, Accept-Encoding"})
+    if len(body) > 1024 and "gzip" in request.headers.get("Accept-Encoding", ""):
+        response.enable_compression(web.ContentCoding.gzip)
+    return response
+
+
 def _cors_headers() -> dict[str, str]:
     return {
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Methods": "GET, OPTIONS",
-        "Access-Control-Allow-Headers": "Content-Type",
+        "Access-Control-Allow-Headers": "Content-Type, If-None-Match",
+        "Access-Control-Expose-Headers": "ETag",
+    }
+
+
+# ── Response snapshots ───────────────────────────────────────
+
+class _Snapshot:
+    """An encoded response body, rebuilt only when the bot state has moved on."""
+
+    def __init__(self, build: Callable[[], bytes | tuple[bytes, bytes]], content_type: str):
+        """
+        Args:
+            build: Returns the body, or (body, etag_source) when parts of the
+                   body (clock fields) shouldn't change the ETag.
+            content_type: Response content type.
+        """
+        self._build = build
+        self.content_type = content_type
+        self._version = -1
+        self._built_at = 0.0
+        self.body = b""
+        self.etag = ""
+        self.builds = 0
+
+    def refresh(self) -> None:
+        """Rebuild if _state/logs changed or the body is older than SNAPSHOT_MAX_AGE."""
+        now = time.monotonic()
+        if self._version == _version and now - self._built_at < SNAPSHOT_MAX_AGE:
+            return
+        version = _version
+        built = self._build()
+        body, etag_source = built if isinstance(built, tuple) else (built, built)
+        self._version = version
+        self._built_at = now
+        self.body = body
+        self.etag = f'"{hashlib.blake2b(etag_source, digest_size=8).hexdigest()}"'
+        self.builds += 1
+
+    def respond(self, request: web.Request) -> web.Response:
+        """200 with the cached body, or 304 when the client already has it."""
+        self.refresh()
+        headers = {**_cors_headers(), "ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.etag in request.headers.get("If-None-Match", ""):
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=self.body, content_type=self.content_type,
+                            charset="utf-8", headers=headers)
+
+
+# Parts of the strategy section that never change while the bot runs
+_STRATEGY_STATIC: dict[str, Any] = {
+    "name": "Candlestick Pattern + AI",
+    "news_model": "Gemini Flash",
+    "min_confidence": 0.6,
+    "min_signal_strength": 0.6,
+    "min_risk_reward": "2:1",
+    "patterns": [
+        "doji", "hammer", "inverted_hammer", "shooting_star",
+        "marubozu", "spinning_top", "engulfing", "harami",
+        "piercing_line", "dark_cloud_cover", "morning_star",
+        "evening_star", "three_white_soldiers", "three_black_crows",
+    ],
+    "indicators": ["RSI", "MACD", "EMA crossover", "Volume", "ATR"],
+    "confirmations": [
+        "Trend alignment", "Volume confirmation", "RSI extremes",
+        "MACD crossover", "EMA crossover", "Support/resistance breakout",
+    ],
+    "data_sources": [
+        "Alpaca real-time bars (WebSocket)",
+        "PlusE Finance analysis",
+        "Reddit RSS (WSB, stocks, options)",
+        "Alpaca news headlines",
+        "ApeWisdom trending",
+    ],
+    "pipeline": [
+        {"step": 1, "name": "Bar received", "desc": "5-min OHLCV candle from Alpaca WebSocket"},
+        {"step": 2, "name": "Pattern detection", "desc": "14 candlestick patterns scanned"},
+        {"step": 3, "name": "Signal scoring", "desc": "Patterns + indicators + price action combined"},
+        {"step": 4, "name": "Risk check", "desc": "Position limits, daily loss limit, buying power"},
+        {"step": 5, "name": "PlusE data", "desc": "Fetch LLM-friendly market analysis"},
+        {"step": 6, "name": "AI evaluation", "desc": "Gemini evaluates signal with full context"},
+        {"step": 7, "name": "Position sizing", "desc": "Calculate shares based on equity %"},
+        {"step": 8, "name": "Execute", "desc": "Place limit order via Alpaca"},
+    ],
+    "scan_intervals": {
+        "watchlist_scan": "15 min",
+        "news_analysis": "10 min",
+        "account_snapshot": "30 sec",
+    },
+}
+
+
+def _strategy_section() -> dict[str, Any]:
+    """Static strategy description plus the settings that come from _state."""
+    return {
+        **_STRATEGY_STATIC,
+        "ai_model": "Gemini 2.5 Pro" if _state.get("gemini_active") else ("Claude Sonnet" if _state.get("claude_active") else "Gemini 2.5 Pro"),
+        "timeframe": _state["timeframe"],
+        "risk": {
+            "max_position_pct": float(_state.get("max_position_pct", 0.05)),
+            "max_positions": int(_state.get("max_positions", 3)),
+            "stop_loss_pct": float(_state.get("stop_loss_pct", 0.02)),
+            "take_profit_pct": float(_state.get("take_profit_pct", 0.04)),
+            "daily_loss_limit_pct": float(_state.get("daily_loss_limit_pct", 0.03)),
+        },
     }
 
 
 # ── Handlers ─────────────────────────────────────────────────
 
-async def handle_api_status(request: web.Request) -> web.Response:
-    """Full JSON status for the dashboard to poll."""
+# Fields that move with the clock alone; left out of the /api/status ETag
+_CLOCK_FIELDS = ("uptime", "uptime_seconds", "timestamp")
+_MARKET_CLOCK_FIELDS = ("now_et", "opens_in_seconds", "closes_in_seconds")
+
+
+def _build_status() -> tuple[bytes, bytes]:
+    """Encode the full /api/status document and the clock-free part its ETag hashes."""
     now = datetime.now(timezone.utc).isoformat()
     data = {
         "status": "online",
@@ -166,61 +434,176 @@ async def handle_api_status(request: web.Request) -> web.Response:
             "paper": _state["paper"],
         },
         "market": _market_schedule(),
-        "strategy": {
-            "name": "Candlestick Pattern + AI",
-            "ai_model": "Gemini 2.5 Pro" if _state.get("gemini_active") else ("Claude Sonnet" if _state.get("claude_active") else "Gemini 2.5 Pro"),
-            "news_model": "Gemini Flash",
-            "timeframe": _state["timeframe"],
-            "min_confidence": 0.6,
-            "min_signal_strength": 0.6,
-            "min_risk_reward": "2:1",
-            "patterns": [
-                "doji", "hammer", "inverted_hammer", "shooting_star",
-                "marubozu", "spinning_top", "engulfing", "harami",
-                "piercing_line", "dark_cloud_cover", "morning_star",
-                "evening_star", "three_white_soldiers", "three_black_crows",
-            ],
-            "indicators": ["RSI", "MACD", "EMA crossover", "Volume", "ATR"],
-            "confirmations": [
-                "Trend alignment", "Volume confirmation", "RSI extremes",
-                "MACD crossover", "EMA crossover", "Support/resistance breakout",
-            ],
-            "data_sources": [
-                "Alpaca real-time bars (WebSocket)",
-                "PlusE Finance analysis",
-                "Reddit RSS (WSB, stocks, options)",
-                "Alpaca news headlines",
-                "ApeWisdom trending",
-            ],
-            "risk": {
-                "max_position_pct": float(_state.get("max_position_pct", 0.05)),
-                "max_positions": int(_state.get("max_positions", 3)),
-                "stop_loss_pct": float(_state.get("stop_loss_pct", 0.02)),
-                "take_profit_pct": float(_state.get("take_profit_pct", 0.04)),
-                "daily_loss_limit_pct": float(_state.get("daily_loss_limit_pct", 0.03)),
-            },
-            "pipeline": [
-                {"step": 1, "name": "Bar received", "desc": "5-min OHLCV candle from Alpaca WebSocket"},
-                {"step": 2, "name": "Pattern detection", "desc": "14 candlestick patterns scanned"},
-                {"step": 3, "name": "Signal scoring", "desc": "Patterns + indicators + price action combined"},
-                {"step": 4, "name": "Risk check", "desc": "Position limits, daily loss limit, buying power"},
-                {"step": 5, "name": "PlusE data", "desc": "Fetch LLM-friendly market analysis"},
-                {"step": 6, "name": "AI evaluation", "desc": "Gemini evaluates signal with full context"},
-                {"step": 7, "name": "Position sizing", "desc": "Calculate shares based on equity %"},
-                {"step": 8, "name": "Execute", "desc": "Place limit order via Alpaca"},
-            ],
-            "scan_intervals": {
-                "watchlist_scan": "15 min",
-                "news_analysis": "10 min",
-                "account_snapshot": "30 sec",
-            },
-        },
+        "strategy": _strategy_section(),
         "errors": {
             "last_error": _state["last_error"],
         },
-        "logs": _log_buffer[-30:],  # Last 30 lines
+        "logs": _log_ring.tail(STATUS_LOG_LINES),
+        "log_seq": _log_ring.seq,
+        "metrics": metrics.registry.snapshot(),
+    }
+    for name, provider in _status_providers.items():
+        try:
+            data[name] = provider()
+        except Exception as e:
+            data[name] = {"error": str(e)}
+
+    stable = {k: v for k, v in data.items() if k not in _CLOCK_FIELDS}
+    stable["market"] = {k: v for k, v in data["market"].items() if k not in _MARKET_CLOCK_FIELDS}
+    return _dumps(data).encode(), _dumps(stable).encode()
+
+
+_status_snapshot = _Snapshot(_build_status, "application/json")
+
+
+async def handle_api_status(request: web.Request) -> web.Response:
+    """Full JSON status for the dashboard to poll (cached, ETag-aware)."""
+    return _status_snapshot.respond(request)
+
+
+async def handle_latency(request: web.Request) -> web.Response:
+    """Per-stage latency histograms for the bar-to-order pipeline."""
+    if request.query.get("format") == "prometheus":
+        return web.Response(
+            text=tracing.render_prometheus(),
+            content_type="text/plain",
+            charset="utf-8",
+            headers={**_cors_headers(), "X-Content-Type-Options": "nosniff"},
+        )
+    return web.json_response(
+        {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "unit": "ms",
+            "stages": tracing.snapshot(),
+        },
+        headers=_cors_headers(),
+    )
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    """Prometheus scrape endpoint (text exposition format 0.0.4)."""
+    return web.Response(
+        text=metrics.registry.render_prometheus(),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
+
+
+MAX_LOGS_PER_READ = 500
+
+
+async def handle_logs(request: web.Request) -> web.Response:
+    """Log lines after ?since=<seq> from the main ring or a category ring."""
+    category = request.query.get("category", "all")
+    ring = _log_ring if category == "all" else _category_rings.get(category)
+    if ring is None:
+        return web.json_response(
+            {"error": f"Unknown category {category}", "categories": ["all", *_category_rings]},
+            status=400, headers=_cors_headers(),
+        )
+    try:
+        since = int(request.query.get("since", 0))
+        limit = min(int(request.query.get("limit", MAX_LOGS_PER_READ)), MAX_LOGS_PER_READ)
+    except ValueError:
+        return web.json_response({"error": "since and limit must be integers"}, status=400,
+                                 headers=_cors_headers())
+    return web.json_response({"category": category, **ring.since(since, limit)},
+                             headers=_cors_headers())
+
+
+STREAM_KEEPALIVE = 15.0     # Seconds of silence before a keep-alive comment
+STREAM_WRITE_TIMEOUT = 5.0  # A client that can't take a chunk this fast is dropped
+
+
+async def handle_stream(request: web.Request) -> web.StreamResponse:
+    """Push bars, signals, trades, activity, account and log events as SSE."""
+    requested = {t for t in request.query.get("topics", "").split(",") if t}
+    unknown = requested - set(live_feed.TOPICS)
+    if unknown:
+        return web.json_response(
+            {"error": f"Unknown topics: {', '.join(sorted(unknown))}", "topics": live_feed.TOPICS},
+            status=400, headers=_cors_headers(),
+        )
+    sub = live_feed.subscribe(requested or set(live_feed.TOPICS))
+    if sub is None:
+        return web.json_response({"error": "Too many stream clients"}, status=503, headers=_cors_headers())
+
+    response = web.StreamResponse(headers={
+        **_cors_headers(),
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    try:
+        await response.prepare(request)
+        await response.write(b"retry: 3000\n\n")
+        while True:
+            chunk = await sub.next(STREAM_KEEPALIVE)
+            if sub.evicted:
+                await asyncio.wait_for(response.write(b"event: evicted\ndata: {}\n\n"), STREAM_WRITE_TIMEOUT)
+                break
+            await asyncio.wait_for(response.write(chunk or b": keep-alive\n\n"), STREAM_WRITE_TIMEOUT)
+    except (ConnectionResetError, asyncio.TimeoutError):
+        pass
+    finally:
+        live_feed.unsubscribe(sub)
+    return response
+
+
+async def handle_analysis(request: web.Request) -> web.Response:
+    """Latest analysis (signal, patterns, price action, indicators) per symbol."""
+    symbol = request.match_info.get("symbol", "").upper()
+    if symbol:
+        entry = signals.latest_analysis(symbol)
+        if entry is None:
+            return _data_response(request, {"error": f"No analysis for {symbol} yet"}, status=404)
+        return _data_response(request, {"symbol": symbol, **entry})
+    return _data_response(
+        request, {"symbols": signals.latest_analysis(), "cache": signals.cache_stats()}
+    )
+
+
+async def handle_candles(request: web.Request) -> web.Response:
+    """
+    Recent candles for a symbol from memory, one array per column.
+
+    Query: tf (default config.TIMEFRAME), since (epoch ms, exclusive; pass
+    the previous response's cursor for incremental fetches), limit.
+    """
+    symbol = request.match_info.get("symbol", "").upper()
+    timeframe = request.query.get("tf", config.TIMEFRAME)
+    try:
+        since = int(request.query["since"]) if "since" in request.query else None
+        limit = max(1, int(request.query.get("limit", MAX_CANDLES)))
+    except ValueError:
+        return _data_response(request, {"error": "since and limit must be integers"}, status=400)
+
+    data = candle_store.read(symbol, timeframe, since, limit)
+    if data is None:
+        return _data_response(
+            request, {"error": f"No candles for {symbol} {timeframe} in memory"}, status=404
+        )
+    return _data_response(request, {"symbol": symbol, "timeframe": timeframe, **data})
+
+
+def _build_positions() -> bytes:
+    data = {
+        "positions": _state.get("positions", []),
+        "updated_at": _state.get("positions_updated_at"),
     }
-    return web.json_response(data, headers=_cors_headers())
+    return _dumps(data).encode()
+
+
+_positions_snapshot = _Snapshot(_build_positions, "application/json")
+
+
+async def handle_positions(request: web.Request) -> web.Response:
+    """Positions from the last account snapshot (ETag-aware, or MessagePack)."""
+    if msgpack is not None and _wants_msgpack(request):
+        return _data_response(request, {
+            "positions": _state.get("positions", []),
+            "updated_at": _state.get("positions_updated_at"),
+        })
+    return _positions_snapshot.respond(request)
 
 
 async def handle_health(request: web.Request) -> web.Response:
@@ -235,8 +618,8 @@ async def handle_options(request: web.Request) -> web.Response:
     return web.Response(status=204, headers=_cors_headers())
 
 
-async def handle_index(request: web.Request) -> web.Response:
-    """HTML status page (kept for direct Fly.io access)."""
+def _build_index() -> bytes:
+    """Render the HTML status page."""
     now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
     watchlist = ", ".join(_state["watchlist"]) if _state["watchlist"] else "none"
     last_bar = _state["last_bar_time"] or "waiting..."
@@ -297,48 +680,176 @@ async def handle_index(request: web.Request) -> web.Response:
 </div>
 </body>
 </html>"""
-    return web.Response(text=html, content_type="text/html")
+    return html.encode()
+
 
+_index_snapshot = _Snapshot(_build_index, "text/html")
 
-# ── Rescan callback (set by main.py) ─────────────────────────
+
+async def handle_index(request: web.Request) -> web.Response:
+    """HTML status page (kept for direct Fly.io access)."""
+    return _index_snapshot.respond(request)
+
+
+# ── Rescan jobs (callbacks set by main.py) ───────────────────
+
+RESCAN_WORKERS = 2          # Rescans running at once (each may call the AI)
+RESCAN_TIMEOUT = 30.0       # Seconds per rescan job
+MAX_RESCAN_WAIT = 30.0      # Cap on ?wait=
 
 _rescan_callback = None
+_rescan_prefetch = None
+_rescans = JobQueue("rescan", workers=RESCAN_WORKERS, timeout=RESCAN_TIMEOUT)
 
-def set_rescan_callback(fn):
-    """Register the rescan function from main.py."""
-    global _rescan_callback
+
+def set_rescan_callback(fn, prefetch=None):
+    """
+    Register the rescan function from main.py.
+
+    Args:
+        fn: async fn(symbol, candles=None) -> result dict.
+        prefetch: async fn(symbols) -> {symbol: candles}, used to share data
+                  fetches across a bulk rescan (optional).
+    """
+    global _rescan_callback, _rescan_prefetch
     _rescan_callback = fn
+    _rescan_prefetch = prefetch
+
+
+def rescan_stats() -> dict[str, Any]:
+    """Rescan job queue counters for the status server."""
+    return _rescans.stats()
+
+
+async def _run_rescan(symbol: str, prefetched: asyncio.Task | None) -> Any:
+    candles = None
+    if prefetched is not None:
+        try:
+            candles = (await asyncio.shield(prefetched)).get(symbol)
+        except Exception as e:
+            log.warning(f"Rescan prefetch failed, fetching {symbol} alone: {e}")
+    return await _rescan_callback(symbol, candles=candles)
+
+
+def _submit_rescans(symbols: list[str]) -> list[tuple[Job, bool]]:
+    """
+    Queue a rescan per symbol; symbols not already queued share one prefetch.
+
+    Raises:
+        OverflowError: The queue can't take every new job; nothing is queued.
+    """
+    fresh = [s for s in symbols if _rescans.active(s) is None]
+    if len(fresh) > _rescans.capacity():
+        raise OverflowError(
+            f"{_rescans.kind} queue can take {_rescans.capacity()} more jobs, {len(fresh)} requested"
+        )
+    prefetched = None
+    if _rescan_prefetch is not None and len(fresh) > 1:
+        prefetched = asyncio.ensure_future(_rescan_prefetch(fresh))
+    return [
+        _rescans.submit(symbol, lambda symbol=symbol: _run_rescan(symbol, prefetched))
+        for symbol in symbols
+    ]
+
+
+def _wait_seconds(request: web.Request) -> float:
+    try:
+        return min(max(float(request.query.get("wait", 0)), 0.0), MAX_RESCAN_WAIT)
+    except ValueError:
+        return 0.0
 
 
 async def handle_rescan(request: web.Request) -> web.Response:
-    """Trigger a manual signal rescan for a symbol."""
+    """
+    Queue a manual signal rescan for a symbol and return its job.
+
+    Repeated requests while a rescan for the symbol is queued or running get
+    the same job. ?wait=<s> waits up to that long for the result.
+    """
     symbol = request.match_info.get("symbol", "").upper()
     if not symbol:
         return web.json_response({"error": "Missing symbol"}, status=400, headers=_cors_headers())
     if not _rescan_callback:
         return web.json_response({"error": "Rescan not available"}, status=503, headers=_cors_headers())
 
-    import asyncio
     try:
-        result = await asyncio.wait_for(_rescan_callback(symbol), timeout=30)
-        return web.json_response({"status": "ok", "symbol": symbol, "result": result}, headers=_cors_headers())
-    except asyncio.TimeoutError:
-        return web.json_response({"error": "Rescan timed out"}, status=504, headers=_cors_headers())
-    except Exception as e:
-        return web.json_response({"error": str(e)}, status=500, headers=_cors_headers())
+        [(job, existing)] = _submit_rescans([symbol])
+    except OverflowError as e:
+        return web.json_response({"error": str(e)}, status=429, headers=_cors_headers())
+    wait = _wait_seconds(request)
+    if wait:
+        await _rescans.wait(job.id, wait)
+    return web.json_response(
+        {"job": job.to_dict(), "existing": existing},
+        status=200 if job.done.is_set() else 202,
+        headers=_cors_headers(),
+        dumps=_dumps,
+    )
+
+
+async def handle_rescan_bulk(request: web.Request) -> web.Response:
+    """Queue rescans for ?symbols=A,B,C (default: the whole watchlist)."""
+    if not _rescan_callback:
+        return web.json_response({"error": "Rescan not available"}, status=503, headers=_cors_headers())
+    requested = request.query.get("symbols")
+    symbols = [s.strip().upper() for s in requested.split(",") if s.strip()] if requested \
+        else list(_state["watchlist"])
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return web.json_response({"error": "No symbols to rescan"}, status=400, headers=_cors_headers())
+
+    try:
+        submitted = _submit_rescans(symbols)
+    except OverflowError as e:
+        return web.json_response({"error": str(e)}, status=429, headers=_cors_headers())
+    return web.json_response(
+        {"jobs": [{**job.to_dict(), "existing": existing} for job, existing in submitted]},
+        status=202,
+        headers=_cors_headers(),
+        dumps=_dumps,
+    )
+
+
+async def handle_job(request: web.Request) -> web.Response:
+    """Status and result of a rescan job (?wait=<s> to wait for it)."""
+    job_id = request.match_info["job_id"]
+    job = await _rescans.wait(job_id, _wait_seconds(request))
+    if job is None:
+        return web.json_response({"error": f"Unknown job {job_id}"}, status=404, headers=_cors_headers())
+    return web.json_response(job.to_dict(), headers=_cors_headers(), dumps=_dumps)
 
 
 # ── Server startup ───────────────────────────────────────────
 
 async def start_status_server(port: int = 8080) -> None:
     """Start the status HTTP server as a background task."""
+    live_feed.bind(asyncio.get_running_loop())
     app = web.Application()
     app.router.add_get("/", handle_index)
     app.router.add_get("/health", handle_health)
     app.router.add_get("/api/status", handle_api_status)
+    app.router.add_get("/api/latency", handle_latency)
+    app.router.add_get("/api/logs", handle_logs)
+    app.router.add_get("/api/stream", handle_stream)
+    app.router.add_get("/metrics", handle_metrics)
+    app.router.add_get("/api/analysis", handle_analysis)
+    app.router.add_get("/api/analysis/{symbol}", handle_analysis)
+    app.router.add_get("/api/candles/{symbol}", handle_candles)
+    app.router.add_get("/api/positions", handle_positions)
+    app.router.add_get("/api/rescan", handle_rescan_bulk)
     app.router.add_get("/api/rescan/{symbol}", handle_rescan)
+    app.router.add_get("/api/jobs/{job_id}", handle_job)
     app.router.add_route("OPTIONS", "/api/status", handle_options)
+    app.router.add_route("OPTIONS", "/api/latency", handle_options)
+    app.router.add_route("OPTIONS", "/api/logs", handle_options)
+    app.router.add_route("OPTIONS", "/api/stream", handle_options)
+    app.router.add_route("OPTIONS", "/api/analysis", handle_options)
+    app.router.add_route("OPTIONS", "/api/analysis/{symbol}", handle_options)
+    app.router.add_route("OPTIONS", "/api/candles/{symbol}", handle_options)
+    app.router.add_route("OPTIONS", "/api/positions", handle_options)
+    app.router.add_route("OPTIONS", "/api/rescan", handle_options)
     app.router.add_route("OPTIONS", "/api/rescan/{symbol}", handle_options)
+    app.router.add_route("OPTIONS", "/api/jobs/{job_id}", handle_options)
     app.router.add_route("OPTIONS", "/health", handle_options)
 
     runner = web.AppRunner(app)
@@ -0,0 +1,120 @@
+"""
+Hot-path latency tracing for the bar-to-order pipeline.
+
+Each stage (candle write, analysis steps, PlusE, AI, risk, order placement)
+is wrapped in a named span that records its wall time into a fixed-bucket
+histogram. A trace is opened when a bar arrives; spans don't need to know
+about it, but mark() can record the time elapsed since the bar came in
+(e.g. bar_to_order when the bracket order has been placed).
+
+Usage:
+    with tracing.trace():               # in the stream's bar handler
+        ...
+        with tracing.span("ai_call"):
+            decision = await evaluate_signal(...)
+        ...
+        tracing.mark("bar_to_order")
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from bot.utils import metrics
+from bot.utils.metrics import Histogram
+
+
+# Stage names in pipeline order (used to order status output)
+STAGES = (
+    "bar_total",
+    "candle_write",
+    "risk_checks",
+    "candle_fetch",
+    "pattern_detection",
+    "price_action",
+    "indicators",
+    "signal_write",
+    "pluse",
+    "fundamentals",
+    "ai_call",
+    "position_sizing",
+    "order_placement",
+    "bar_to_order",
+)
+
+LATENCY_METRIC = "tradebot_stage_latency_seconds"
+ERRORS_METRIC = "tradebot_stage_errors_total"
+
+_latency = metrics.histogram(LATENCY_METRIC, "Wall time per bar-to-order pipeline stage.", ["stage"])
+_errors = metrics.counter(ERRORS_METRIC, "Pipeline stage spans that raised.", ["stage"])
+
+# perf_counter() at which the current bar's trace started (None outside a trace)
+_trace_start: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "trace_start", default=None
+)
+
+
+def _histogram(stage: str) -> Histogram:
+    return _latency.labels(stage=stage)
+
+
+def observe(stage: str, seconds: float) -> None:
+    """Record a duration for a stage directly."""
+    _histogram(stage).observe(seconds)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time a block (sync or async code) and record it under `stage`, even if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        _errors.labels(stage=stage).inc()
+        raise
+    finally:
+        _histogram(stage).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def trace(stage: str = "bar_total") -> Iterator[None]:
+    """Open a trace for one bar; its total duration is recorded under `stage`."""
+    token = _trace_start.set(time.perf_counter())
+    try:
+        with span(stage):
+            yield
+    finally:
+        _trace_start.reset(token)
+
+
+def mark(stage: str) -> None:
+    """Record the time since the current trace started (no-op outside a trace)."""
+    start = _trace_start.get()
+    if start is not None:
+        _histogram(stage).observe(time.perf_counter() - start)
+
+
+def reset() -> None:
+    """Drop all recorded spans (benchmarks, load tests)."""
+    _latency.clear()
+    _errors.clear()
+
+
+def _ordered_stages() -> list[str]:
+    seen = {labels["stage"] for labels, _ in _latency.children()}
+    return [s for s in STAGES if s in seen] + sorted(seen - set(STAGES))
+
+
+def snapshot() -> dict[str, Any]:
+    """Per-stage latency summary (ms) for the status server."""
+    errors = {labels["stage"]: int(c.value) for labels, c in _errors.children()}
+    return {
+        stage: {**_histogram(stage).snapshot(), "errors": errors.get(stage, 0)}
+        for stage in _ordered_stages()
+    }
+
+
+def render_prometheus() -> str:
+    """Stage histograms and error counters in Prometheus text exposition format."""
+    return metrics.registry.render_prometheus([LATENCY_METRIC, ERRORS_METRIC])